@@ -1,9 +1,18 @@
-import json
+import argparse
 import mysql.connector
-from textblob import TextBlob
-import emoji
 import os
-import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from cache import bump_data_version
+from checkpoint import IngestCheckpoint, SeenIds
+from memo import MEMO_PATH, MEMO_SIZE, TextMemo
+from regions import detect_region_from_text, split_region
+from rollups import POLARITY_HISTOGRAM_TABLE, ROLLUP_TABLES, add_to_rollups, new_rows
+from scorers import SCORERS, SENTIMENT_BACKEND, get_scorer, load_scorer, scorer_identity
+from transport import determine_transport_type
+from tweet_io import iter_tweets
 
 # ---------- DATABASE CONFIG ----------
 DB_CONFIG = {
@@ -13,238 +22,342 @@ DB_CONFIG = {
     "database": "transport_sentiment_app"  # ← the DB you selected earlier
 }
 
-# ---------- INDIAN STATES AND CITIES MAPPING ----------
-INDIAN_STATES_CITIES = {
-    'Andhra Pradesh': ['Visakhapatnam', 'Vijayawada', 'Guntur', 'Nellore', 'Kurnool', 'Rajahmundry', 'Tirupati'],
-    'Arunachal Pradesh': ['Itanagar', 'Naharlagun', 'Pasighat', 'Tezpur'],
-    'Assam': ['Guwahati', 'Silchar', 'Dibrugarh', 'Jorhat', 'Nagaon', 'Tinsukia'],
-    'Bihar': ['Patna', 'Gaya', 'Bhagalpur', 'Muzaffarpur', 'Darbhanga', 'Bihar Sharif'],
-    'Chhattisgarh': ['Raipur', 'Bhilai', 'Korba', 'Bilaspur', 'Durg', 'Rajnandgaon'],
-    'Goa': ['Panaji', 'Margao', 'Vasco da Gama', 'Mapusa', 'Ponda'],
-    'Gujarat': ['Ahmedabad', 'Surat', 'Vadodara', 'Rajkot', 'Bhavnagar', 'Jamnagar'],
-    'Haryana': ['Gurgaon', 'Faridabad', 'Panipat', 'Ambala', 'Yamunanagar', 'Rohtak'],
-    'Himachal Pradesh': ['Shimla', 'Dharamshala', 'Solan', 'Mandi', 'Kullu', 'Hamirpur'],
-    'Jharkhand': ['Ranchi', 'Jamshedpur', 'Dhanbad', 'Bokaro', 'Deoghar', 'Hazaribagh'],
-    'Karnataka': ['Bangalore', 'Mysore', 'Hubli', 'Mangalore', 'Belgaum', 'Gulbarga'],
-    'Kerala': ['Kochi', 'Thiruvananthapuram', 'Kozhikode', 'Thrissur', 'Kollam', 'Palakkad'],
-    'Madhya Pradesh': ['Bhopal', 'Indore', 'Gwalior', 'Jabalpur', 'Ujjain', 'Sagar'],
-    'Maharashtra': ['Mumbai', 'Pune', 'Nagpur', 'Nashik', 'Aurangabad', 'Solapur'],
-    'Manipur': ['Imphal', 'Thoubal', 'Bishnupur', 'Churachandpur'],
-    'Meghalaya': ['Shillong', 'Tura', 'Jowai', 'Nongstoin'],
-    'Mizoram': ['Aizawl', 'Lunglei', 'Saiha', 'Champhai'],
-    'Nagaland': ['Kohima', 'Dimapur', 'Mokokchung', 'Tuensang'],
-    'Odisha': ['Bhubaneswar', 'Cuttack', 'Rourkela', 'Berhampur', 'Sambalpur', 'Puri'],
-    'Punjab': ['Chandigarh', 'Ludhiana', 'Amritsar', 'Jalandhar', 'Patiala', 'Bathinda'],
-    'Rajasthan': ['Jaipur', 'Jodhpur', 'Udaipur', 'Kota', 'Bikaner', 'Ajmer'],
-    'Sikkim': ['Gangtok', 'Namchi', 'Gyalshing', 'Mangan'],
-    'Tamil Nadu': ['Chennai', 'Coimbatore', 'Madurai', 'Salem', 'Tiruchirappalli', 'Tirunelveli'],
-    'Telangana': ['Hyderabad', 'Warangal', 'Nizamabad', 'Karimnagar', 'Khammam', 'Mahbubnagar'],
-    'Tripura': ['Agartala', 'Dharmanagar', 'Udaipur', 'Kailashahar'],
-    'Uttar Pradesh': ['Lucknow', 'Kanpur', 'Agra', 'Varanasi', 'Meerut', 'Allahabad'],
-    'Uttarakhand': ['Dehradun', 'Haridwar', 'Roorkee', 'Haldwani', 'Rudrapur', 'Kashipur'],
-    'West Bengal': ['Kolkata', 'Howrah', 'Durgapur', 'Siliguri', 'Asansol', 'Malda'],
-    'Delhi': ['New Delhi', 'Gurgaon', 'Noida', 'Faridabad', 'Ghaziabad'],
-    'Jammu and Kashmir': ['Srinagar', 'Jammu', 'Anantnag', 'Baramulla', 'Udhampur'],
-    'Ladakh': ['Leh', 'Kargil', 'Nubra', 'Zanskar']
-}
+INPUT_PATH = "backend/data.jsonl"
+LEGACY_INPUT_PATH = "backend/data.json"
+SHARD_SIZE = 1000  # tweets per worker task
+BATCH_SIZE = 500   # rows per multi-row INSERT / commit
+
+# Columns and tables added by migrate.py that ingestion writes (seq is
+# assigned by the server for the API change feed)
+REQUIRED_COLUMNS = {"transport_type", "state", "city", "seq", "polarity", "subjectivity", "confidence"}
+REQUIRED_TABLES = set(ROLLUP_TABLES) | {POLARITY_HISTOGRAM_TABLE, "data_version"}
+
+# Duplicate ids are ignored by the server; affected rows = rows inserted
+INSERT_SQL = """
+    INSERT IGNORE INTO tweet_sentiment
+        (id, text, created_at, sentiment, region, transport_type, state, city, polarity, subjectivity, confidence)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Named lock every writer of tweet_sentiment (this script, pipeline.py,
+# migrate.py) holds around its insert transactions. Serialized writers
+# commit in seq (AUTO_INCREMENT) order, which the change feed and live
+# trends poll by, and never both count a tweet as new for the rollups.
+WRITER_LOCK = "transport_sentiment_writer"
+WRITER_LOCK_TIMEOUT = 60  # seconds to wait for another writer's transaction
 
-# ---------- REGION DETECTION FUNCTION ----------
-def detect_region_from_text(text):
+# ---------- CHUNKING ----------
+def iter_chunks(items, size):
+    """Yield lists of up to `size` items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# ---------- ENRICHMENT ----------
+def score_texts(texts, backend=SENTIMENT_BACKEND):
+    """
+    (sentiment, polarity, subjectivity, confidence) for each text, in
+    input order, with the `backend` scorer (see scorers.py). Takes
+    memo-normalized texts; this is the CPU-bound part that runs in worker
+    processes.
     """
-    Detect region (state or major city) from tweet text
+    scorer = get_scorer(backend)
+    sentiments, polarities, subjectivities = scorer.score_batch(texts)
+    confidences = scorer.confidence(polarities)
+    return [
+        (sentiment, round(polarity, 4), round(subjectivity, 4), round(confidence, 3))
+        for sentiment, polarity, subjectivity, confidence
+        in zip(sentiments, polarities.tolist(), subjectivities.tolist(), confidences.tolist())
+    ]
+
+def finish_enrichment(texts, batch, scored):
     """
-    text_lower = text.lower()
-    
-    # Check for direct state mentions
-    for state, cities in INDIAN_STATES_CITIES.items():
-        if state.lower() in text_lower:
-            return state
-    
-    # Check for city mentions and return the state
-    for state, cities in INDIAN_STATES_CITIES.items():
-        for city in cities:
-            if city.lower() in text_lower:
-                return f"{city}, {state}"
-    
-    # Check for common abbreviations and nicknames
-    location_mappings = {
-        'mumbai': 'Mumbai, Maharashtra',
-        'delhi': 'Delhi',
-        'bangalore': 'Bangalore, Karnataka',
-        'bengaluru': 'Bangalore, Karnataka',
-        'chennai': 'Chennai, Tamil Nadu',
-        'kolkata': 'Kolkata, West Bengal',
-        'calcutta': 'Kolkata, West Bengal',
-        'hyderabad': 'Hyderabad, Telangana',
-        'pune': 'Pune, Maharashtra',
-        'ahmedabad': 'Ahmedabad, Gujarat',
-        'surat': 'Surat, Gujarat',
-        'jaipur': 'Jaipur, Rajasthan',
-        'lucknow': 'Lucknow, Uttar Pradesh',
-        'kanpur': 'Kanpur, Uttar Pradesh',
-        'nagpur': 'Nagpur, Maharashtra',
-        'patna': 'Patna, Bihar',
-        'indore': 'Indore, Madhya Pradesh',
-        'bhopal': 'Bhopal, Madhya Pradesh',
-        'ludhiana': 'Ludhiana, Punjab',
-        'agra': 'Agra, Uttar Pradesh',
-        'nashik': 'Nashik, Maharashtra',
-        'vadodara': 'Vadodara, Gujarat',
-        'gurgaon': 'Gurgaon, Haryana',
-        'gurugram': 'Gurgaon, Haryana',
-        'noida': 'Noida, Delhi',
-        'faridabad': 'Faridabad, Haryana',
-        'ghaziabad': 'Ghaziabad, Delhi',
-        'rajkot': 'Rajkot, Gujarat',
-        'kochi': 'Kochi, Kerala',
-        'cochin': 'Kochi, Kerala',
-        'coimbatore': 'Coimbatore, Tamil Nadu',
-        'madurai': 'Madurai, Tamil Nadu',
-        'jodhpur': 'Jodhpur, Rajasthan',
-        'raipur': 'Raipur, Chhattisgarh',
-        'kota': 'Kota, Rajasthan',
-        'guwahati': 'Guwahati, Assam',
-        'chandigarh': 'Chandigarh, Punjab',
-        'thiruvananthapuram': 'Thiruvananthapuram, Kerala',
-        'trivandrum': 'Thiruvananthapuram, Kerala',
-        'mysore': 'Mysore, Karnataka',
-        'mysuru': 'Mysore, Karnataka',
-        'salem': 'Salem, Tamil Nadu',
-        'meerut': 'Meerut, Uttar Pradesh',
-        'jabalpur': 'Jabalpur, Madhya Pradesh',
-        'gwalior': 'Gwalior, Madhya Pradesh',
-        'vijayawada': 'Vijayawada, Andhra Pradesh',
-        'visakhapatnam': 'Visakhapatnam, Andhra Pradesh',
-        'vizag': 'Visakhapatnam, Andhra Pradesh',
-        'ranchi': 'Ranchi, Jharkhand',
-        'jamshedpur': 'Jamshedpur, Jharkhand',
-        'dhanbad': 'Dhanbad, Jharkhand',
-        'amritsar': 'Amritsar, Punjab',
-        'jalandhar': 'Jalandhar, Punjab',
-        'allahabad': 'Allahabad, Uttar Pradesh',
-        'prayagraj': 'Allahabad, Uttar Pradesh',
-        'varanasi': 'Varanasi, Uttar Pradesh',
-        'banaras': 'Varanasi, Uttar Pradesh',
-        'howrah': 'Howrah, West Bengal',
-        'durgapur': 'Durgapur, West Bengal',
-        'siliguri': 'Siliguri, West Bengal',
-        'asansol': 'Asansol, West Bengal'
-    }
-    
-    for keyword, region in location_mappings.items():
-        if keyword in text_lower:
-            return region
-    
-    # Default fallback
-    return 'India'
-
-# ---------- SENTIMENT ANALYSIS FUNCTION ----------
-def analyze_sentiment(text):
+    Combine a MemoBatch's cached and freshly `scored` results with the
+    region and transport type, which are matched on each original text:
+    @handles such as @drmmumbaicr name the region, and reposts of one
+    text can come from different ones
+    """
+    return [
+        (sentiment, detect_region_from_text(text), determine_transport_type(text), *scores)
+        for text, (sentiment, *scores) in zip(texts, batch.complete(scored))
+    ]
+
+def enrich_texts(texts, memo=None, backend=SENTIMENT_BACKEND):
     """
-    Enhanced sentiment analysis for Indian context
+    Score sentiment, detect region and classify transport type for a list
+    of tweet texts. Returns a list of (sentiment, region, transport_type,
+    polarity, subjectivity, confidence) in input order. Sentiment is
+    scored on the normalized text (memo.normalize_text) with or without a
+    memo; texts already in `memo` (a TextMemo of the same backend) are not
+    rescored.
     """
-    # Remove emojis for TextBlob analysis
-    text_clean = ''.join(c for c in text if c not in emoji.EMOJI_DATA)
-    
-    # Get emoji sentiment
-    text_emojis = ''.join(c for c in text if c in emoji.EMOJI_DATA)
-    emoji_sentiment = 0
-    
-    if text_emojis:
-        positive_emojis = ["😊", "😁", "😄", "😍", "👍", "✅", "💚", "🎉", "👌", "😀"]
-        negative_emojis = ["😠", "😡", "🤬", "💢", "👎", "❌", "💔", "😞", "😢", "😤"]
-        
-        for emoji_char in text_emojis:
-            if emoji_char in positive_emojis:
-                emoji_sentiment += 0.3
-            elif emoji_char in negative_emojis:
-                emoji_sentiment -= 0.3
-    
-    # TextBlob sentiment
-    blob = TextBlob(text_clean)
-    polarity = blob.sentiment.polarity + emoji_sentiment
-    
-    # Clamp polarity between -1 and 1
-    polarity = max(-1, min(1, polarity))
-    
-    if polarity > 0.1:
-        return "positive"
-    elif polarity < -0.1:
-        return "negative"
+    batch = (memo if memo is not None else TextMemo(0, backend)).batch(texts)
+    return finish_enrichment(texts, batch, score_texts(batch.misses, backend) if batch.misses else [])
+
+def iter_enriched(tweets, workers=1, shard_size=SHARD_SIZE, memo=None, backend=SENTIMENT_BACKEND):
+    """
+    Yield (tweet, sentiment, region, transport_type, polarity, subjectivity,
+    confidence) in input order.
+    `tweets` can be any iterable; it is consumed one shard at a time.
+    With workers > 1 the CPU-bound scoring is sharded across a process pool
+    (at most two shards in flight per worker); results still come back in
+    order to the single DB writer. The memo is consulted here, so workers
+    only get texts it has not seen.
+    """
+    memo = memo if memo is not None else TextMemo(0, backend)
+    shards = iter_chunks(tweets, shard_size)
+
+    if workers > 1:
+        def finish(shard, texts, batch, future):
+            scored = future.result() if future is not None else []
+            return zip(shard, finish_enrichment(texts, batch, scored))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=load_scorer, initargs=(backend,)) as pool:
+            pending = deque()
+            for shard in shards:
+                texts = [tweet['text'] for tweet in shard]
+                batch = memo.batch(texts)
+                future = pool.submit(score_texts, batch.misses, backend) if batch.misses else None
+                pending.append((shard, texts, batch, future))
+                if len(pending) < workers * 2:
+                    continue
+                for tweet, enrichment in finish(*pending.popleft()):
+                    yield (tweet, *enrichment)
+            while pending:
+                for tweet, enrichment in finish(*pending.popleft()):
+                    yield (tweet, *enrichment)
     else:
-        return "neutral"
+        for shard in shards:
+            for tweet, enrichment in zip(shard, enrich_texts([tweet['text'] for tweet in shard], memo, backend)):
+                yield (tweet, *enrichment)
 
-# ---------- LOAD TWEETS ----------
-input_path = "backend/data.json"
-if not os.path.exists(input_path):
-    print("❌ 'data.json' not found. Run scraper first.")
-    exit()
+# ---------- WRITER LOCK ----------
+def acquire_writer_lock(cursor, timeout=WRITER_LOCK_TIMEOUT):
+    """Take WRITER_LOCK for this session; a MySQL OperationalError if another writer keeps it"""
+    cursor.execute("SELECT GET_LOCK(%s, %s)", (WRITER_LOCK, timeout))
+    (acquired,) = cursor.fetchone()
+    if acquired != 1:
+        raise mysql.connector.errors.OperationalError(
+            msg=f"another writer held the '{WRITER_LOCK}' lock for over {timeout}s")
 
-with open(input_path, "r", encoding="utf-8") as f:
-    tweets = json.load(f)
+def release_writer_lock(cursor):
+    cursor.execute("SELECT RELEASE_LOCK(%s)", (WRITER_LOCK,))
+    cursor.fetchone()
 
-if not tweets:
-    print("⚠️ No tweets to process.")
-    exit()
+# ---------- BULK INSERT ----------
+def bulk_insert(conn, cursor, rows, batch_size=BATCH_SIZE, sql=INSERT_SQL, on_commit=None, rollups=True,
+                bump_version=True, analytics=None, lock=True):
+    """
+    Insert (id, text, created_at, sentiment, region, transport_type, state,
+    city, polarity, subjectivity, confidence) rows, one multi-row INSERT per
+    chunk and one commit per chunk.
+    With `rollups`, the rows a chunk actually inserts are folded into the
+    rollup tables in the same transaction; with `bump_version`, a chunk
+    that inserts anything bumps data_version so API caches are dropped.
+    With `lock`, each chunk's transaction runs under WRITER_LOCK.
+    With `analytics` (an analytics_store.ColumnStore), the inserted rows are
+    appended to it after the commit, still under the writer lock (rows
+    committed just before a crash can be missing from the store until
+    `migrate.py --rebuild-analytics`).
+    on_commit(chunk, inserted) is called after each commit.
+    Returns (inserted, skipped) counted from the affected rows.
+    """
+    inserted = skipped = 0
+    for chunk in iter_chunks(rows, batch_size):
+        if lock:
+            acquire_writer_lock(cursor)
+        try:
+            fresh = new_rows(cursor, chunk) if rollups or analytics is not None else None
+            cursor.executemany(sql, chunk)
+            chunk_inserted = cursor.rowcount
+            if rollups:
+                add_to_rollups(cursor, fresh)
+            if bump_version and chunk_inserted > 0:
+                bump_data_version(cursor)
+            conn.commit()
+            if analytics is not None:
+                analytics.append(fresh)
+        finally:
+            if lock:
+                release_writer_lock(cursor)
+        inserted += chunk_inserted
+        skipped += len(chunk) - chunk_inserted
+        if on_commit:
+            on_commit(chunk, chunk_inserted)
+    return inserted, skipped
 
-# ---------- CONNECT TO MYSQL ----------
-try:
-    conn = mysql.connector.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    print("✅ Connected to MySQL.")
+def to_row(tweet, sentiment, region, transport_type, polarity, subjectivity, confidence):
+    """DB row for an enriched tweet; region is also stored split into state/city"""
+    state, city = split_region(region)
+    return (tweet['id'], tweet['text'], tweet['created_at'].replace("Z", ""), sentiment, region, transport_type,
+            state, city, polarity, subjectivity, confidence)
 
-    # ---------- VERIFY TABLE STRUCTURE ----------
+def schema_is_current(cursor):
+    """True once migrate.py has added everything ingestion writes to"""
     cursor.execute("DESCRIBE tweet_sentiment")
-    columns = cursor.fetchall()
-    print("📋 Current table structure:")
-    for col in columns:
-        print(f"   {col[0]} - {col[1]}")
-
-    inserted = 0
-    for tweet in tweets:
-        tweet_id = tweet['id']
-        text = tweet['text']
-        sentiment = analyze_sentiment(text)
-        created_at = tweet['created_at'].replace("Z", "")
-        
-        # Detect region (state/city)
-        region = detect_region_from_text(text)
+    columns = {col[0] for col in cursor.fetchall()}
+    cursor.execute("SHOW TABLES")
+    tables = {table for (table,) in cursor.fetchall()}
+    return columns.issuperset(REQUIRED_COLUMNS) and tables.issuperset(REQUIRED_TABLES)
 
-        try:
-            cursor.execute("""
-                INSERT INTO tweet_sentiment (id, text, created_at, sentiment, region)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (tweet_id, text, created_at, sentiment, region))
-            inserted += 1
-        except mysql.connector.IntegrityError:
-            # Skip duplicates
-            continue
-
-    conn.commit()
-    print(f"💾 Uploaded {inserted} new tweet records to MySQL.")
-    
-    # Print summary by region
-    cursor.execute("""
-        SELECT region, COUNT(*) as count, 
-               SUM(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END) as positive,
-               SUM(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END) as negative,
-               SUM(CASE WHEN sentiment = 'neutral' THEN 1 ELSE 0 END) as neutral
-        FROM tweet_sentiment 
-        GROUP BY region 
-        ORDER BY count DESC
-    """)
-    
-    results = cursor.fetchall()
-    print("\n📊 REGION-WISE SUMMARY:")
-    print("=" * 80)
-    for row in results:
-        region, count, positive, negative, neutral = row
-        sentiment_ratio = (positive - negative) / count if count > 0 else 0
-        print(f"{region:30} | Messages: {count:4} | Sentiment: {sentiment_ratio:+.2f} | +{positive} -{negative} ={neutral}")
-
-except mysql.connector.Error as e:
-    print("❌ MySQL Error:", e)
-
-finally:
-    if 'cursor' in locals(): cursor.close()
-    if 'conn' in locals(): conn.close()
\ No newline at end of file
+# ---------- INCREMENTAL INGESTION ----------
+class IngestProgress:
+    """
+    Filters already-ingested tweets out of the input stream and advances
+    the checkpoint / seen-id store as chunks are committed
+    """
+
+    def __init__(self, input_path, offset, checkpoint, seen_ids=None):
+        self.input_path = input_path
+        self.offset = offset            # input position of the next unread tweet
+        self.checkpoint = checkpoint
+        self.seen_ids = seen_ids
+        self.already_ingested = 0
+        self._positions = deque()       # input positions of rows not yet committed
+
+    def fresh_tweets(self, tweets):
+        """Yield tweets that still need scoring, remembering their input positions"""
+        for position, tweet in enumerate(tweets, start=self.offset):
+            self.offset = position + 1
+            if self.seen_ids is not None and tweet['id'] in self.seen_ids:
+                self.already_ingested += 1
+                continue
+            self._positions.append(position)
+            yield tweet
+
+    def on_commit(self, chunk, inserted):
+        for _ in chunk:
+            position = self._positions.popleft()
+        if self.seen_ids is not None:
+            self.seen_ids.add(row[0] for row in chunk)
+        self.checkpoint.advance(position + 1, chunk, inserted)
+
+    def finish(self):
+        self.checkpoint.finish(self.offset)
+
+# ---------- MAIN ----------
+def main():
+    parser = argparse.ArgumentParser(description="Score tweets and load them into MySQL")
+    parser.add_argument("--input", default=None,
+                        help="tweet dump written by twitter_scraper.py (JSONL, or a legacy JSON array)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes for sentiment/region scoring (default: 1, no pool)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE,
+                        help="tweets per worker task")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="rows per INSERT statement and commit")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip tweet ids ingested by earlier runs before scoring them")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run over the same input from its checkpoint")
+    parser.add_argument("--sentiment-backend", choices=SCORERS, default=SENTIMENT_BACKEND,
+                        help="sentiment scorer (default: $SENTIMENT_BACKEND, else textblob)")
+    parser.add_argument("--memo-size", type=int, default=MEMO_SIZE,
+                        help="distinct normalized texts whose scores are cached (0 disables the cache)")
+    parser.add_argument("--memo-path", nargs="?", const=MEMO_PATH, default=None,
+                        help=f"load the score cache from this file and save it after the run (default: {MEMO_PATH})")
+    parser.add_argument("--analytics-store", nargs="?", const="", default=os.environ.get("ANALYTICS_STORE"),
+                        help="also append inserted rows to this columnar analytics store "
+                             "(default: $ANALYTICS_STORE; backend/.analytics without a value)")
+    args = parser.parse_args()
+
+    # ---------- LOAD TWEETS ----------
+    input_path = args.input
+    if input_path is None:
+        input_path = INPUT_PATH if os.path.exists(INPUT_PATH) else LEGACY_INPUT_PATH
+    if not os.path.exists(input_path):
+        print(f"❌ '{input_path}' not found. Run scraper first.")
+        return
+
+    checkpoint = IngestCheckpoint()
+    offset = checkpoint.resume_offset(input_path) if args.resume else 0
+    if args.resume:
+        print(f"⏩ Resuming {input_path} after {offset} tweets.")
+    seen_ids = SeenIds() if args.incremental else None
+    if seen_ids is not None:
+        print(f"🧾 {len(seen_ids)} tweet ids already ingested.")
+    progress = IngestProgress(input_path, offset, checkpoint, seen_ids)
+    memo = TextMemo(args.memo_size, args.sentiment_backend)
+    if args.memo_path:
+        print(f"🧠 Loaded {memo.load(args.memo_path)} cached scores from {args.memo_path}")
+    analytics = None
+    if args.analytics_store is not None:
+        from analytics_store import ANALYTICS_STORE_PATH, ColumnStore  # NumPy only when enabled
+        analytics = ColumnStore(args.analytics_store or ANALYTICS_STORE_PATH)
+        print(f"🗄️ Appending to the analytics store in {analytics.path} ({len(analytics)} rows)")
+
+    # Streamed: only one shard per worker is held in memory at a time
+    tweets = progress.fresh_tweets(islice(iter_tweets(input_path), offset, None))
+    print(f"📂 Reading tweets from {input_path}")
+
+    # ---------- CONNECT TO MYSQL ----------
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+        print("✅ Connected to MySQL.")
+
+        # ---------- VERIFY TABLE STRUCTURE ----------
+        cursor.execute("DESCRIBE tweet_sentiment")
+        columns = cursor.fetchall()
+        print("📋 Current table structure:")
+        for col in columns:
+            print(f"   {col[0]} - {col[1]}")
+        if not schema_is_current(cursor):
+            print("❌ Database schema is out of date. Run: python backend/migrate.py")
+            return
+
+        print(f"🧮 Sentiment backend: {scorer_identity(args.sentiment_backend)}")
+        if args.workers > 1:
+            print(f"⚙️ Scoring with {args.workers} worker processes.")
+
+        checkpoint.start(input_path, offset)
+        rows = (to_row(*enriched) for enriched in iter_enriched(tweets, args.workers, args.shard_size, memo,
+                                                                      args.sentiment_backend))
+        inserted, skipped = bulk_insert(conn, cursor, rows, args.batch_size, on_commit=progress.on_commit,
+                                        analytics=analytics)
+        progress.finish()
+        print(memo.status_line())
+        if args.memo_path:
+            memo.save(args.memo_path)
+        if progress.already_ingested:
+            print(f"⏭️ Skipped {progress.already_ingested} tweets ingested by earlier runs.")
+        if inserted + skipped == 0:
+            print("⚠️ No new tweets to process.")
+            return
+        print(f"💾 Uploaded {inserted} new tweet records to MySQL ({skipped} duplicates skipped).")
+
+        # Print summary by region
+        cursor.execute("""
+            SELECT region, COUNT(*) as count,
+                   SUM(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END) as positive,
+                   SUM(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END) as negative,
+                   SUM(CASE WHEN sentiment = 'neutral' THEN 1 ELSE 0 END) as neutral,
+                   AVG(polarity) as mean_polarity
+            FROM tweet_sentiment
+            GROUP BY region
+            ORDER BY count DESC
+        """)
+
+        results = cursor.fetchall()
+        print("\n📊 REGION-WISE SUMMARY:")
+        print("=" * 80)
+        for row in results:
+            region, count, positive, negative, neutral, mean_polarity = row
+            sentiment_ratio = (positive - negative) / count if count > 0 else 0
+            print(f"{region:30} | Messages: {count:4} | Sentiment: {sentiment_ratio:+.2f} | "
+                  f"Polarity: {mean_polarity or 0:+.2f} | +{positive} -{negative} ={neutral}")
+
+    except mysql.connector.Error as e:
+        print("❌ MySQL Error:", e)
+
+    finally:
+        if 'cursor' in locals(): cursor.close()
+        if 'conn' in locals(): conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Embedded columnar store for the dashboard aggregates (optional backend).
+
+An append-only directory of raw NumPy column files, one directory per UTC
+day of created_at:
+
+    <root>/manifest.json        committed row count per day + dictionaries
+    <root>/2024-05-01/second.bin   uint32  seconds since midnight
+                     /state.bin    uint16  code into dictionary["state"]
+                     /city.bin     uint16  code into dictionary["city"]
+                     /transport.bin uint8  index into TRANSPORT_TYPES
+                     /sentiment.bin uint8  index into SENTIMENTS
+
+Ingestion appends the rows each chunk actually inserted (10 bytes per
+tweet). The API memory-maps the files and answers /api/analytics/trends
+and /api/states with np.bincount scans. Per-day counts are cached by row
+count, so a repeated query only rescans days that received rows. No
+server is involved: readers and writers share the files.
+
+Readers only trust the row counts in manifest.json, which a writer
+replaces atomically after the column data is on disk. Writers in several
+processes (pipeline.py, analyse_sentiment.py, migrate.py) take an
+exclusive lock on <root>.lock and reload the manifest before appending,
+so they never mistake each other's rows for a torn append or reassign
+dictionary codes; rows beyond the manifest counts are truncated.
+
+Enable with ANALYTICS_STORE=<dir> for ingestion and the API, and backfill
+from MySQL with `python backend/migrate.py --rebuild-analytics`.
+"""
+import contextlib
+import datetime
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # no flock (Windows): only WRITER_LOCK serializes writers
+    fcntl = None
+
+from rollups import SENTIMENTS
+from transport import DEFAULT_TRANSPORT_TYPE, TRANSPORT_TYPES
+
+ANALYTICS_STORE_PATH = "backend/.analytics"
+TRENDS_DAYS = 7  # window of /api/analytics/trends
+
+COLUMNS = {
+    "second": np.uint32,
+    "state": np.uint16,
+    "city": np.uint16,
+    "transport": np.uint8,
+    "sentiment": np.uint8,
+}
+DICTIONARY_COLUMNS = ("state", "city")
+_TRANSPORT_CODES = {transport_type: code for code, transport_type in enumerate(TRANSPORT_TYPES)}
+_SENTIMENT_CODES = {sentiment: code for code, sentiment in enumerate(SENTIMENTS)}
+
+
+def _created_at_parts(created_at):
+    """('YYYY-MM-DD', seconds since midnight) of a created_at string or datetime"""
+    if not isinstance(created_at, str):
+        created_at = created_at.isoformat()
+    return created_at[:10], int(created_at[11:13]) * 3600 + int(created_at[14:16]) * 60 + int(created_at[17:19])
+
+
+class ColumnStore:
+    def __init__(self, path=ANALYTICS_STORE_PATH):
+        self.path = path
+        self.partitions = {}  # day -> committed rows
+        self.dictionary = {column: [] for column in DICTIONARY_COLUMNS}
+        self._codes = {column: {} for column in DICTIONARY_COLUMNS}
+        self._generation = None
+        self._maps = {}    # (day, column) -> (rows, memmap)
+        self._counts = {}  # (day, kind) -> (shape key, counts)
+        self._lock = threading.Lock()
+        self.refresh()
+
+    # ---------- MANIFEST ----------
+    def _manifest_path(self):
+        return os.path.join(self.path, "manifest.json")
+
+    def generation(self):
+        """Changes whenever rows are committed (for API cache keys)"""
+        try:
+            stat = os.stat(self._manifest_path())
+        except FileNotFoundError:
+            return None
+        # Every save replaces the file, so the inode changes even within one mtime tick
+        return stat.st_ino, stat.st_mtime_ns
+
+    def refresh(self):
+        """Pick up rows committed by the writer since the last call"""
+        with self._lock:
+            generation = self.generation()
+            if generation == self._generation:
+                return
+            if generation is not None:
+                with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                self.partitions = manifest["partitions"]
+                self.dictionary = manifest["dictionary"]
+                self._codes = {column: {value: code for code, value in enumerate(values)}
+                               for column, values in self.dictionary.items()}
+            self._generation = generation
+
+    def _save_manifest(self):
+        os.makedirs(self.path, exist_ok=True)
+        manifest = {"partitions": self.partitions, "dictionary": self.dictionary,
+                    "updated_at": datetime.datetime.now().isoformat(timespec="seconds")}
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path())
+        self._generation = self.generation()
+
+    def __len__(self):
+        return sum(self.partitions.values())
+
+    # ---------- WRITING ----------
+    def codes(self, column, values):
+        """Dictionary codes of `values` in a DICTIONARY_COLUMNS column, adding new ones"""
+        codes = self._codes[column]
+        for value in values:
+            if value not in codes:
+                codes[value] = len(self.dictionary[column])
+                self.dictionary[column].append(value)
+        return [codes[value] for value in values]
+
+    def append(self, rows):
+        """
+        Append (id, text, created_at, sentiment, region, transport_type,
+        state, city, ...) rows that were just inserted into tweet_sentiment
+        """
+        by_day = {}
+        for _id, _text, created_at, sentiment, _region, transport_type, state, city, *_scores in rows:
+            day, second = _created_at_parts(created_at)
+            by_day.setdefault(day, []).append((second, state or "India", city or "",
+                                               _TRANSPORT_CODES.get(transport_type or DEFAULT_TRANSPORT_TYPE, 0),
+                                               _SENTIMENT_CODES.get(sentiment, SENTIMENTS.index("neutral"))))
+        with self._exclusive():
+            self.refresh()
+            with self._lock:
+                for day, day_rows in by_day.items():
+                    seconds, states, cities, transports, sentiments = zip(*day_rows)
+                    self._append_arrays(day, {
+                        "second": seconds,
+                        "state": self.codes("state", states),
+                        "city": self.codes("city", cities),
+                        "transport": transports,
+                        "sentiment": sentiments,
+                    })
+                if by_day:
+                    self._save_manifest()
+
+    def append_arrays(self, day, columns):
+        """Append already encoded columns (COLUMNS -> equal-length arrays) to one day"""
+        with self._exclusive():
+            self.refresh()
+            with self._lock:
+                self._append_arrays(day, columns)
+                self._save_manifest()
+
+    @contextlib.contextmanager
+    def _exclusive(self):
+        """Hold <root>.lock, shared by the writers of every process"""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path.rstrip(os.sep) + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _append_arrays(self, day, columns):
+        directory = os.path.join(self.path, day)
+        os.makedirs(directory, exist_ok=True)
+        committed = self.partitions.get(day, 0)
+        for column, dtype in COLUMNS.items():
+            path = os.path.join(directory, f"{column}.bin")
+            with open(path, "ab") as f:
+                # Drop rows of an append that died before its manifest update
+                if f.tell() != committed * np.dtype(dtype).itemsize:
+                    f.truncate(committed * np.dtype(dtype).itemsize)
+                np.asarray(columns[column], dtype=dtype).tofile(f)
+        self.partitions[day] = committed + len(columns["second"])
+
+    def clear(self):
+        """Delete every partition (before a rebuild)"""
+        with self._exclusive(), self._lock:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.partitions = {}
+            self.dictionary = {column: [] for column in DICTIONARY_COLUMNS}
+            self._codes = {column: {} for column in DICTIONARY_COLUMNS}
+            self._maps.clear()
+            self._counts.clear()
+            self._save_manifest()
+
+    # ---------- SCANS ----------
+    def column(self, day, column):
+        """Memory-mapped committed rows of one column of one day"""
+        rows = self.partitions[day]
+        cached = self._maps.get((day, column))
+        if cached is None or cached[0] != rows:
+            if rows == 0:
+                return np.empty(0, dtype=COLUMNS[column])
+            data = np.memmap(os.path.join(self.path, day, f"{column}.bin"), dtype=COLUMNS[column],
+                             mode="r", shape=(rows,))
+            cached = self._maps[(day, column)] = (rows, data)
+        return cached[1]
+
+    def _day_counts(self, day, kind):
+        """
+        Counts of one day, cached until the day gets new rows:
+          "hourly"  shape (24, states, cities, 3) by hour/state/city/sentiment
+          "states"  shape (states, transports, 3) by state/transport/sentiment
+        """
+        n_states, n_cities = len(self.dictionary["state"]), len(self.dictionary["city"])
+        shape_key = (self.partitions[day], n_states, n_cities)
+        cached = self._counts.get((day, kind))
+        if cached is not None and cached[0] == shape_key:
+            return cached[1]
+        n_sentiments = len(SENTIMENTS)
+        sentiment = self.column(day, "sentiment")
+        state = self.column(day, "state").astype(np.int64)
+        if kind == "hourly":
+            shape = (24, n_states, n_cities, n_sentiments)
+            hour = (self.column(day, "second") // 3600).astype(np.int64)
+            key = ((hour * n_states + state) * n_cities + self.column(day, "city")) * n_sentiments + sentiment
+        else:
+            shape = (n_states, len(TRANSPORT_TYPES), n_sentiments)
+            key = (state * len(TRANSPORT_TYPES) + self.column(day, "transport")) * n_sentiments + sentiment
+        counts = np.bincount(key, minlength=int(np.prod(shape))).reshape(shape)
+        self._counts[(day, kind)] = (shape_key, counts)
+        return counts
+
+    def trends_rows(self, now=None):
+        """
+        Rows like queries.TRENDS_SQL (date, hour, state, city, positive,
+        negative, neutral) for the hours of the last TRENDS_DAYS days (UTC),
+        newest hour first
+        """
+        self.refresh()
+        now = now or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        cutoff = (now - datetime.timedelta(days=TRENDS_DAYS)).replace(minute=0, second=0, microsecond=0)
+        states, cities = self.dictionary["state"], self.dictionary["city"]
+        rows = []
+        with self._lock:
+            for day in sorted(self.partitions, reverse=True):
+                date = datetime.date.fromisoformat(day)
+                if date < cutoff.date():
+                    break
+                counts = self._day_counts(day, "hourly")
+                if date == cutoff.date():
+                    counts = counts.copy()
+                    counts[:cutoff.hour] = 0
+                totals = counts.sum(axis=3)
+                hours, state_codes, city_codes = np.nonzero(totals)
+                order = np.lexsort((city_codes, state_codes, -hours))
+                hours, state_codes, city_codes = hours[order], state_codes[order], city_codes[order]
+                groups = zip(hours.tolist(), state_codes.tolist(), city_codes.tolist(),
+                             counts[hours, state_codes, city_codes].tolist())
+                for h, s, c, (positive, negative, neutral) in groups:
+                    rows.append({'date': date, 'hour': h, 'state': states[s], 'city': cities[c],
+                                 'positive': positive, 'negative': negative, 'neutral': neutral})
+        return rows
+
+    def states_rows(self, states=None):
+        """Rows like queries.states_summary_query, over all days, most messages first"""
+        self.refresh()
+        with self._lock:
+            total = np.zeros((len(self.dictionary["state"]), len(TRANSPORT_TYPES), len(SENTIMENTS)), dtype=np.int64)
+            for day in self.partitions:
+                total += self._day_counts(day, "states")
+        names = self.dictionary["state"]
+        wanted = None if states is None else set(states)
+        rows = []
+        for s, t in zip(*np.nonzero(total.sum(axis=2))):
+            if wanted is not None and names[s] not in wanted:
+                continue
+            positive, negative, neutral = total[s, t].tolist()
+            rows.append({'state': names[s], 'transport_type': TRANSPORT_TYPES[t],
+                         'total_messages': positive + negative + neutral, 'positive_count': positive,
+                         'negative_count': negative, 'neutral_count': neutral})
+        rows.sort(key=lambda row: (-row['total_messages'], row['state'], row['transport_type']))
+        return rows
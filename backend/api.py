@@ -1,11 +1,21 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 import mysql.connector
-from collections import defaultdict
-import datetime
+import os
+from functools import wraps
+
+from cache import DataVersionWatcher, EncodedBody, ResponseCache
+from db_pool import ConnectionPool
+from feed import FeedHub
+from live_trends import LiveTrends
+from queries import (COUNT_TWEETS_SQL, TRENDS_SQL, BadRequest, format_polarity, format_state_details, format_trends,
+                     format_tweet, live_trends_params, polarity_queries, state_details_query, states_summary_query,
+                     summarize_states, tweets_page, tweets_query)
 
 app = Flask(__name__)
-CORS(app)
+# Compact even under debug=True, so bodies (and ETags) match asgi_api.json_response
+app.json.compact = True
+CORS(app, expose_headers=['X-Next-Cursor', 'ETag'])
 
 # --- MySQL Configuration ---
 db_config = {
@@ -15,41 +25,112 @@ db_config = {
     'database': 'transport_sentiment_app'
 }
 
-# --- Helper Functions ---
-def determine_transport_type(text):
-    """Enhanced transport type detection"""
-    text = text.lower()
-    if any(keyword in text for keyword in ['metro', 'मेट्रो', 'subway', 'dmrc']):
-        return "metro"
-    elif any(keyword in text for keyword in ['train', 'ट्रेन', 'railway', 'irctc', 'local train']):
-        return "train"
-    elif any(keyword in text for keyword in ['auto', 'ऑटो', 'rickshaw', 'three wheeler']):
-        return "auto"
-    elif any(keyword in text for keyword in ['taxi', 'टैक्सी', 'cab', 'ola', 'uber']):
-        return "taxi"
-    else:
-        return "bus"  # default fallback
-
-def determine_sentiment_score(label):
-    return {
-        'positive': 0.5,
-        'negative': -0.5,
-        'neutral': 0
-    }.get(label.lower(), 0)
-
-def extract_state_from_region(region):
-    """Extract state name from region field"""
-    if ',' in region:
-        return region.split(',')[-1].strip()
-    return region
-
-def get_db_connection():
-    """Get database connection with error handling"""
-    try:
-        return mysql.connector.connect(**db_config)
-    except mysql.connector.Error as err:
-        print(f"Database connection error: {err}")
-        return None
+# Shared connection pool; DB_POOL_SIZE=0 falls back to connect-per-request
+db_pool = ConnectionPool(
+    db_config,
+    size=int(os.environ.get('DB_POOL_SIZE', 8)),
+    timeout=float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+)
+
+# Response cache for the read routes, dropped whenever ingestion bumps data_version
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('API_CACHE_SIZE', 256)),
+    ttl=float(os.environ.get('API_CACHE_TTL', 30)),
+)
+data_version = DataVersionWatcher(
+    db_pool, response_cache, interval=float(os.environ.get('DATA_VERSION_POLL', 1)),
+)
+
+# Optional columnar store serving the trends/states aggregates (analytics_store.py)
+analytics_store = None
+if os.environ.get('ANALYTICS_STORE'):
+    from analytics_store import ColumnStore
+    analytics_store = ColumnStore(os.environ['ANALYTICS_STORE'])
+
+# Sliding-window trend/spike aggregates, kept in step with new rows (live_trends.py)
+live_trends = LiveTrends(interval=float(os.environ.get('LIVE_TRENDS_POLL', 1)))
+
+def analytics_generation():
+    """Part of the cache key: the store is appended to after ingestion's commit"""
+    return analytics_store.generation() if analytics_store is not None else None
+
+def query_states_summary(cursor, states=None):
+    """/api/states entries, for all states or only the given ones"""
+    cursor.execute(*states_summary_query(states))
+    return summarize_states(cursor.fetchall())
+
+def cached_response(view):
+    """
+    Serve successful responses of a read route from response_cache as
+    pre-serialized (and pre-compressed) bytes, with a strong ETag so
+    unchanged polls get 304 Not Modified
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        data_version.check()
+        # The version read before running the view: an entry computed while
+        # a new batch lands is filed under the old version and never served
+        key = (data_version.version, analytics_generation(), request.path,
+               tuple(sorted(request.args.items(multi=True))))
+        cached = response_cache.get(key)
+        if cached is None:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            cached = EncodedBody(response.get_data(), response.mimetype, response.headers.get('X-Next-Cursor'))
+            response_cache.set(key, cached)
+
+        encoding = cached.negotiate(request.accept_encodings)
+        data, etag = cached.variant(encoding)
+        if any(request.if_none_match.contains(tag) for tag in cached.etags()):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(data, mimetype=cached.mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        if cached.next_cursor:
+            response.headers['X-Next-Cursor'] = cached.next_cursor
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'  # always revalidate; 304s are cheap
+        return response
+    return wrapper
+
+# --- Push Feed ---
+FEED_BATCH_SIZE = 500  # new tweets per feed event
+FEED_COLUMNS = ("seq, id, text, created_at, sentiment, polarity, subjectivity, confidence, region, transport_type, "
+                "state, city")
+
+def fetch_feed_changes(after_seq, until_seq=None):
+    """
+    Tweets ingested after `after_seq` (in insertion order) plus the
+    refreshed aggregates of the states they touched
+    """
+    with db_pool.cursor(dictionary=True) as cursor:
+        cursor.execute(f"""
+            SELECT {FEED_COLUMNS} FROM tweet_sentiment
+            WHERE seq > %s AND seq <= %s
+            ORDER BY seq
+            LIMIT %s
+        """, (after_seq, until_seq if until_seq is not None else 2**63, FEED_BATCH_SIZE))
+        rows = cursor.fetchall()
+        if not rows:
+            return after_seq, []
+        states = sorted({row['state'] for row in rows if row['state']})
+        states_data = query_states_summary(cursor, states) if states else []
+    tweets = [format_tweet(row) for row in reversed(rows)]  # newest first, like /api/tweets
+    events = [('tweets', tweets)]
+    if states_data:
+        events.append(('states', states_data))
+    return rows[-1]['seq'], events
+
+def current_feed_seq():
+    with db_pool.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM tweet_sentiment")
+        return cursor.fetchone()[0]
+
+feed_hub = FeedHub(fetch_feed_changes, current_feed_seq,
+                   interval=float(os.environ.get('FEED_POLL_INTERVAL', 1)))
 
 # --- Routes ---
 
@@ -57,24 +138,27 @@ def get_db_connection():
 def status():
     """API health check"""
     try:
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM tweet_sentiment")
+        with db_pool.cursor() as cursor:
+            cursor.execute(COUNT_TWEETS_SQL)
             count = cursor.fetchone()[0]
-            cursor.close()
-            conn.close()
-            return jsonify({
-                'status': 'API is running!',
-                'database': 'connected',
-                'total_tweets': count
-            })
-        else:
-            return jsonify({
-                'status': 'API is running!',
-                'database': 'disconnected',
-                'total_tweets': 0
-            }), 500
+        return jsonify({
+            'status': 'API is running!',
+            'database': 'connected',
+            'total_tweets': count,
+            'pool': db_pool.stats(),
+            'cache': response_cache.stats(),
+            'data_version': data_version.version,
+            'feed': feed_hub.stats(),
+            'live_trends': live_trends.stats()
+        })
+    except mysql.connector.Error as err:
+        print(f"Database connection error: {err}")
+        return jsonify({
+            'status': 'API is running!',
+            'database': 'disconnected',
+            'total_tweets': 0,
+            'pool': db_pool.stats()
+        }), 500
     except Exception as e:
         return jsonify({
             'status': 'API is running!',
@@ -83,54 +167,24 @@ def status():
         }), 500
 
 @app.route('/api/tweets')
+@cached_response
 def get_tweets():
-    """Get recent tweets with sentiment analysis"""
+    """Get recent tweets with sentiment analysis, newest first (parameters: queries.tweets_query)"""
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"error": "Database connection failed"}), 500
-            
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT * FROM tweet_sentiment 
-            ORDER BY created_at DESC 
-            LIMIT 100
-        """)
-        rows = cursor.fetchall()
+        sql, params, fields, limit = tweets_query(request.args)
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
 
-        tweets = []
-        for row in rows:
-            sentiment_label = row.get('sentiment', 'neutral')
-            transport_type = determine_transport_type(row.get('text', ''))
-            region = row.get('region', 'India')
-            
-            # Extract state and city from region
-            if ',' in region:
-                city, state = region.split(',', 1)
-                city = city.strip()
-                state = state.strip()
-            else:
-                state = region
-                city = region
-            
-            tweets.append({
-                "id": row['id'],
-                "text": row['text'],
-                "timestamp": row['created_at'].isoformat() if row['created_at'] else datetime.datetime.now().isoformat(),
-                "location": region,
-                "state": state,
-                "city": city,
-                "transportType": transport_type,
-                "sentiment": {
-                    "polarity": determine_sentiment_score(sentiment_label),
-                    "label": sentiment_label,
-                    "confidence": 0.85  # dummy value, can be enhanced
-                }
-            })
-
-        cursor.close()
-        conn.close()
-        return jsonify(tweets)
+    try:
+        with db_pool.cursor(dictionary=True) as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        tweets, next_cursor = tweets_page(rows, fields, limit)
+        response = jsonify(tweets)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
 
     except mysql.connector.Error as err:
         return jsonify({"error": f"Database error: {str(err)}"}), 500
@@ -138,76 +192,14 @@ def get_tweets():
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 @app.route('/api/states')
+@cached_response
 def get_states_summary():
     """Get aggregated sentiment data by state"""
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"error": "Database connection failed"}), 500
-            
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                region,
-                COUNT(*) as total_messages,
-                SUM(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END) as positive_count,
-                SUM(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END) as negative_count,
-                SUM(CASE WHEN sentiment = 'neutral' THEN 1 ELSE 0 END) as neutral_count
-            FROM tweet_sentiment 
-            GROUP BY region
-            ORDER BY total_messages DESC
-        """)
-        rows = cursor.fetchall()
-
-        # Group by state
-        state_data = defaultdict(lambda: {
-            'total_messages': 0,
-            'positive_count': 0,
-            'negative_count': 0,
-            'neutral_count': 0,
-            'transport_breakdown': {'bus': 0, 'metro': 0, 'train': 0, 'auto': 0, 'taxi': 0}
-        })
-
-        # Get all tweets for transport type analysis
-        cursor.execute("SELECT text, region FROM tweet_sentiment")
-        all_tweets = cursor.fetchall()
-        
-        for tweet in all_tweets:
-            transport_type = determine_transport_type(tweet['text'])
-            state = extract_state_from_region(tweet['region'])
-            state_data[state]['transport_breakdown'][transport_type] += 1
-
-        states_data = []
-        for row in rows:
-            region = row['region']
-            state = extract_state_from_region(region)
-            
-            # Aggregate data by state
-            state_info = state_data[state]
-            state_info['total_messages'] += row['total_messages']
-            state_info['positive_count'] += row['positive_count']
-            state_info['negative_count'] += row['negative_count']
-            state_info['neutral_count'] += row['neutral_count']
-
-        # Convert to final format
-        for state, data in state_data.items():
-            if data['total_messages'] > 0:
-                sentiment_score = (data['positive_count'] - data['negative_count']) / data['total_messages']
-                
-                states_data.append({
-                    "state": state,
-                    "sentimentScore": sentiment_score,
-                    "totalMessages": data['total_messages'],
-                    "transportBreakdown": data['transport_breakdown'],
-                    "sentimentBreakdown": {
-                        "positive": data['positive_count'],
-                        "negative": data['negative_count'],
-                        "neutral": data['neutral_count']
-                    }
-                })
-
-        cursor.close()
-        conn.close()
+        if analytics_store is not None:
+            return jsonify(summarize_states(analytics_store.states_rows()))
+        with db_pool.cursor(dictionary=True) as cursor:
+            states_data = query_states_summary(cursor)
         return jsonify(states_data)
 
     except mysql.connector.Error as err:
@@ -216,42 +208,16 @@ def get_states_summary():
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 @app.route('/api/states/<state_name>')
+@cached_response
 def get_state_details(state_name):
-    """Get detailed data for a specific state"""
+    """Get detailed data for a specific state (optionally one city: ?city=Pune)"""
+    city = request.args.get('city')
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"error": "Database connection failed"}), 500
-            
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                region,
-                text,
-                sentiment,
-                created_at
-            FROM tweet_sentiment 
-            WHERE region LIKE %s
-            ORDER BY created_at DESC
-            LIMIT 50
-        """, (f'%{state_name}%',))
-        rows = cursor.fetchall()
+        with db_pool.cursor(dictionary=True) as cursor:
+            cursor.execute(*state_details_query(state_name, city))
+            rows = cursor.fetchall()
 
-        # Process the data
-        result = []
-        for row in rows:
-            transport_type = determine_transport_type(row['text'])
-            result.append({
-                'region': row['region'],
-                'text': row['text'],
-                'sentiment': row['sentiment'],
-                'transport_type': transport_type,
-                'created_at': row['created_at'].isoformat() if row['created_at'] else None
-            })
-
-        cursor.close()
-        conn.close()
-        return jsonify(result)
+        return jsonify(format_state_details(rows))
 
     except mysql.connector.Error as err:
         return jsonify({"error": f"Database error: {str(err)}"}), 500
@@ -259,51 +225,90 @@ def get_state_details(state_name):
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 @app.route('/api/analytics/trends')
+@cached_response
 def get_sentiment_trends():
     """Get sentiment trends over time"""
     try:
-        conn = get_db_connection()
-        if not conn:
-            return jsonify({"error": "Database connection failed"}), 500
-            
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                DATE(created_at) as date,
-                HOUR(created_at) as hour,
-                region,
-                sentiment,
-                COUNT(*) as message_count
-            FROM tweet_sentiment 
-            WHERE created_at >= DATE_SUB(NOW(), INTERVAL 7 DAY)
-            GROUP BY DATE(created_at), HOUR(created_at), region, sentiment
-            ORDER BY date DESC, hour DESC
-        """)
-        rows = cursor.fetchall()
+        if analytics_store is not None:
+            return jsonify(format_trends(analytics_store.trends_rows()))
+        with db_pool.cursor(dictionary=True) as cursor:
+            cursor.execute(TRENDS_SQL)
+            rows = cursor.fetchall()
+
+        return jsonify(format_trends(rows))
+
+    except mysql.connector.Error as err:
+        return jsonify({"error": f"Database error: {str(err)}"}), 500
+    except Exception as e:
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@app.route('/api/analytics/polarity')
+@cached_response
+def get_polarity_stats():
+    """Mean polarity/subjectivity/confidence and polarity percentiles per state and hour"""
+    try:
+        (sums_sql, sums_params), (percentiles_sql, percentiles_params) = polarity_queries(request.args)
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        with db_pool.cursor(dictionary=True) as cursor:
+            cursor.execute(sums_sql, sums_params)
+            sum_rows = cursor.fetchall()
+            cursor.execute(percentiles_sql, percentiles_params)
+            percentile_rows = cursor.fetchall()
 
-        # Process trends data
-        trends = []
-        for row in rows:
-            state = extract_state_from_region(row['region'])
-            sentiment_score = determine_sentiment_score(row['sentiment'])
-            
-            trends.append({
-                'date': row['date'].isoformat() if row['date'] else None,
-                'hour': row['hour'],
-                'state': state,
-                'sentiment': sentiment_score,
-                'message_count': row['message_count']
-            })
-
-        cursor.close()
-        conn.close()
-        return jsonify(trends)
+        return jsonify(format_polarity(sum_rows, percentile_rows))
 
     except mysql.connector.Error as err:
         return jsonify({"error": f"Database error: {str(err)}"}), 500
     except Exception as e:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
+# Not cached: the windows move with the clock, not with data_version
+@app.route('/api/analytics/live')
+def get_live_trends():
+    """Rolling sentiment, deltas and negative spikes per state/transport (parameters: queries.live_trends_params)"""
+    try:
+        params = live_trends_params(request.args)
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        live_trends.refresh(db_pool)
+        return jsonify(live_trends.summary(**params))
+
+    except mysql.connector.Error as err:
+        return jsonify({"error": f"Database error: {str(err)}"}), 500
+    except Exception as e:
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+@app.route('/api/stream')
+def stream():
+    """
+    Server-Sent Events feed: `tweets` events carry newly ingested tweets,
+    `states` events the updated summaries of the states they touched
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+        subscription = feed_hub.subscribe()
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be an integer"}), 400
+    except mysql.connector.Error as err:
+        return jsonify({"error": f"Database error: {str(err)}"}), 500
+
+    def events():
+        try:
+            yield from feed_hub.stream(subscription, last_event_id)
+        finally:
+            feed_hub.unsubscribe(subscription)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # don't let a reverse proxy buffer the stream
+    })
+
 # --- Run Server ---
 if __name__ == '__main__':
     print("🚀 Starting Indian Transport Sentiment API...")
@@ -314,4 +319,7 @@ if __name__ == '__main__':
     print("   - /api/states - State-wise summary")
     print("   - /api/states/<state> - State details")
     print("   - /api/analytics/trends - Sentiment trends")
+    print("   - /api/analytics/polarity - Polarity means and percentiles")
+    print("   - /api/analytics/live - Rolling trends and spikes")
+    print("   - /api/stream - Live feed (Server-Sent Events)")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
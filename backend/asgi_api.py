@@ -0,0 +1,309 @@
+"""
+ASGI serving mode for the read API: the same routes and responses as
+api.py, served by Starlette on an asyncio event loop with an aiomysql
+connection pool. A request waiting on MySQL parks a coroutine instead of
+holding a worker thread, so one process keeps many slow queries in flight.
+
+Production (one event loop and pool per worker process):
+    uvicorn asgi_api:app --app-dir backend --host 0.0.0.0 --port 5000 --workers 4
+
+/api/stream (Server-Sent Events) is still served by api.py.
+"""
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from functools import wraps
+
+import aiomysql
+import pymysql
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import parse_accept_header, parse_etags
+
+from cache import READ_DATA_VERSION_SQL, DataVersionWatcher, EncodedBody, ResponseCache
+from live_trends import CURRENT_SEQ_SQL, END_SNAPSHOT_SQL, START_SNAPSHOT_SQL, LiveTrends
+from queries import (COUNT_TWEETS_SQL, TRENDS_SQL, BadRequest, format_polarity, format_state_details, format_trends,
+                     live_trends_params, polarity_queries, state_details_query, states_summary_query,
+                     summarize_states, tweets_page, tweets_query)
+
+# --- MySQL Configuration (same database as api.py) ---
+db_config = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'gadheullu12',  # your password if any
+    'db': 'transport_sentiment_app'
+}
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))  # connections per worker process
+DB_POOL_RECYCLE = 3600  # seconds; reconnect before MySQL's wait_timeout drops idle connections
+
+db_pool = None  # aiomysql.Pool, opened by the lifespan handler
+
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('API_CACHE_SIZE', 256)),
+    ttl=float(os.environ.get('API_CACHE_TTL', 30)),
+)
+data_version = DataVersionWatcher(
+    None, response_cache, interval=float(os.environ.get('DATA_VERSION_POLL', 1)),
+)
+
+# Optional columnar store serving the trends/states aggregates (analytics_store.py)
+analytics_store = None
+if os.environ.get('ANALYTICS_STORE'):
+    from analytics_store import ColumnStore
+    analytics_store = ColumnStore(os.environ['ANALYTICS_STORE'])
+
+# Sliding-window trend/spike aggregates, kept in step with new rows (live_trends.py)
+live_trends = LiveTrends(interval=float(os.environ.get('LIVE_TRENDS_POLL', 1)))
+live_trends_lock = asyncio.Lock()  # LiveTrends' own lock is a thread lock: never wait on it in the loop
+
+# --- Helper Functions ---
+async def fetch_all(sql, params=None):
+    """All rows of a query as dicts, on a pooled connection"""
+    async with db_pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            # pymysql %-formats the query whenever params is not None
+            await cursor.execute(sql, params or None)
+            return await cursor.fetchall()
+
+def pool_stats():
+    if db_pool is None:
+        return {'size': 0, 'max_size': DB_POOL_SIZE, 'idle': 0, 'in_use': 0}
+    return {
+        'size': db_pool.size,
+        'max_size': db_pool.maxsize,
+        'idle': db_pool.freesize,
+        'in_use': db_pool.size - db_pool.freesize,
+    }
+
+def json_response(data, status_code=200, headers=None):
+    # Serialized like Flask's jsonify so both servers produce the same bytes (and ETags)
+    body = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str).encode() + b'\n'
+    return Response(body, status_code=status_code, headers=headers, media_type='application/json')
+
+async def check_data_version():
+    if not data_version.begin_check():
+        return
+    version = None
+    try:
+        rows = await fetch_all(READ_DATA_VERSION_SQL)
+        version = rows[0]['version'] if rows else None
+    except pymysql.err.Error as err:
+        print(f"Data version check failed: {err}")
+    finally:
+        data_version.end_check(version)
+
+async def refresh_live_trends():
+    """LiveTrends.refresh on this server's pool: warm up once, then fold in new rows"""
+    async with live_trends_lock:
+        if not live_trends.begin_refresh():
+            return
+        try:
+            async with db_pool.acquire() as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    if live_trends.seq is None:
+                        await cursor.execute(START_SNAPSHOT_SQL)
+                        try:
+                            await cursor.execute(CURRENT_SEQ_SQL)
+                            seq = (await cursor.fetchone())['seq']
+                            results = {}
+                            for granularity, (sql, params) in live_trends.warm_up_queries(seq).items():
+                                await cursor.execute(sql, params)
+                                results[granularity] = await cursor.fetchall()
+                        finally:
+                            await cursor.execute(END_SNAPSHOT_SQL)
+                        await run_in_threadpool(live_trends.load, seq, results)
+                    more = True
+                    while more:
+                        await cursor.execute(*live_trends.poll_query())
+                        more = await run_in_threadpool(live_trends.apply, await cursor.fetchall())
+        finally:
+            live_trends.end_refresh()
+
+def cached_response(endpoint):
+    """api.cached_response for Starlette endpoints: cached bytes, ETag/304, gzip/br"""
+    @wraps(endpoint)
+    async def wrapper(request):
+        await check_data_version()
+        key = (data_version.version, analytics_store.generation() if analytics_store is not None else None,
+               request.url.path, tuple(sorted(request.query_params.multi_items())))
+        cached = response_cache.get(key)
+        if cached is None:
+            response = await endpoint(request)
+            if response.status_code != 200:
+                return response
+            cached = EncodedBody(response.body, response.media_type, response.headers.get('X-Next-Cursor'))
+            response_cache.set(key, cached)
+
+        encoding = cached.negotiate(parse_accept_header(request.headers.get('Accept-Encoding')))
+        data, etag = cached.variant(encoding)
+        headers = {
+            'ETag': f'"{etag}"',
+            'Vary': 'Accept-Encoding',
+            'Cache-Control': 'no-cache',  # always revalidate; 304s are cheap
+        }
+        if cached.next_cursor:
+            headers['X-Next-Cursor'] = cached.next_cursor
+        if_none_match = parse_etags(request.headers.get('If-None-Match'))
+        if any(if_none_match.contains(tag) for tag in cached.etags()):
+            return Response(status_code=304, headers=headers)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(data, headers=headers, media_type=cached.mimetype)
+    return wrapper
+
+# --- Routes ---
+async def status(request):
+    """API health check"""
+    try:
+        rows = await fetch_all(COUNT_TWEETS_SQL)
+        return json_response({
+            'status': 'API is running!',
+            'database': 'connected',
+            'total_tweets': next(iter(rows[0].values())),
+            'pool': pool_stats(),
+            'cache': response_cache.stats(),
+            'data_version': data_version.version,
+            'live_trends': live_trends.stats(),
+        })
+    except pymysql.err.Error as err:
+        print(f"Database connection error: {err}")
+        return json_response({
+            'status': 'API is running!',
+            'database': 'disconnected',
+            'total_tweets': 0,
+            'pool': pool_stats()
+        }, 500)
+    except Exception as e:
+        return json_response({
+            'status': 'API is running!',
+            'database': 'error',
+            'error': str(e)
+        }, 500)
+
+@cached_response
+async def get_tweets(request):
+    """Get recent tweets with sentiment analysis, newest first (parameters: queries.tweets_query)"""
+    try:
+        sql, params, fields, limit = tweets_query(request.query_params)
+    except BadRequest as e:
+        return json_response({"error": str(e)}, 400)
+
+    try:
+        tweets, next_cursor = tweets_page(await fetch_all(sql, params), fields, limit)
+        return json_response(tweets, headers={'X-Next-Cursor': next_cursor} if next_cursor else None)
+    except pymysql.err.Error as err:
+        return json_response({"error": f"Database error: {str(err)}"}, 500)
+    except Exception as e:
+        return json_response({"error": f"Server error: {str(e)}"}, 500)
+
+@cached_response
+async def get_states_summary(request):
+    """Get aggregated sentiment data by state"""
+    try:
+        if analytics_store is not None:
+            # Vectorized scan: off the event loop
+            return json_response(summarize_states(await run_in_threadpool(analytics_store.states_rows)))
+        return json_response(summarize_states(await fetch_all(*states_summary_query())))
+    except pymysql.err.Error as err:
+        return json_response({"error": f"Database error: {str(err)}"}, 500)
+    except Exception as e:
+        return json_response({"error": f"Server error: {str(e)}"}, 500)
+
+@cached_response
+async def get_state_details(request):
+    """Get detailed data for a specific state (optionally one city: ?city=Pune)"""
+    sql, params = state_details_query(request.path_params['state_name'], request.query_params.get('city'))
+    try:
+        return json_response(format_state_details(await fetch_all(sql, params)))
+    except pymysql.err.Error as err:
+        return json_response({"error": f"Database error: {str(err)}"}, 500)
+    except Exception as e:
+        return json_response({"error": f"Server error: {str(e)}"}, 500)
+
+@cached_response
+async def get_sentiment_trends(request):
+    """Get sentiment trends over time"""
+    try:
+        if analytics_store is not None:
+            return json_response(format_trends(await run_in_threadpool(analytics_store.trends_rows)))
+        return json_response(format_trends(await fetch_all(TRENDS_SQL)))
+    except pymysql.err.Error as err:
+        return json_response({"error": f"Database error: {str(err)}"}, 500)
+    except Exception as e:
+        return json_response({"error": f"Server error: {str(e)}"}, 500)
+
+@cached_response
+async def get_polarity_stats(request):
+    """Mean polarity/subjectivity/confidence and polarity percentiles per state and hour"""
+    try:
+        sums, percentiles = polarity_queries(request.query_params)
+    except BadRequest as e:
+        return json_response({"error": str(e)}, 400)
+
+    try:
+        return json_response(format_polarity(await fetch_all(*sums), await fetch_all(*percentiles)))
+    except pymysql.err.Error as err:
+        return json_response({"error": f"Database error: {str(err)}"}, 500)
+    except Exception as e:
+        return json_response({"error": f"Server error: {str(e)}"}, 500)
+
+# Not cached: the windows move with the clock, not with data_version
+async def get_live_trends(request):
+    """Rolling sentiment, deltas and negative spikes per state/transport (parameters: queries.live_trends_params)"""
+    try:
+        params = live_trends_params(request.query_params)
+    except BadRequest as e:
+        return json_response({"error": str(e)}, 400)
+
+    try:
+        await refresh_live_trends()
+        return json_response(live_trends.summary(**params))
+    except pymysql.err.Error as err:
+        return json_response({"error": f"Database error: {str(err)}"}, 500)
+    except Exception as e:
+        return json_response({"error": f"Server error: {str(e)}"}, 500)
+
+# --- App ---
+@asynccontextmanager
+async def lifespan(app):
+    global db_pool
+    # Connections are opened on demand up to maxsize (a database outage
+    # fails requests, not startup); aiomysql drops closed connections and
+    # recycles stale ones on checkout
+    db_pool = await aiomysql.create_pool(
+        minsize=0, maxsize=DB_POOL_SIZE, autocommit=True, pool_recycle=DB_POOL_RECYCLE, **db_config,
+    )
+    try:
+        yield
+    finally:
+        db_pool.close()
+        await db_pool.wait_closed()
+        db_pool = None
+
+app = Starlette(
+    routes=[
+        Route('/api/status', status),
+        Route('/api/tweets', get_tweets),
+        Route('/api/states', get_states_summary),
+        Route('/api/states/{state_name}', get_state_details),
+        Route('/api/analytics/trends', get_sentiment_trends),
+        Route('/api/analytics/polarity', get_polarity_stats),
+        Route('/api/analytics/live', get_live_trends),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], expose_headers=['X-Next-Cursor', 'ETag']),
+    ],
+    lifespan=lifespan,
+)
+
+# --- Run Server ---
+if __name__ == '__main__':
+    import uvicorn
+
+    print("🚀 Starting Indian Transport Sentiment API (ASGI)...")
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark: trends/states aggregates from the columnar analytics store.
+
+Writes --rows synthetic tweets (default 10M, spread over --days days up to
+now) into a temporary analytics_store.ColumnStore and times:
+  - the append rate and bytes per row on disk
+  - /api/analytics/trends rows (last 7 days by hour/state/city) and
+    /api/states rows (all days by state/transport), cold (fresh store
+    object, nothing cached) and warm (per-day counts cached)
+  - the same after a small ingest into today's partition (only today is
+    rescanned)
+For comparison it loads --baseline-rows of the same data into an SQLite
+row table and runs the raw GROUP BY DATE(created_at), HOUR(created_at)
+query the trends route used to run. It also checks that a store holding
+those rows returns the same counts.
+
+Usage: python backend/benchmarks/bench_analytics_store.py [--rows 10000000] [--days 30] [--baseline-rows 1000000]
+"""
+import argparse
+import datetime
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics_store import COLUMNS, TRENDS_DAYS, ColumnStore
+from regions import INDIAN_STATES_CITIES
+from rollups import SENTIMENTS
+from transport import TRANSPORT_TYPES
+
+TRENDS_SQLITE = """
+    SELECT date(created_at), CAST(strftime('%H', created_at) AS INTEGER), state, city,
+           SUM(sentiment = 'positive'), SUM(sentiment = 'negative'), SUM(sentiment = 'neutral')
+    FROM tweet_sentiment
+    WHERE created_at >= ?
+    GROUP BY 1, 2, 3, 4
+"""
+STATES_SQLITE = """
+    SELECT state, transport_type, COUNT(*),
+           SUM(sentiment = 'positive'), SUM(sentiment = 'negative'), SUM(sentiment = 'neutral')
+    FROM tweet_sentiment
+    GROUP BY 1, 2
+"""
+
+
+def generate(rows, days, now, rng):
+    """{day: encoded columns}, plus the state/city dictionaries the codes refer to"""
+    places = [(state, city) for state, cities in INDIAN_STATES_CITIES.items() for city in cities]
+    places += [(state, "") for state in INDIAN_STATES_CITIES]
+    states = list(INDIAN_STATES_CITIES)
+    cities = sorted({city for _, city in places})
+    place_state = np.array([states.index(state) for state, _ in places], dtype=np.uint16)
+    place_city = np.array([cities.index(city) for _, city in places], dtype=np.uint16)
+    # Skewed like real traffic: a few big cities get most tweets
+    weights = 1.0 / np.arange(1, len(places) + 1)
+    weights = rng.permutation(weights / weights.sum())
+
+    partitions = {}
+    per_day = np.full(days, rows // days)
+    per_day[: rows % days] += 1
+    for offset, count in enumerate(per_day):
+        day = (now - datetime.timedelta(days=days - 1 - offset)).date()
+        limit = now.hour * 3600 + now.minute * 60 if offset == days - 1 else 86400
+        place = rng.choice(len(places), size=count, p=weights)
+        partitions[day.isoformat()] = {
+            "second": np.sort(rng.integers(0, max(limit, 1), size=count, dtype=np.uint32)),
+            "state": place_state[place],
+            "city": place_city[place],
+            "transport": rng.integers(0, len(TRANSPORT_TYPES), size=count, dtype=np.uint8),
+            "sentiment": rng.choice(len(SENTIMENTS), size=count, p=[0.3, 0.3, 0.4]).astype(np.uint8),
+        }
+    return partitions, states, cities
+
+
+def timed(label, func, rows):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34}: {elapsed * 1000:9.1f}ms  ({rows / elapsed / 1e6:,.1f}M rows/s)  {len(result)} groups")
+    return result
+
+
+def load_store(path, partitions, states, cities):
+    store = ColumnStore(path)
+    store.codes("state", states)
+    store.codes("city", cities)
+    for day, columns in partitions.items():
+        store.append_arrays(day, columns)
+    return store
+
+
+def subset(partitions, rows):
+    """The newest `rows` rows of each day, proportionally"""
+    total = sum(len(columns["second"]) for columns in partitions.values())
+    fraction = min(rows / total, 1.0)
+    return {day: {name: values[-max(int(len(values) * fraction), 1):] for name, values in columns.items()}
+            for day, columns in partitions.items()}
+
+
+def sqlite_baseline(partitions, states, cities, cutoff):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""CREATE TABLE tweet_sentiment (created_at TEXT, state TEXT, city TEXT,
+                                                  transport_type TEXT, sentiment TEXT)""")
+    rows = 0
+    for day, columns in partitions.items():
+        midnight = datetime.datetime.fromisoformat(day)
+        conn.executemany("INSERT INTO tweet_sentiment VALUES (?, ?, ?, ?, ?)", (
+            ((midnight + datetime.timedelta(seconds=int(second))).isoformat(sep=" "), states[state], cities[city],
+             TRANSPORT_TYPES[transport], SENTIMENTS[sentiment])
+            for second, state, city, transport, sentiment in zip(*(columns[name].tolist() for name in COLUMNS))))
+        rows += len(columns["second"])
+    conn.execute("CREATE INDEX idx_created_at ON tweet_sentiment (created_at)")
+    trends = timed("sqlite trends (GROUP BY DATE/HOUR)",
+                   lambda: conn.execute(TRENDS_SQLITE, (cutoff.isoformat(sep=" "),)).fetchall(), rows)
+    summary = timed("sqlite states", lambda: conn.execute(STATES_SQLITE).fetchall(), rows)
+    return trends, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--baseline-rows", type=int, default=1_000_000,
+                        help="rows loaded into the SQLite comparison (0 skips it)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    cutoff = (now - datetime.timedelta(days=TRENDS_DAYS)).replace(minute=0, second=0, microsecond=0)
+    partitions, states, cities = generate(args.rows, args.days, now, rng)
+    in_window = sum(len(columns["second"]) for day, columns in partitions.items() if day >= cutoff.date().isoformat())
+
+    tmp = tempfile.mkdtemp(prefix="analytics_store_")
+    try:
+        print(f"{args.rows:,} rows over {args.days} days ({in_window:,} in the {TRENDS_DAYS}-day trends window)")
+        start = time.perf_counter()
+        store = load_store(os.path.join(tmp, "store"), partitions, states, cities)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(store.path) for name in names)
+        print(f"  {'append':<34}: {elapsed * 1000:9.1f}ms  ({args.rows / elapsed / 1e6:,.1f}M rows/s)  "
+              f"{size / 1e6:,.0f} MB ({size / args.rows:.1f} bytes/row)")
+
+        print("columnar store")
+        cold = ColumnStore(store.path)
+        timed("trends, cold", cold.trends_rows, in_window)
+        timed("states, cold", cold.states_rows, args.rows)
+        timed("trends, warm", cold.trends_rows, in_window)
+        timed("states, warm", cold.states_rows, args.rows)
+        today = now.date().isoformat()
+        fresh = {name: values[:1000] for name, values in partitions[today].items()}
+        store.append_arrays(today, fresh)
+        timed("trends after a 1,000-row ingest", cold.trends_rows, in_window)
+        timed("states after a 1,000-row ingest", cold.states_rows, args.rows)
+
+        if args.baseline_rows:
+            sample = subset(partitions, args.baseline_rows)
+            rows = sum(len(columns["second"]) for columns in sample.values())
+            print(f"row store (SQLite, {rows:,} rows)")
+            trends, summary = sqlite_baseline(sample, states, cities, cutoff)
+            check = load_store(os.path.join(tmp, "check"), sample, states, cities)
+            expected = sorted((row["date"].isoformat(), row["hour"], row["state"], row["city"],
+                               row["positive"], row["negative"], row["neutral"]) for row in check.trends_rows(now))
+            assert expected == sorted(trends), "trends differ from SQLite"
+            expected = sorted((row["state"], row["transport_type"], row["total_messages"], row["positive_count"],
+                               row["negative_count"], row["neutral_count"]) for row in check.states_rows())
+            assert expected == sorted(summary), "states differ from SQLite"
+            print("  ✅ store aggregates match SQLite")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
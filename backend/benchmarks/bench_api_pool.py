@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: API throughput with the shared connection pool vs. connect-per-request.
+
+Serves api.app in-process on a threaded local server and drives it with a
+closed-loop load generator (--concurrency clients, each firing its next
+request as soon as the previous one returns). Needs the local MySQL from
+api.db_config. Each mode gets a fresh ConnectionPool; size 0 is the old
+connect-per-request behaviour.
+
+Usage: python backend/benchmarks/bench_api_pool.py [--concurrency 16] [--duration 10] [--pool-size 8]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api
+from db_pool import ConnectionPool
+
+ENDPOINTS = ["/api/status", "/api/tweets", "/api/states"]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def run_load(base_url, endpoints, concurrency, duration):
+    """Closed-loop load for `duration` seconds; returns (latencies, errors)"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(n):
+        local, failed, i = [], 0, n
+        while time.perf_counter() < deadline:
+            url = base_url + endpoints[i % len(endpoints)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as resp:
+                    resp.read()
+                local.append(time.perf_counter() - start)
+            except (urllib.error.URLError, OSError):
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), errors[0]
+
+
+def bench(label, pool_size, args):
+    api.db_pool = ConnectionPool(api.db_config, size=pool_size, timeout=args.pool_timeout)
+    server = make_server("127.0.0.1", 0, api.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        run_load(base_url, args.endpoints, args.concurrency, 1)  # warm-up
+        latencies, errors = run_load(base_url, args.endpoints, args.concurrency, args.duration)
+    finally:
+        server.shutdown()
+
+    rps = len(latencies) / args.duration
+    print(f"{label:<22}: {rps:8,.0f} req/s  "
+          f"p50 {percentile(latencies, 0.50) * 1000:6.1f}ms  "
+          f"p95 {percentile(latencies, 0.95) * 1000:6.1f}ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:6.1f}ms  errors {errors}")
+    if pool_size > 0:
+        print(f"{'':<22}  pool {json.dumps(api.db_pool.stats())}")
+    return rps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load per mode")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--pool-timeout", type=float, default=5)
+    parser.add_argument("--endpoints", nargs="+", default=ENDPOINTS)
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} clients x {args.duration:g}s over {', '.join(args.endpoints)}")
+    legacy = bench("connect-per-request", 0, args)
+    pooled = bench(f"pool (size {args.pool_size})", args.pool_size, args)
+    print(f"speedup               : {pooled / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Flask (threaded WSGI) vs. Starlette/uvicorn (ASGI) API servers.
+
+Starts each server as a subprocess on a free local port, waits for
+/api/status, then drives both with the same closed-loop load as
+bench_api_pool.py and reports throughput and p50/p95/p99 latency. Needs the
+local MySQL from api.db_config. The response cache is disabled unless
+--cache is given, so every request reaches the database.
+
+Usage: python backend/benchmarks/bench_api_servers.py [--concurrency 64] [--duration 10] [--workers 1] [--cache]
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_api_pool import percentile, run_load
+
+ENDPOINTS = ["/api/tweets", "/api/states", "/api/states/Maharashtra", "/api/analytics/trends"]
+STARTUP_TIMEOUT = 20  # seconds for a server to answer /api/status
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(kind, port, workers):
+    if kind == "flask":
+        # api.py's server without the debugger/reloader
+        return [sys.executable, "-c",
+                f"import api; api.app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    return [sys.executable, "-m", "uvicorn", "asgi_api:app", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+
+
+def wait_ready(base_url, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + "/api/status", timeout=2) as resp:
+                resp.read()
+            return
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"/api/status returned {e.code}; is MySQL reachable?")
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError("server did not start in time")
+
+
+def bench(label, kind, args):
+    port = free_port()
+    env = dict(os.environ, DB_POOL_SIZE=str(args.pool_size))
+    if not args.cache:
+        env["API_CACHE_SIZE"] = "0"
+    process = subprocess.Popen(server_command(kind, port, args.workers), cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url, process)
+        run_load(base_url, args.endpoints, args.concurrency, 1)  # warm-up
+        latencies, errors = run_load(base_url, args.endpoints, args.concurrency, args.duration)
+    finally:
+        process.terminate()
+        process.wait()
+
+    rps = len(latencies) / args.duration
+    p99 = percentile(latencies, 0.99)
+    print(f"{label:<22}: {rps:8,.0f} req/s  "
+          f"p50 {percentile(latencies, 0.50) * 1000:6.1f}ms  "
+          f"p95 {percentile(latencies, 0.95) * 1000:6.1f}ms  "
+          f"p99 {p99 * 1000:6.1f}ms  errors {errors}")
+    return rps, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load per server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--pool-size", type=int, default=8, help="DB connections per server process")
+    parser.add_argument("--cache", action="store_true", help="keep the API response cache enabled")
+    parser.add_argument("--endpoints", nargs="+", default=ENDPOINTS)
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} clients x {args.duration:g}s over {', '.join(args.endpoints)}"
+          f" (cache {'on' if args.cache else 'off'})")
+    flask_rps, flask_p99 = bench("flask (threaded)", "flask", args)
+    asgi_rps, asgi_p99 = bench(f"uvicorn ({args.workers} worker{'s' if args.workers > 1 else ''})", "asgi", args)
+    if flask_rps and flask_p99:
+        print(f"throughput            : {asgi_rps / flask_rps:.1f}x")
+        print(f"p99 latency           : {asgi_p99 / flask_p99:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
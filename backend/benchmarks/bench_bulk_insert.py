@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunked INSERT-OR-IGNORE vs. row-at-a-time INSERT with IntegrityError.
+
+Runs against an SQLite stand-in for tweet_sentiment. Each statement sent to
+the "server" sleeps --rtt-ms to model the MySQL network round trip, which is
+what the bulk path saves.
+
+Usage: python backend/benchmarks/bench_bulk_insert.py [--rows 20000] [--duplicates 0.3] [--rtt-ms 0.2]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyse_sentiment import BATCH_SIZE, bulk_insert
+
+SQLITE_INSERT = """
+    INSERT INTO tweet_sentiment (id, text, created_at, sentiment, region, transport_type, state, city)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SQLITE_INSERT_IGNORE = SQLITE_INSERT.replace("INSERT INTO", "INSERT OR IGNORE INTO")
+
+
+class RoundTripCursor:
+    """sqlite3 cursor that pays one simulated round trip per statement"""
+
+    def __init__(self, cursor, rtt):
+        self._cursor = cursor
+        self._rtt = rtt
+
+    def execute(self, *args):
+        time.sleep(self._rtt)
+        return self._cursor.execute(*args)
+
+    def executemany(self, *args):
+        time.sleep(self._rtt)
+        return self._cursor.executemany(*args)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+
+def make_db(existing_rows):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE tweet_sentiment (
+            id VARCHAR(32) PRIMARY KEY, text TEXT, created_at DATETIME,
+            sentiment VARCHAR(10), region VARCHAR(100), transport_type VARCHAR(10),
+            state VARCHAR(100), city VARCHAR(100)
+        )
+    """)
+    conn.executemany(SQLITE_INSERT, existing_rows)
+    conn.commit()
+    return conn
+
+
+def legacy_insert(conn, cursor, rows):
+    """Original loop: one INSERT per row, duplicates detected via exceptions"""
+    inserted = 0
+    for row in rows:
+        try:
+            cursor.execute(SQLITE_INSERT, row)
+            inserted += 1
+        except sqlite3.IntegrityError:
+            continue
+    conn.commit()
+    return inserted, len(rows) - inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--duplicates", type=float, default=0.3, help="share of rows already in the table")
+    parser.add_argument("--rtt-ms", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    rows = [
+        (str(10**18 + i), f"tweet {i} about the bus", "2025-07-16 17:45:11", "neutral", "India", "bus", "India", "")
+        for i in range(args.rows)
+    ]
+    existing = rows[:int(args.rows * args.duplicates)]
+    rtt = args.rtt_ms / 1000
+
+    conn = make_db(existing)
+    start = time.perf_counter()
+    legacy = legacy_insert(conn, RoundTripCursor(conn.cursor(), rtt), rows)
+    legacy_time = time.perf_counter() - start
+
+    conn = make_db(existing)
+    start = time.perf_counter()
+    bulk = bulk_insert(conn, RoundTripCursor(conn.cursor(), rtt), rows, args.batch_size, SQLITE_INSERT_IGNORE,
+                       rollups=False, bump_version=False, lock=False)
+    bulk_time = time.perf_counter() - start
+
+    if legacy != bulk:
+        print(f"❌ Counts differ: legacy {legacy}, bulk {bulk}")
+        sys.exit(1)
+    print(f"✅ inserted={bulk[0]} skipped={bulk[1]} (rtt {args.rtt_ms}ms, batch {args.batch_size})")
+    print(f"row-at-a-time : {legacy_time:.3f}s  ({args.rows / legacy_time:,.0f} rows/s)")
+    print(f"bulk          : {bulk_time:.3f}s  ({args.rows / bulk_time:,.0f} rows/s)")
+    print(f"speedup       : {legacy_time / bulk_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: import time of the backend modules against a budget.
+
+Each module is imported in a fresh interpreter with `python -X importtime`
+and its cumulative import time (the best of --repeat runs) is compared
+with IMPORT_BUDGETS_MS. It also checks that importing has no side effects
+that belong to first use: the NLP stack (TextBlob/NLTK, NumPy, emoji) must
+not be loaded until something is scored. Finally it times the one-off
+sentiment.load_resources() call that the first scoring call pays.
+
+Exits with status 1 when a module is over budget or loads the NLP stack
+at import, so it can gate CI.
+
+Usage: python backend/benchmarks/bench_import_time.py [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time per module, milliseconds
+IMPORT_BUDGETS_MS = {
+    "sentiment": 25,
+    "scorers": 50,
+    "regions": 40,
+    "transport": 25,
+    "checkpoint": 25,
+    "twitter_scraper": 250,
+    "analyse_sentiment": 250,
+    "pipeline": 350,
+    "api": 400,
+}
+# Loaded on first scoring call only
+LAZY_MODULES = ("textblob", "nltk", "numpy", "emoji")
+
+LOAD_SNIPPET = """
+import time
+t = time.perf_counter()
+import sentiment
+sentiment.load_resources()
+print((time.perf_counter() - t) * 1000)
+"""
+
+
+def import_time_ms(module):
+    """Cumulative import time of `module` in a fresh interpreter"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        # "import time: self [us] | cumulative | imported package"
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def eager_imports(module):
+    """Which of LAZY_MODULES importing `module` pulls in"""
+    check = f"import sys, {module}; print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module (best is kept)")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<20} {'import':>9} {'budget':>8}  eagerly loaded")
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        elapsed = min(import_time_ms(module) for _ in range(args.repeat))
+        eager = eager_imports(module)
+        ok = elapsed <= budget and not eager
+        failed |= not ok
+        print(f"{module:<20} {elapsed:7.1f}ms {budget:6d}ms  {' '.join(eager) or '-':<20} {'✅' if ok else '❌'}")
+
+    loads = []
+    for _ in range(args.repeat):
+        result = subprocess.run([sys.executable, "-c", LOAD_SNIPPET], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True)
+        loads.append(float(result.stdout))
+    print(f"\nsentiment.load_resources() on first use: {min(loads):.1f}ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: live trend/spike queries from the sliding-window rings.
+
+Feeds --rows synthetic tweets (spread over the last --days days, with a
+negative burst in one state during the last 5 minutes) into a
+live_trends.SlidingWindowAggregator one tweet at a time and times:
+  - the per-tweet update cost
+  - summary() for the minute, hour and day granularities
+For comparison the same rows go into an SQLite row table indexed on
+created_at, and the current/previous/baseline windows of each query are
+computed with the GROUP BY a request would otherwise run. The counts are
+checked to be equal and the burst to be flagged as a spike.
+
+Usage: python backend/benchmarks/bench_live_trends.py [--rows 1000000] [--days 14]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from live_trends import GRANULARITIES, SlidingWindowAggregator
+from regions import INDIAN_STATES_CITIES
+from rollups import SENTIMENTS
+from transport import TRANSPORT_TYPES
+
+WINDOWS_SQLITE = """
+    SELECT state, (? - created_at / ?) / ? AS age, sentiment, COUNT(*)
+    FROM tweet_sentiment
+    WHERE created_at > ? AND created_at <= ?
+    GROUP BY 1, 2, 3
+"""
+BURST_STATE = "Kerala"
+
+
+def generate(rows, days, now, rng):
+    """(unix created_at, state, transport_type, sentiment) tuples, plus a recent negative burst"""
+    states = list(INDIAN_STATES_CITIES)
+    tweets = [(now - rng.randrange(days * 86400), rng.choice(states), rng.choice(TRANSPORT_TYPES),
+               rng.choices(SENTIMENTS, weights=(0.3, 0.3, 0.4))[0]) for _ in range(rows)]
+    tweets += [(now - rng.randrange(300), BURST_STATE, "bus", "negative") for _ in range(max(rows // 2000, 50))]
+    tweets.sort()
+    return tweets
+
+
+def sqlite_windows(conn, granularity, now):
+    """{state: [[positive, negative, neutral] per window]} from raw rows"""
+    seconds, _slots, window, baseline = GRANULARITIES[granularity]
+    current = now // seconds
+    start = (current - (baseline + 1) * window + 1) * seconds
+    result = {}
+    for state, age, sentiment, count in conn.execute(WINDOWS_SQLITE, (current, seconds, window, start - 1,
+                                                                      now)):
+        windows = result.setdefault(state, [[0, 0, 0] for _ in range(baseline + 1)])
+        windows[age][SENTIMENTS.index(sentiment)] += count
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--repeat", type=int, default=20, help="summary() calls timed per granularity")
+    args = parser.parse_args()
+
+    now = int(time.time())
+    tweets = generate(args.rows, args.days, now, random.Random(42))
+    print(f"{len(tweets):,} tweets over {args.days} days")
+
+    aggregator = SlidingWindowAggregator()
+    start = time.perf_counter()
+    for created_at, state, transport_type, sentiment in tweets:
+        aggregator.add(created_at, state, transport_type, sentiment)
+    elapsed = time.perf_counter() - start
+    print(f"  {'update':<24}: {elapsed / len(tweets) * 1e6:7.2f}µs per tweet  ({len(tweets) / elapsed:,.0f} tweets/s)")
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE tweet_sentiment (created_at INTEGER, state TEXT, transport_type TEXT, sentiment TEXT)")
+    conn.executemany("INSERT INTO tweet_sentiment VALUES (?, ?, ?, ?)", tweets)
+    conn.execute("CREATE INDEX idx_created_at ON tweet_sentiment (created_at)")
+
+    for granularity in GRANULARITIES:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            summary = aggregator.summary(granularity, now=now)
+        rings = (time.perf_counter() - start) / args.repeat
+        start = time.perf_counter()
+        expected = sqlite_windows(conn, granularity, now)
+        scan = time.perf_counter() - start
+        print(f"  {granularity + ' summary':<24}: {rings * 1000:7.2f}ms   raw-row scan {scan * 1000:8.1f}ms  "
+              f"({scan / rings:,.0f}x)")
+
+        for group in summary["groups"]:
+            windows = expected.pop(group["state"])
+            got = [[group[name][sentiment] for sentiment in SENTIMENTS] for name in ("current", "previous")]
+            assert got == windows[:2], f"{granularity} windows of {group['state']} differ from SQLite"
+            assert group["baseline"]["averageMessages"] == sum(map(sum, windows[1:])) / (len(windows) - 1)
+        assert not expected, f"{granularity} groups missing: {sorted(expected)}"
+        if granularity == "minute":
+            spikes = [group["state"] for group in summary["groups"] if group["spike"]]
+            assert spikes == [BURST_STATE], f"spikes flagged: {spikes}"
+    print(f"  ✅ ring windows match SQLite; the {BURST_STATE} burst is the only minute spike")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled region matcher vs. the original nested-loop detector.
+
+Usage: python backend/benchmarks/bench_region_detection.py [--input backend/data.json] [--repeat 50]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from regions import INDIAN_STATES_CITIES, LOCATION_MAPPINGS, detect_region_from_text
+
+
+def legacy_detect_region_from_text(text):
+    """Original implementation: one substring scan per gazetteer term"""
+    text_lower = text.lower()
+
+    for state, cities in INDIAN_STATES_CITIES.items():
+        if state.lower() in text_lower:
+            return state
+
+    for state, cities in INDIAN_STATES_CITIES.items():
+        for city in cities:
+            if city.lower() in text_lower:
+                return f"{city}, {state}"
+
+    # The original rebuilt this dict on every call
+    location_mappings = dict(LOCATION_MAPPINGS)
+    for keyword, region in location_mappings.items():
+        if keyword in text_lower:
+            return region
+
+    return 'India'
+
+
+def time_it(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", default="backend/data.json")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        texts = [tweet['text'] for tweet in json.load(f)]
+
+    mismatches = [t for t in texts if legacy_detect_region_from_text(t) != detect_region_from_text(t)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} tweets resolve differently, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+    print(f"✅ Results identical on {len(texts)} tweets")
+
+    total = len(texts) * args.repeat
+    legacy = time_it(legacy_detect_region_from_text, texts, args.repeat)
+    compiled = time_it(detect_region_from_text, texts, args.repeat)
+
+    print(f"legacy   : {legacy:.3f}s  ({total / legacy:,.0f} tweets/s)")
+    print(f"compiled : {compiled:.3f}s  ({total / compiled:,.0f} tweets/s)")
+    print(f"speedup  : {legacy / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
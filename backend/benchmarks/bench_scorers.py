@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: throughput and agreement of the sentiment backends (scorers.py).
+
+For each backend, on the --input tweets repeated --scale times, single core:
+  - the one-off load() time and tweets/s of score_batch
+  - label agreement with the textblob backend (the reference labels), the
+    label confusion and the polarity correlation
+  - coverage: the share of tweets that get a nonzero polarity
+  - accuracy on a few hand-labelled Hinglish/Hindi commuter tweets, which
+    the English-only textblob backend mostly scores as neutral
+Batches with no scorable words (empty, URL- or mention-only texts, which
+memo normalization reduces to "") must come back neutral, or it fails.
+Per-tweet sentiment.analyze_sentiment (plain TextBlob) is timed as well.
+
+Usage: python backend/benchmarks/bench_scorers.py [--input backend/data.json] [--scale 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memo import normalize_text
+from rollups import SENTIMENTS
+from scorers import SCORERS, get_scorer
+from sentiment import analyze_sentiment
+
+REFERENCE = "textblob"
+MIXED_SAMPLES = [
+    ("Metro aaj phir late, ekdum bakwas service 😡", "negative"),
+    ("Bus mein itni bheed, khada hona bhi mushkil", "negative"),
+    ("Auto wale ne double paisa maanga, ghatiya", "negative"),
+    ("Train accha nahi tha, AC kharab tha", "negative"),
+    ("DMRC ki nayi line badhiya hai, shandaar safar", "positive"),
+    ("Aaj cab driver bahut accha tha, dhanyavad", "positive"),
+    ("मेट्रो आज फिर देरी से आई, बहुत परेशानी हुई", "negative"),
+    ("बस बहुत गंदी थी और ड्राइवर बेकार", "negative"),
+    ("ट्रेन समय पर आई, बढ़िया सेवा 👍", "positive"),
+    ("ऑटो वाला बहुत अच्छा था, शुक्रिया", "positive"),
+    ("Metro card recharge kiya, office ja raha hoon", "neutral"),
+    ("ट्रेन 8 बजे निकलेगी", "neutral"),
+]
+# Texts without a scorable word; scored alone, as a whole batch can be
+EMPTY_SAMPLES = ["", "x", "https://t.co/abc @bob", "@RailMinIndia"]
+
+
+def throughput(func, texts):
+    start = time.perf_counter()
+    func(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", default="backend/data.json")
+    parser.add_argument("--scale", type=int, default=20, help="copies of the input tweets timed per backend")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        texts = [tweet['text'] for tweet in json.load(f)]
+    corpus = texts * args.scale
+    print(f"{len(texts)} tweets x {args.scale}")
+
+    results = {}
+    for name in SCORERS:
+        scorer = get_scorer(name)
+        start = time.perf_counter()
+        scorer.load()
+        load_ms = (time.perf_counter() - start) * 1000
+        for text in EMPTY_SAMPLES:
+            labels, polarities, _subjectivities = scorer.score_batch([normalize_text(text)])
+            if labels != ["neutral"] or polarities[0] != 0:
+                print(f"❌ {name}: {text!r} scored {labels[0]} ({polarities[0]})")
+                sys.exit(1)
+        labels, polarities, _subjectivities = scorer.score_batch(texts)
+        rate = throughput(scorer.score_batch, corpus)
+        mixed, _, _ = scorer.score_batch([text for text, _ in MIXED_SAMPLES])
+        results[name] = (labels, polarities, rate, load_ms, mixed)
+
+    baseline_rate = throughput(lambda batch: [analyze_sentiment(text) for text in batch], texts * 2)
+    print(f"  {'textblob, per tweet':<22}: {baseline_rate:10,.0f} tweets/s")
+
+    reference_labels, reference_polarities = results[REFERENCE][:2]
+    for name, (labels, polarities, rate, load_ms, mixed) in results.items():
+        agreement = np.mean([a == b for a, b in zip(labels, reference_labels)])
+        correlation = np.corrcoef(polarities, reference_polarities)[0, 1]
+        coverage = np.mean(polarities != 0)
+        correct = sum(label == expected for label, (_, expected) in zip(mixed, MIXED_SAMPLES))
+        print(f"  {name + ', batch':<22}: {rate:10,.0f} tweets/s ({rate / baseline_rate:4.1f}x per-tweet TextBlob)  "
+              f"load {load_ms:6.1f}ms")
+        print(f"  {'':<22}  agreement with {REFERENCE} {agreement:6.1%}  polarity r={correlation:5.2f}  "
+              f"coverage {coverage:6.1%}  Hinglish/Hindi {correct}/{len(MIXED_SAMPLES)}")
+        if name != REFERENCE:
+            confusion = Counter(zip(reference_labels, labels))
+            rows = ", ".join(f"{a[:3]}->{b[:3]} {confusion[a, b]}"
+                             for a in SENTIMENTS for b in SENTIMENTS if a != b and confusion[a, b])
+            print(f"  {'':<22}  relabelled: {rows or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
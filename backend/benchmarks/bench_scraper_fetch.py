@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: collection-cycle time of the concurrent, header-paced fetcher.
+
+Runs fetcher.QueryFetcher against mock_twitter_api.py (no network, no
+token needed) and compares the cycle time with the floor the rate limit
+imposes, i.e. (ceil(queries / limit) - 1) full windows. It also compares
+with a single-worker run and with the legacy schedule's estimate: queries
+run one at a time, a fixed 2 s sleep after each and a 15-minute sleep per
+429.
+
+Usage: python backend/benchmarks/bench_scraper_fetch.py [--queries 30] [--limit 10] [--window 3] [--latency 0.2]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fetcher import FETCH_CONCURRENCY, QueryFetcher
+from mock_twitter_api import SEARCH_PATH, start_server
+
+LEGACY_DELAY = 2            # seconds slept after every query
+LEGACY_RATE_LIMIT_SLEEP = 15 * 60
+
+
+def bench(label, concurrency, queries, args):
+    server = start_server(limit=args.limit, window=args.window, latency=args.latency)
+    url = f"http://127.0.0.1:{server.server_port}{SEARCH_PATH}"
+    fetcher = QueryFetcher({"Authorization": "Bearer mock"}, concurrency=concurrency)
+    start = time.perf_counter()
+    ok = 0
+    try:
+        for _, response in fetcher.fetch(queries, lambda q: fetcher.get(url, {"query": q, "max_results": 10})):
+            ok += response is not None and response.status_code == 200
+    finally:
+        fetcher.close()
+        server.shutdown()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24}: {elapsed:6.2f}s  {ok}/{len(queries)} ok  "
+          f"{fetcher.stats['requests']} requests  {fetcher.stats['rate_limited']} rate-limited")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=10, help="mock requests per window")
+    parser.add_argument("--window", type=float, default=3, help="mock rate-limit window (seconds)")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock response latency (seconds)")
+    parser.add_argument("--concurrency", type=int, default=FETCH_CONCURRENCY)
+    args = parser.parse_args()
+
+    queries = [f"transport query {i}" for i in range(args.queries)]
+    floor = (math.ceil(args.queries / args.limit) - 1) * args.window
+    legacy = (args.queries * (args.latency + LEGACY_DELAY)
+              + (math.ceil(args.queries / args.limit) - 1) * LEGACY_RATE_LIMIT_SLEEP)
+    print(f"{args.queries} queries, {args.limit} requests / {args.window:g}s window, "
+          f"{args.latency * 1000:.0f}ms latency")
+    print(f"{'rate-limit floor':<24}: {floor:6.2f}s")
+    print(f"{'legacy schedule (est.)':<24}: {legacy:6.2f}s")
+    bench("sequential (1 worker)", 1, queries, args)
+    bench(f"concurrent ({args.concurrency} workers)", args.concurrency, queries, args)
+
+
+if __name__ == "__main__":
+    main()
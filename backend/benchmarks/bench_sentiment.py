@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch sentiment scoring vs. per-tweet TextBlob scoring.
+
+Usage: python backend/benchmarks/bench_sentiment.py [--input backend/data.json] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment import analyze_sentiment, analyze_sentiment_batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", default="backend/data.json")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        texts = [tweet['text'] for tweet in json.load(f)]
+
+    reference = [analyze_sentiment(text) for text in texts]
+    labels, _polarities, _subjectivities = analyze_sentiment_batch(texts)
+    mismatches = [t for t, a, b in zip(texts, reference, labels) if a != b]
+    if mismatches:
+        print(f"❌ {len(mismatches)} tweets labelled differently, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+    print(f"✅ Labels identical on {len(texts)} tweets")
+
+    total = len(texts) * args.repeat
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in texts:
+            analyze_sentiment(text)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        analyze_sentiment_batch(texts)
+    batch = time.perf_counter() - start
+
+    print(f"per-tweet : {single:.3f}s  ({total / single:,.0f} tweets/s)")
+    print(f"batch     : {batch:.3f}s  ({total / batch:,.0f} tweets/s)")
+    print(f"speedup   : {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: the whole backend on a seeded synthetic corpus, as JSON.
+
+Stages (--stages, default all):
+  micro   per-call throughput on --micro-size tweets from synthetic.py:
+          sentiment.analyze_sentiment, score_batch of every scorer backend,
+          regions.detect_region_from_text, transport.determine_transport_type,
+          memo.normalize_text and analyse_sentiment.enrich_texts
+  ingest  --ingest-size tweets end to end, as analyse_sentiment.py does it:
+          JSONL dump -> iter_tweets -> iter_enriched (memo, --workers) ->
+          bulk_insert with rollups and data_version, into an in-memory
+          SQLite stand-in for MySQL (optionally --rtt-ms per statement and
+          an --analytics ColumnStore); row and rollup counts are checked
+  http    closed-loop load on each /api/* route of the Flask or ASGI
+          server (--server); needs the local MySQL from api.db_config and
+          is recorded as skipped without it. /api/stream (SSE) is left out.
+Every result is {"value", "unit", "better": "higher"|"lower"}; with
+--output they are written with the git commit, Python, platform and the
+config, and --compare reads an earlier file and flags changes worse than
+--threshold (exit code 1 on regressions).
+
+Usage: python backend/benchmarks/bench_suite.py [--stages micro ingest http] [--output bench.json] [--compare old.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analyse_sentiment import BATCH_SIZE, INSERT_SQL, bulk_insert, enrich_texts, iter_enriched, to_row
+from analytics_store import ColumnStore
+from bench_api_pool import percentile, run_load
+from bench_api_servers import free_port, server_command, wait_ready
+from cache import DATA_VERSION_TABLE_SQL, READ_DATA_VERSION_SQL, SEED_DATA_VERSION_SQL
+from memo import MEMO_SIZE, TextMemo, normalize_text
+from regions import detect_region_from_text
+from rollups import POLARITY_HISTOGRAM_TABLE_SQL, ROLLUP_TABLES, create_table_sql
+from scorers import SCORERS, SENTIMENT_BACKEND, get_scorer
+from sentiment import analyze_sentiment
+from synthetic import SEED, generate
+from transport import determine_transport_type
+from tweet_io import iter_tweets, write_jsonl
+
+STAGES = ("micro", "ingest", "http")
+HTTP_ROUTES = ["/api/status", "/api/tweets", "/api/states", "/api/states/Maharashtra", "/api/analytics/trends",
+               "/api/analytics/polarity", "/api/analytics/live"]
+
+TWEET_TABLE_SQL = """
+    CREATE TABLE tweet_sentiment (
+        seq INTEGER PRIMARY KEY,
+        id VARCHAR(32) NOT NULL UNIQUE,
+        text TEXT, created_at DATETIME, sentiment VARCHAR(10), region VARCHAR(100), transport_type VARCHAR(10),
+        state VARCHAR(100), city VARCHAR(100), polarity FLOAT, subjectivity FLOAT, confidence FLOAT
+    )
+"""
+
+# MySQL -> SQLite rewrites for the statements ingestion sends
+_DIALECT = [
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\bINSERT IGNORE\b"), "INSERT OR IGNORE"),
+    (re.compile(r"\bON DUPLICATE KEY UPDATE\b"), "ON CONFLICT DO UPDATE SET"),
+    (re.compile(r"\bVALUES\((\w+)\)"), r"excluded.\1"),
+    (re.compile(r"\bNOW\(\)"), "CURRENT_TIMESTAMP"),
+    (re.compile(r"\b(GET|RELEASE)_LOCK\("), "COALESCE(1, "),  # one connection: always granted
+    (re.compile(r",\s*KEY \w+ \([^)]*\)"), ""),  # secondary indexes in CREATE TABLE
+]
+
+
+def to_sqlite(sql):
+    for pattern, replacement in _DIALECT:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+class StandInCursor:
+    """sqlite3 cursor taking MySQL statements, with an optional simulated round trip each"""
+
+    def __init__(self, cursor, rtt=0.0):
+        self._cursor = cursor
+        self._rtt = rtt
+
+    def execute(self, sql, params=()):
+        if self._rtt:
+            time.sleep(self._rtt)
+        return self._cursor.execute(to_sqlite(sql), params)
+
+    def executemany(self, sql, seq_of_params):
+        if self._rtt:
+            time.sleep(self._rtt)
+        return self._cursor.executemany(to_sqlite(sql), seq_of_params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+
+def make_standin():
+    """In-memory database with the ingestion tables, created from the repo's own DDL"""
+    conn = sqlite3.connect(":memory:")
+    cursor = StandInCursor(conn.cursor())
+    cursor.execute(TWEET_TABLE_SQL)
+    for table in ROLLUP_TABLES:
+        cursor.execute(create_table_sql(table))
+    cursor.execute(POLARITY_HISTOGRAM_TABLE_SQL)
+    cursor.execute(DATA_VERSION_TABLE_SQL)
+    cursor.execute(SEED_DATA_VERSION_SQL)
+    conn.commit()
+    return conn
+
+
+def result(value, unit, better="higher", **extra):
+    return {"value": round(value, 6), "unit": unit, "better": better, **extra}
+
+
+def best_rate(func, items, repeat):
+    """Best items/s of `repeat` runs of func(items)"""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(items)
+        best = max(best, len(items) / (time.perf_counter() - start))
+    return best
+
+
+# ---------- STAGES ----------
+def run_micro(args):
+    texts = [tweet['text'] for tweet in generate(args.micro_size, args.seed)]
+    results = {}
+
+    def per_text(func):
+        return lambda batch: [func(text) for text in batch]
+
+    # One-off table loads happen before timing
+    for name in SCORERS:
+        get_scorer(name).load()
+    analyze_sentiment(texts[0])
+
+    results["micro.analyze_sentiment"] = result(best_rate(per_text(analyze_sentiment), texts, args.repeat),
+                                                "tweets/s")
+    for name in SCORERS:
+        results[f"micro.score_batch.{name}"] = result(best_rate(get_scorer(name).score_batch, texts, args.repeat),
+                                                      "tweets/s")
+    results["micro.detect_region_from_text"] = result(
+        best_rate(per_text(detect_region_from_text), texts, args.repeat), "tweets/s")
+    results["micro.determine_transport_type"] = result(
+        best_rate(per_text(determine_transport_type), texts, args.repeat), "tweets/s")
+    results["micro.normalize_text"] = result(best_rate(per_text(normalize_text), texts, args.repeat), "tweets/s")
+    # No memo, so every text is scored
+    results[f"micro.enrich_texts.{args.sentiment_backend}"] = result(
+        best_rate(lambda batch: enrich_texts(batch, backend=args.sentiment_backend), texts, args.repeat), "tweets/s")
+    return results
+
+
+def run_ingest(args, workdir):
+    path = os.path.join(workdir, "synthetic.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        write_jsonl(f, generate(args.ingest_size, args.seed))
+
+    conn = make_standin()
+    cursor = StandInCursor(conn.cursor(), args.rtt_ms / 1000)
+    memo = TextMemo(args.memo_size, args.sentiment_backend)
+    analytics = ColumnStore(os.path.join(workdir, "analytics")) if args.analytics else None
+
+    start = time.perf_counter()
+    rows = (to_row(*enriched) for enriched in iter_enriched(iter_tweets(path), args.workers, memo=memo,
+                                                           backend=args.sentiment_backend))
+    inserted, skipped = bulk_insert(conn, cursor, rows, args.batch_size, INSERT_SQL, analytics=analytics)
+    elapsed = time.perf_counter() - start
+
+    cursor.execute("SELECT COUNT(*) FROM tweet_sentiment")
+    (stored,) = cursor.fetchone()
+    problems = []
+    if stored != inserted or inserted != args.ingest_size:
+        problems.append(f"{inserted} inserted, {stored} stored of {args.ingest_size}")
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"SELECT COALESCE(SUM(total_count), 0) FROM {table}")
+        (total,) = cursor.fetchone()
+        if total != inserted:
+            problems.append(f"{table} counts {total} tweets")
+    if analytics is not None and len(analytics) != inserted:
+        problems.append(f"analytics store holds {len(analytics)} rows")
+    cursor.execute(READ_DATA_VERSION_SQL)
+    (version,) = cursor.fetchone()
+    if problems:
+        raise RuntimeError("ingest check failed: " + "; ".join(problems))
+
+    return {
+        "ingest.tweets_per_s": result(inserted / elapsed, "tweets/s", workers=args.workers,
+                                      backend=args.sentiment_backend, rtt_ms=args.rtt_ms),
+        "ingest.memo_hit_rate": result(memo.hit_rate, "ratio"),
+        "ingest.data_version_bumps": result(version, "commits", better="lower"),
+        "ingest.skipped": result(skipped, "rows", better="lower"),
+    }
+
+
+def run_http(args):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(server_command(args.server, port, args.server_workers), cwd=BACKEND_DIR,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(base_url, process)
+        results = {}
+        for route in HTTP_ROUTES:
+            latencies, errors = run_load(base_url, [route], args.concurrency, args.duration)
+            prefix = f"http.{args.server}.{route}"
+            results[f"{prefix}.rps"] = result(len(latencies) / args.duration, "req/s", errors=errors)
+            for p in (0.5, 0.95, 0.99):
+                results[f"{prefix}.p{round(p * 100)}_ms"] = result(percentile(latencies, p) * 1000, "ms",
+                                                                  better="lower")
+        return results
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+# ---------- REPORT ----------
+def metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+    }
+
+
+def compare(results, config, baseline_path, threshold):
+    """Print each result against the baseline file; returns the names that regressed"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nvs. {baseline_path} (commit {(baseline.get('git_commit') or '?')[:10]}, "
+          f"threshold {threshold:.0%})")
+    changed = sorted(key for key, value in baseline.get("config", {}).items()
+                     if key in config and config[key] != value and key not in ("stages", "threshold"))
+    if changed:
+        print(f"⚠️ Config differs from the baseline ({', '.join(changed)}); ratios may not be comparable")
+    regressions = []
+    for name, current in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old or "value" not in old or "value" not in current:
+            continue
+        if not old["value"]:
+            continue
+        ratio = current["value"] / old["value"]
+        change = ratio - 1 if current["better"] == "higher" else 1 - ratio
+        regressed = change < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"  {'❌' if regressed else '✅'} {name:<48} {old['value']:>12,.2f} -> {current['value']:>12,.2f} "
+              f"{current['unit']:<9} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--repeat", type=int, default=3, help="micro runs per function; the best is kept")
+    parser.add_argument("--micro-size", type=int, default=10_000, help="tweets per micro-benchmark")
+    parser.add_argument("--ingest-size", type=int, default=50_000, help="tweets ingested end to end")
+    parser.add_argument("--workers", type=int, default=1, help="scoring processes for the ingest stage")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--memo-size", type=int, default=MEMO_SIZE)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated DB round trip per statement")
+    parser.add_argument("--analytics", action="store_true", help="also append to a columnar analytics store")
+    parser.add_argument("--sentiment-backend", choices=list(SCORERS), default=SENTIMENT_BACKEND)
+    parser.add_argument("--server", choices=["flask", "asgi"], default="flask")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn workers (asgi)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5, help="seconds of load per route")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="earlier --output file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    report = metadata(args)
+    results = {}
+    skipped = {}
+    for stage in args.stages:
+        start = time.perf_counter()
+        try:
+            if stage == "micro":
+                stage_results = run_micro(args)
+            elif stage == "ingest":
+                with tempfile.TemporaryDirectory() as workdir:
+                    stage_results = run_ingest(args, workdir)
+            else:
+                stage_results = run_http(args)
+        except RuntimeError as e:
+            if stage != "http":
+                raise
+            skipped[stage] = str(e)
+            print(f"⚠️ {stage}: skipped ({e})")
+            continue
+        print(f"✅ {stage} ({time.perf_counter() - start:.1f}s)")
+        for name, value in stage_results.items():
+            print(f"  {name:<48} {value['value']:>14,.2f} {value['unit']}")
+        results.update(stage_results)
+
+    report["results"] = results
+    report["skipped"] = skipped
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Wrote {len(results)} results to {args.output}")
+    if args.compare:
+        regressions = compare(results, report["config"], args.compare, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: enrichment with and without the normalized-text memo.
+
+Builds a corpus with the near-duplicates seen in real dumps: each source
+tweet is reposted --reposts times with a different t.co link, a different
+leading @mention and extra whitespace. Scores it with enrich_texts without
+a memo, then with a cold and a warm TextMemo (the warm one also round-trips
+through save/load), and checks that every run gives the same results.
+
+Usage: python backend/benchmarks/bench_text_memo.py [--input backend/data.json] [--reposts 4]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyse_sentiment import SHARD_SIZE, enrich_texts, iter_chunks
+from memo import TextMemo
+from scorers import load_scorer
+
+
+def repost(text, rng):
+    link = "https://t.co/" + "".join(rng.choices(string.ascii_letters + string.digits, k=10))
+    handle = "@" + "".join(rng.choices(string.ascii_lowercase, k=8))
+    return f"{handle}  {text}\n{link}"
+
+
+def run(texts, memo):
+    start = time.perf_counter()
+    results = []
+    for chunk in iter_chunks(texts, SHARD_SIZE):
+        results.extend(enrich_texts(chunk, memo))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", default="backend/data.json")
+    parser.add_argument("--reposts", type=int, default=4, help="near-duplicate variants per source tweet")
+    parser.add_argument("--scale", type=int, default=20, help="copies of the source tweets (distinct by suffix)")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        sources = [tweet['text'] for tweet in json.load(f)]
+    rng = random.Random(42)
+    sources = [f"{text} #{n}" for n in range(args.scale) for text in sources]
+    texts = sources + [repost(text, rng) for text in sources for _ in range(args.reposts)]
+    rng.shuffle(texts)
+    print(f"{len(texts)} texts, {len(sources)} distinct after normalization")
+
+    load_scorer()  # keep the one-off NLP load out of the first run
+    baseline, expected = run(texts, None)
+    print(f"{'no memo':<12}: {baseline:6.3f}s  ({len(texts) / baseline:,.0f} texts/s)")
+
+    memo = TextMemo()
+    cold, results = run(texts, memo)
+    assert results == expected, "memoized results differ"
+    print(f"{'cold memo':<12}: {cold:6.3f}s  ({len(texts) / cold:,.0f} texts/s)  "
+          f"hit rate {memo.hit_rate:.1%}  speedup {baseline / cold:.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memo.json")
+        memo.save(path)
+        warm_memo = TextMemo()
+        warm_memo.load(path)
+    warm, results = run(texts, warm_memo)
+    assert results == expected, "results loaded from disk differ"
+    print(f"{'warm memo':<12}: {warm:6.3f}s  ({len(texts) / warm:,.0f} texts/s)  "
+          f"hit rate {warm_memo.hit_rate:.1%}  speedup {baseline / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
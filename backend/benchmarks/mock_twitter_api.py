@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Twitter v2 recent-search endpoint.
+
+Serves /2/tweets/search/recent with a fixed-window rate limit: each window
+opens on its first request and allows --limit requests in --window
+seconds. Every response carries x-rate-limit-limit/-remaining/-reset
+headers, and requests over the limit get 429 like the real API. Bodies
+come from --responses (a JSON object mapping query text to a canned
+response body) or from a synthetic timeline per query: --tweets spread
+over the past week plus --arrival-rate new tweets per second, searchable
+with since_id/until_id and paged with next_token.
+
+Usage:
+    python backend/benchmarks/mock_twitter_api.py --port 8089 --limit 10 --window 5
+    TWITTER_API_URL=http://127.0.0.1:8089 python backend/twitter_scraper.py
+"""
+import argparse
+import json
+import math
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SEARCH_PATH = "/2/tweets/search/recent"
+TWITTER_EPOCH_MS = 1288834974657
+HISTORY = 6.5 * 24 * 3600  # seconds of past tweets in each synthetic timeline
+
+
+class FixedWindow:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.reset_at = 0.0
+        self.used = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def take(self):
+        """(allowed, remaining, reset epoch seconds) for one request"""
+        with self._lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.reset_at = now + self.window
+                self.used = 0
+            allowed = self.used < self.limit
+            if allowed:
+                self.used += 1
+            else:
+                self.rejected += 1
+            return allowed, self.limit - self.used, math.ceil(self.reset_at)
+
+
+class Timeline:
+    """
+    Synthetic search results: per query, `size` tweets spread over the
+    past HISTORY seconds plus `arrival_rate` new tweets per second since
+    the server started. Ids are snowflakes, increasing with created_at.
+    """
+
+    def __init__(self, size=500, arrival_rate=0.0):
+        self.size = size
+        self.arrival_rate = arrival_rate
+        self.started = time.time()
+
+    def _created(self, k):
+        if k < self.size:
+            return self.started - HISTORY + k * HISTORY / self.size
+        return self.started + (k - self.size + 1) / self.arrival_rate
+
+    def _tweet(self, query, k):
+        created = self._created(k)
+        tweet_id = ((int(created * 1000) - TWITTER_EPOCH_MS) << 22) | (zlib.crc32(query.encode()) & 0x3FFFFF)
+        return {
+            "id": str(tweet_id),
+            "text": f"{query} update {k}: service was late again",
+            "created_at": datetime.fromtimestamp(created, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            "lang": "en",
+            "author_id": str(k % 1000),
+        }
+
+    def search(self, query, since_id=None, until_id=None, max_results=10, next_token=None):
+        count = self.size
+        if self.arrival_rate:
+            count += int((time.time() - self.started) * self.arrival_rate)
+        tweets = [self._tweet(query, k) for k in range(count - 1, -1, -1)]  # newest first
+        tweets = [tweet for tweet in tweets
+                  if (since_id is None or int(tweet["id"]) > int(since_id))
+                  and (until_id is None or int(tweet["id"]) < int(until_id))]
+        offset = int(next_token or 0)
+        page = tweets[offset:offset + max_results]
+        meta = {"result_count": len(page)}
+        if page:
+            meta["newest_id"] = page[0]["id"]
+            meta["oldest_id"] = page[-1]["id"]
+        if offset + max_results < len(tweets):
+            meta["next_token"] = str(offset + max_results)
+        return {"data": page, "meta": meta} if page else {"meta": meta}
+
+
+def make_handler(limiter, timeline, responses, latency):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != SEARCH_PATH:
+                return self._send(404, {"title": "Not Found"})
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._send(401, {"title": "Unauthorized"})
+            allowed, remaining, reset = limiter.take()
+            headers = {
+                "x-rate-limit-limit": limiter.limit,
+                "x-rate-limit-remaining": remaining,
+                "x-rate-limit-reset": reset,
+            }
+            if not allowed:
+                return self._send(429, {"title": "Too Many Requests"}, headers)
+            time.sleep(latency)
+            params = {name: values[0] for name, values in parse_qs(url.query).items()}
+            query = params.get("query", "").replace(" lang:en -is:retweet", "")
+            body = responses.get(query) or timeline.search(
+                query, params.get("since_id"), params.get("until_id"),
+                int(params.get("max_results", 10)), params.get("next_token"))
+            self._send(200, body, headers)
+
+        def _send(self, status, body, headers=None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, str(value))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(port=0, limit=10, window=5.0, latency=0.05, responses=None, tweets=500, arrival_rate=0.0):
+    """Serve in a background thread; returns the server (.server_port, .limiter, .timeline, .shutdown())"""
+    limiter = FixedWindow(limit, window)
+    timeline = Timeline(tweets, arrival_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(limiter, timeline, responses or {}, latency))
+    server.daemon_threads = True
+    server.limiter = limiter
+    server.timeline = timeline
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--limit", type=int, default=10, help="requests per window")
+    parser.add_argument("--window", type=float, default=5, help="rate-limit window in seconds")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per successful response")
+    parser.add_argument("--responses", help="JSON file mapping query text to a canned response body")
+    parser.add_argument("--tweets", type=int, default=500, help="past tweets per query in the synthetic timeline")
+    parser.add_argument("--arrival-rate", type=float, default=0.0, help="new tweets per second per query")
+    args = parser.parse_args()
+
+    responses = {}
+    if args.responses:
+        with open(args.responses, "r", encoding="utf-8") as f:
+            responses = json.load(f)
+    server = start_server(args.port, args.limit, args.window, args.latency, responses,
+                          args.tweets, args.arrival_rate)
+    print(f"Mock Twitter API on http://127.0.0.1:{server.server_port} "
+          f"({args.limit} requests / {args.window:g}s window)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
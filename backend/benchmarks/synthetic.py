@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic tweet generator for the benchmarks.
+
+Tweets look like the scraper's dumps (Twitter API v2 objects, as in
+backend/data.json) and mix what the backend has to handle:
+  - English, Hinglish and Hindi commuter complaints, praise and plain
+    status updates, for every transport type (TRANSPORT_KEYWORDS, English
+    and Devanagari forms)
+  - city, state and nickname mentions from regions.py, Zipf-weighted so
+    the metros dominate like real traffic; about a third mention no place
+  - emoji matching the tone, @mentions of operators, hashtags and t.co links
+  - reposts: earlier texts again with another link/mention (memo hits)
+The same seed always yields the same tweets, and the first N tweets do not
+depend on --count, so corpora of different sizes share a prefix.
+Generation is streamed; 10M tweets never sit in memory.
+
+Usage: python backend/benchmarks/synthetic.py [--count 100000] [--seed 42] [--output backend/synthetic.jsonl]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from regions import INDIAN_STATES_CITIES, LOCATION_MAPPINGS
+from sentiment import NEGATIVE_EMOJIS, POSITIVE_EMOJIS
+from transport import DEFAULT_TRANSPORT_TYPE, TRANSPORT_KEYWORDS
+from tweet_io import write_jsonl
+
+SEED = 42
+BASE_ID = 1_900_000_000_000_000_000
+START = datetime.datetime(2025, 7, 1)  # fixed, so corpora are reproducible
+SECONDS_PER_TWEET = 0.5  # created_at spacing from START
+REPOST_SHARE = 0.15
+NO_PLACE_SHARE = 0.35
+EMOJI_SHARE = 0.35
+LINK_SHARE = 0.25
+
+TRANSPORT_WEIGHTS = {DEFAULT_TRANSPORT_TYPE: 0.35, "metro": 0.25, "train": 0.2, "auto": 0.1, "taxi": 0.1}
+# Keywords as people write them ("DMRC", not the matcher's "dmrc")
+_SPELLING = {"dmrc": "DMRC", "irctc": "IRCTC", "ola": "Ola", "uber": "Uber"}
+TRANSPORT_TERMS = {transport_type: [_SPELLING.get(keyword, keyword) for keyword in keywords]
+                   for transport_type, keywords in TRANSPORT_KEYWORDS}
+TRANSPORT_TERMS[DEFAULT_TRANSPORT_TYPE] = ["bus", "BEST bus", "DTC bus", "बस", "BMTC bus", "state transport bus"]
+TONE_WEIGHTS = {"negative": 0.45, "positive": 0.25, "neutral": 0.3}
+LANGUAGE_WEIGHTS = {"en": 0.7, "hinglish": 0.2, "hi": 0.1}
+
+# {transport} and {place} are filled in; {place} may end up empty
+TEMPLATES = {
+    ("en", "negative"): [
+        "The {transport} {place}is late again, waited 40 minutes",
+        "Overcrowded {transport} {place}every single morning, this is unacceptable",
+        "Why is the {transport} {place}always delayed? Terrible service",
+        "Stuck in the {transport} {place}for an hour, AC not working",
+        "{transport} driver was so rude today {place}",
+        "Dirty seats and broken windows in the {transport} {place}, worst experience",
+        "Cancelled {transport} {place}without any notice. Commuters stranded",
+    ],
+    ("en", "positive"): [
+        "The new {transport} {place}is clean and on time, great job",
+        "Smooth and comfortable {transport} ride {place}today",
+        "Really impressed with the {transport} service {place}, very punctual",
+        "Thanks to the helpful {transport} staff {place}",
+        "Love the new {transport} route {place}, saves me so much time",
+    ],
+    ("en", "neutral"): [
+        "Taking the {transport} {place}to office",
+        "Which {transport} {place}goes to the airport?",
+        "{transport} timings {place}changed from Monday",
+        "On the {transport} {place}right now",
+    ],
+    ("hinglish", "negative"): [
+        "{transport} {place}phir se late, ekdum bakwas service",
+        "{transport} mein itni bheed {place}, khada hona bhi mushkil",
+        "Yaar {transport} {place}ka haal bahut kharab hai",
+        "{transport} wale ne double paisa maanga {place}, ghatiya",
+    ],
+    ("hinglish", "positive"): [
+        "{transport} {place}aaj time pe aayi, badhiya",
+        "Nayi {transport} {place}ekdum mast hai",
+        "{transport} ka safar {place}bahut accha raha, dhanyavad",
+    ],
+    ("hinglish", "neutral"): [
+        "{transport} {place}se office ja raha hoon",
+        "Kal {transport} {place}kitne baje milegi?",
+    ],
+    ("hi", "negative"): [
+        "{transport} {place}फिर से देरी से आई, बहुत परेशानी हुई",
+        "{transport} {place}में बहुत भीड़ है",
+        "{transport} {place}की सेवा बेकार है",
+    ],
+    ("hi", "positive"): [
+        "{transport} {place}समय पर आई, बढ़िया सेवा",
+        "{transport} {place}बहुत अच्छी और साफ है",
+    ],
+    ("hi", "neutral"): [
+        "{transport} {place}से घर जा रहा हूँ",
+        "{transport} {place}अब हर 10 मिनट में",
+    ],
+}
+PLACE_FORMATS = {"en": "in {} ", "hinglish": "{} ", "hi": "{} "}
+NEUTRAL_EMOJIS = ["🚌", "🚇", "🚆", "🛺", "🚕", "🚉", "⏰"]
+HANDLES = ["@RailMinIndia", "@OfficialDMRC", "@BMTC_BENGALURU", "@myBESTBus", "@Uber_India", "@Olacabs",
+           "@IRCTC_Ltd", "@MumbaiMetro3", "@chennaimetrorail", "@ltmhyderabad"]
+HASHTAGS = ["#commute", "#publictransport", "#traffic", "#IndianRailways", "#metro", "#MumbaiRains",
+            "#BengaluruTraffic"]
+_LINK_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+def _places():
+    """Place mentions, most tweeted first: metro nicknames, then cities, then states"""
+    places = [keyword.title() for keyword in LOCATION_MAPPINGS]
+    places += [city for cities in INDIAN_STATES_CITIES.values() for city in cities if city not in places]
+    places += list(INDIAN_STATES_CITIES)
+    weights = [1.0 / (rank + 1) ** 0.9 for rank in range(len(places))]
+    return places, weights
+
+
+def _link(rng):
+    return "https://t.co/" + "".join(rng.choice(_LINK_CHARS) for _ in range(10))
+
+
+def _compose(rng, places, place_weights):
+    tone = rng.choices(list(TONE_WEIGHTS), weights=list(TONE_WEIGHTS.values()))[0]
+    language = rng.choices(list(LANGUAGE_WEIGHTS), weights=list(LANGUAGE_WEIGHTS.values()))[0]
+    transport_type = rng.choices(list(TRANSPORT_WEIGHTS), weights=list(TRANSPORT_WEIGHTS.values()))[0]
+    terms = TRANSPORT_TERMS[transport_type]
+    # Devanagari terms in Hindi tweets, Latin ones otherwise
+    terms = [term for term in terms if term.isascii() != (language == "hi")] or terms
+    place = ""
+    if rng.random() >= NO_PLACE_SHARE:
+        place = PLACE_FORMATS[language].format(rng.choices(places, weights=place_weights)[0])
+    text = rng.choice(TEMPLATES[(language, tone)]).format(transport=rng.choice(terms), place=place)
+    text = " ".join(text.split()).replace(" ,", ",")
+    text = text[0].upper() + text[1:]
+
+    if rng.random() < EMOJI_SHARE:
+        pool = {"positive": POSITIVE_EMOJIS, "negative": NEGATIVE_EMOJIS, "neutral": NEUTRAL_EMOJIS}[tone]
+        text += " " + "".join(rng.choice(pool) for _ in range(rng.randint(1, 3)))
+    if rng.random() < 0.3:
+        text = f"{rng.choice(HANDLES)} {text}"
+    if rng.random() < 0.2:
+        text += " " + rng.choice(HASHTAGS)
+    return text, language
+
+
+def generate(count, seed=SEED, start=START):
+    """Yield `count` tweet dicts; deterministic for a seed, and prefix-stable in count"""
+    rng = random.Random(seed)
+    places, place_weights = _places()
+    recent = []  # texts available for reposts
+    for i in range(count):
+        if recent and rng.random() < REPOST_SHARE:
+            text, language = rng.choice(recent)
+            if rng.random() < 0.5:
+                text = f"RT {rng.choice(HANDLES)}: {text}"
+        else:
+            text, language = _compose(rng, places, place_weights)
+            recent.append((text, language))
+            if len(recent) > 1000:
+                recent.pop(rng.randrange(len(recent)))
+        if rng.random() < LINK_SHARE:
+            text += " " + _link(rng)
+        tweet_id = str(BASE_ID + i)
+        created_at = start + datetime.timedelta(seconds=i * SECONDS_PER_TWEET)
+        yield {
+            "lang": "hi" if language == "hi" else "en",
+            "text": text,
+            "id": tweet_id,
+            "author_id": str(1_000_000_000 + rng.randrange(10_000_000)),
+            "created_at": created_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "edit_history_tweet_ids": [tweet_id],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000, help="tweets to generate (10K to 10M is typical)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", default="backend/synthetic.jsonl", help="JSONL dump, readable by tweet_io")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.output, "w", encoding="utf-8") as f:
+        count = write_jsonl(f, generate(args.count, args.seed))
+    elapsed = time.perf_counter() - start
+    print(f"✅ Wrote {count:,} tweets to {args.output} in {elapsed:.1f}s ({count / elapsed:,.0f} tweets/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+In-process response cache for the read-only API routes.
+
+Entries are keyed by route and query parameters, expire after a TTL and
+are evicted least-recently-used beyond `max_entries`. The whole cache is
+also dropped whenever the data version changes: a counter in the
+data_version table that ingestion bumps in the same transaction as each
+chunk that inserts rows, so a freshly loaded batch is visible on the
+next poll instead of after the TTL.
+
+Cached bodies are kept as serialized bytes with a strong ETag and their
+gzip/brotli encodings, each compressed once on first request.
+"""
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import mysql.connector
+
+try:
+    import brotli
+except ImportError:  # optional: br is only offered when the package is installed
+    brotli = None
+
+DATA_VERSION_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS data_version (
+        id TINYINT UNSIGNED PRIMARY KEY,
+        version BIGINT UNSIGNED NOT NULL,
+        updated_at DATETIME NOT NULL
+    )
+"""
+SEED_DATA_VERSION_SQL = "INSERT IGNORE INTO data_version (id, version, updated_at) VALUES (1, 0, NOW())"
+BUMP_DATA_VERSION_SQL = "UPDATE data_version SET version = version + 1, updated_at = NOW() WHERE id = 1"
+READ_DATA_VERSION_SQL = "SELECT version FROM data_version WHERE id = 1"
+
+MIN_COMPRESS_SIZE = 1024  # bytes; smaller bodies are sent as-is
+ENCODERS = {'gzip': lambda body: gzip.compress(body, compresslevel=6)}
+if brotli is not None:
+    ENCODERS['br'] = lambda body: brotli.compress(body, quality=5)
+PREFERRED_ENCODINGS = ('br', 'gzip')
+
+
+def bump_data_version(cursor):
+    """Invalidate API caches; call inside the transaction that changed the data"""
+    cursor.execute(BUMP_DATA_VERSION_SQL)
+
+
+class EncodedBody:
+    """
+    One serialized response body with its ETag and lazily built
+    compressed variants (each encoding is compressed at most once),
+    plus the pagination cursor sent alongside it
+    """
+
+    def __init__(self, body, mimetype, next_cursor=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.next_cursor = next_cursor
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._variants = {'identity': body}
+        self._lock = threading.Lock()
+
+    def negotiate(self, accept_encodings):
+        """Best encoding for a werkzeug Accept-Encoding header"""
+        if len(self.body) < MIN_COMPRESS_SIZE:
+            return 'identity'
+        for encoding in PREFERRED_ENCODINGS:
+            if encoding in ENCODERS and accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def variant(self, encoding):
+        """(bytes, strong ETag) of the body in `encoding`"""
+        with self._lock:
+            data = self._variants.get(encoding)
+            if data is None:
+                data = self._variants[encoding] = ENCODERS[encoding](self.body)
+        etag = self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+        return data, etag
+
+    def etags(self):
+        return [self.etag] + [f"{self.etag}-{encoding}" for encoding in ENCODERS]
+
+
+class ResponseCache:
+    def __init__(self, max_entries=256, ttl=30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key):
+        """Cached value for key, or None on a miss/expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['ttl'] = self.ttl
+        return stats
+
+
+class DataVersionWatcher:
+    """
+    Polls data_version at most every `interval` seconds and clears the
+    cache when it moves. Poll failures leave the cache to its TTL.
+
+    `check()` polls through a db_pool.ConnectionPool; servers with their
+    own driver (asgi_api.py) run READ_DATA_VERSION_SQL themselves between
+    `begin_check()` and `end_check(version)`.
+    """
+
+    def __init__(self, pool, cache, interval=1.0):
+        self.pool = pool
+        self.cache = cache
+        self.interval = interval
+        self.version = None
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def begin_check(self):
+        """True if a poll is due and the caller should run it, then call end_check"""
+        now = time.monotonic()
+        if now - self._checked_at < self.interval:
+            return False
+        # Only one request polls; the others keep using the cache
+        if not self._lock.acquire(blocking=False):
+            return False
+        self._checked_at = now
+        return True
+
+    def end_check(self, version):
+        """Record the polled version (None if the poll failed)"""
+        try:
+            if version is not None and version != self.version:
+                if self.version is not None:
+                    self.cache.clear()
+                self.version = version
+        finally:
+            self._lock.release()
+
+    def check(self):
+        if not self.begin_check():
+            return
+        version = None
+        try:
+            with self.pool.cursor() as cursor:
+                cursor.execute(READ_DATA_VERSION_SQL)
+                row = cursor.fetchone()
+            version = row[0] if row else None
+        except mysql.connector.Error as err:
+            print(f"Data version check failed: {err}")
+        finally:
+            self.end_check(version)
@@ -0,0 +1,160 @@
+"""
+Ingestion checkpoints for analyse_sentiment.py and twitter_scraper.py.
+
+SeenIds is the persisted set of tweet ids already loaded into MySQL, so
+incremental runs can drop them before any NLP work. It is an append-only
+file of raw uint64 ids, held in memory as one sorted NumPy array (8 bytes
+per id) plus a small set of recent additions.
+
+IngestCheckpoint records how far through an input dump the last run got
+(committed position, high-water id and created_at) so a crashed run can
+be resumed.
+
+SearchCheckpoint keeps, per scraper query, the since_id up to which
+search results have been collected, so each run only pages through
+tweets posted since the last one.
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+CHECKPOINT_PATH = "backend/.ingest_checkpoint.json"
+SEEN_IDS_PATH = "backend/.ingested_ids.u64"
+SEARCH_CHECKPOINT_PATH = "backend/.scraper_checkpoint.json"
+TWITTER_EPOCH_MS = 1288834974657  # snowflake ids count milliseconds from here
+MERGE_EVERY = 100_000  # recent ids kept in a set before folding into the array
+
+
+def snowflake_time(tweet_id):
+    """UTC creation time encoded in a tweet id"""
+    return datetime.fromtimestamp(((int(tweet_id) >> 22) + TWITTER_EPOCH_MS) / 1000, tz=timezone.utc)
+
+
+class SeenIds:
+    """Append-only set of ingested tweet ids"""
+
+    def __init__(self, path=SEEN_IDS_PATH):
+        import numpy as np  # deferred: the scraper imports this module only for SearchCheckpoint
+
+        self.path = path
+        if os.path.exists(path):
+            self._sorted = np.unique(np.fromfile(path, dtype=np.uint64))
+        else:
+            self._sorted = np.empty(0, dtype=np.uint64)
+        self._recent = set()
+
+    def __len__(self):
+        return len(self._sorted) + len(self._recent)
+
+    def __contains__(self, tweet_id):
+        import numpy as np
+
+        tweet_id = int(tweet_id)
+        if tweet_id in self._recent:
+            return True
+        i = np.searchsorted(self._sorted, np.uint64(tweet_id))
+        return i < len(self._sorted) and int(self._sorted[i]) == tweet_id
+
+    def add(self, tweet_ids):
+        """Record ids (after they are committed) and append them to disk"""
+        import numpy as np
+
+        ids = np.array([int(tweet_id) for tweet_id in tweet_ids], dtype=np.uint64)
+        with open(self.path, "ab") as f:
+            ids.tofile(f)
+        self._recent.update(ids.tolist())
+        if len(self._recent) >= MERGE_EVERY:
+            merged = np.fromiter(self._recent, dtype=np.uint64, count=len(self._recent))
+            self._sorted = np.union1d(self._sorted, merged)
+            self._recent.clear()
+
+
+class IngestCheckpoint:
+    """Progress of the current/last run through one input file"""
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    @staticmethod
+    def _fingerprint(input_path):
+        stat = os.stat(input_path)
+        return {"input": os.path.abspath(input_path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def resume_offset(self, input_path):
+        """
+        Number of input tweets already handled by an earlier run over this
+        exact file, or 0 when the checkpoint belongs to another/changed file
+        """
+        saved = {key: self.state.get(key) for key in ("input", "size", "mtime")}
+        if saved != self._fingerprint(input_path):
+            return 0
+        return self.state.get("offset", 0)
+
+    def start(self, input_path, offset):
+        """Begin a run over input_path at `offset`; the high-water marks carry over"""
+        self.state.update(self._fingerprint(input_path))
+        self.state["offset"] = offset
+        self.state["status"] = "running"
+        self._save()
+
+    def advance(self, offset, rows, inserted):
+        """Record a committed chunk of (id, text, created_at, ...) rows"""
+        self.state["offset"] = offset
+        self.state["ingested"] = self.state.get("ingested", 0) + inserted
+        max_id = max(int(row[0]) for row in rows)
+        max_created_at = max(row[2] for row in rows)
+        if self.state.get("max_id") is None or max_id > int(self.state["max_id"]):
+            self.state["max_id"] = str(max_id)
+        if self.state.get("max_created_at") is None or max_created_at > self.state["max_created_at"]:
+            self.state["max_created_at"] = max_created_at
+        self._save()
+
+    def finish(self, offset):
+        self.state["offset"] = offset
+        self.state["status"] = "complete"
+        self._save()
+
+    def _save(self):
+        self.state["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class SearchCheckpoint:
+    """
+    Per-query search progress of the scraper:
+
+      since_id   newest tweet id collected; the next run asks only for newer ones
+      until_id   set when a run stopped at its page budget: tweets between
+                 since_id and until_id are still to be fetched
+      newest_id  newest id of that truncated run, which becomes since_id
+                 once the gap is filled
+    """
+
+    def __init__(self, path=SEARCH_CHECKPOINT_PATH):
+        self.path = path
+        self.queries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.queries = json.load(f).get("queries", {})
+
+    def get(self, query):
+        return dict(self.queries.get(query, {}))
+
+    def set(self, query, state):
+        """Record a query's progress (after its tweets are written) and persist"""
+        self.queries[query] = {key: value for key, value in state.items() if value is not None}
+        self._save()
+
+    def _save(self):
+        state = {"queries": self.queries, "updated_at": datetime.now().isoformat(timespec="seconds")}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.path)
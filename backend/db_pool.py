@@ -0,0 +1,160 @@
+"""
+Small thread-safe MySQL connection pool for the API server.
+
+Connections are opened lazily up to `size`, health-checked with a ping
+when checked out, and always returned through the `connection()` /
+`cursor()` context managers, even when the route raises. `size=0`
+disables pooling (connect per request, the old behaviour) for comparison.
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+
+WAIT_SLICE = 0.1  # seconds between retries while the pool is exhausted
+
+
+class PoolTimeout(mysql.connector.Error):
+    """No connection became free within the checkout timeout"""
+
+
+class ConnectionPool:
+    def __init__(self, db_config, size=8, timeout=5.0):
+        self.db_config = db_config
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._stats = {
+            'checkouts': 0,
+            'in_use': 0,
+            'peak_in_use': 0,
+            'connects': 0,
+            'reconnects': 0,
+            'timeouts': 0,
+            'wait_seconds': 0.0,
+        }
+
+    def _connect(self):
+        conn = mysql.connector.connect(**self.db_config)
+        # Read-only API: autocommit keeps pooled connections from pinning an
+        # old REPEATABLE READ snapshot between requests
+        conn.autocommit = True
+        with self._lock:
+            self._stats['connects'] += 1
+        return conn
+
+    def _open_slot(self):
+        """Reserve room for one more connection, if the pool is not full"""
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return True
+            return False
+
+    def _connect_slot(self):
+        try:
+            return self._connect()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def _acquire(self):
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+            if self._open_slot():
+                return self._connect_slot()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                    self._stats['wait_seconds'] += time.perf_counter() - start
+                raise PoolTimeout(msg=f"No database connection free after {self.timeout}s")
+            # Short waits so a slot freed by a discarded connection is noticed
+            try:
+                conn = self._idle.get(timeout=min(remaining, WAIT_SLICE))
+                break
+            except queue.Empty:
+                continue
+        with self._lock:
+            self._stats['wait_seconds'] += time.perf_counter() - start
+
+        # Health check on checkout
+        try:
+            conn.ping(reconnect=True, attempts=1, delay=0)
+        except mysql.connector.Error:
+            with self._lock:
+                self._stats['reconnects'] += 1
+            try:
+                conn.close()
+            except mysql.connector.Error:
+                pass
+            return self._connect_slot()
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection; it is returned to the pool on exit"""
+        if self.size <= 0:
+            conn = self._connect()
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        conn = self._acquire()
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._stats['in_use'])
+        healthy = True
+        try:
+            yield conn
+        except mysql.connector.Error:
+            healthy = False
+            raise
+        finally:
+            with self._lock:
+                self._stats['in_use'] -= 1
+            if healthy:
+                self._idle.put(conn)
+            else:
+                self._discard(conn)
+
+    @contextmanager
+    def cursor(self, **kwargs):
+        """Check out a connection and open a cursor on it"""
+        with self.connection() as conn:
+            cursor = conn.cursor(**kwargs)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open'] = self._opened
+        stats['size'] = self.size
+        stats['idle'] = self._idle.qsize()
+        stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+        return stats
@@ -0,0 +1,166 @@
+"""
+Server-Sent Events push feed for the dashboard.
+
+One upstream poller per API process asks the database for rows ingested
+since the last sequence number it saw (tweet_sentiment.seq, assigned by
+AUTO_INCREMENT on insert) and turns them into events. Each event is
+serialized once and fanned out to every subscriber's bounded queue, so
+database load follows the rate of new data rather than the number of
+connected dashboards. The poller only runs while someone is subscribed.
+
+A subscriber that falls a full queue behind is disconnected; EventSource
+reconnects with Last-Event-ID and the gap is replayed from the database.
+
+seq order equals commit order because every writer (analyse_sentiment.py,
+pipeline.py, migrate.py) holds analyse_sentiment.WRITER_LOCK from before
+its INSERT until the commit: a row is only numbered once every lower seq
+is committed, so polling seq > last never passes over a row. A writer
+that bypasses the lock breaks this.
+"""
+import json
+import queue
+import threading
+import time
+
+FEED_POLL_INTERVAL = 1.0   # seconds between upstream polls
+SUBSCRIBER_QUEUE_SIZE = 100  # events buffered per client before it is dropped
+HEARTBEAT_INTERVAL = 15.0  # seconds of silence before a keep-alive comment
+RETRY_MS = 3000            # client reconnect delay sent to EventSource
+
+_DROPPED = object()
+
+
+def format_event(seq, event, data):
+    """SSE wire format for one event"""
+    payload = json.dumps(data, separators=(',', ':'), default=str)
+    return f"id: {seq}\nevent: {event}\ndata: {payload}\n\n".encode()
+
+
+class Subscription:
+    def __init__(self, start_seq):
+        self.start_seq = start_seq  # feed position when the client joined
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, seq, message):
+        try:
+            self.queue.put_nowait((seq, message))
+            return True
+        except queue.Full:
+            return False
+
+    def drop(self):
+        # Make room for the sentinel so the reader sees it promptly
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        self.queue.put_nowait((None, _DROPPED))
+
+
+class FeedHub:
+    """
+    Fan-out hub. `fetch_changes(after_seq, until_seq=None)` returns
+    (last_seq, [(event, data), ...]) for rows with after_seq < seq <= until_seq;
+    `current_seq()` returns the newest seq in the table.
+    """
+
+    def __init__(self, fetch_changes, current_seq, interval=FEED_POLL_INTERVAL):
+        self.fetch_changes = fetch_changes
+        self.current_seq = current_seq
+        self.interval = interval
+        self.seq = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {'published': 0, 'dropped_subscribers': 0, 'polls': 0, 'poll_errors': 0}
+
+    def subscribe(self):
+        with self._lock:
+            if self._thread is None:
+                self.seq = self.current_seq()
+                self._thread = threading.Thread(target=self._run, name="feed-hub", daemon=True)
+                self._thread.start()
+            subscription = Subscription(self.seq)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, seq, events):
+        """
+        Advance the feed to `seq` and fan its events out. The position and
+        the subscriber snapshot change together, so a client joining
+        meanwhile either receives these events or replays them.
+        """
+        messages = [format_event(seq, event, data) for event, data in events]
+        with self._lock:
+            self.seq = seq
+            subscribers = list(self._subscribers)
+        dropped = 0
+        for subscription in subscribers:
+            for message in messages:
+                if not subscription.offer(seq, message):
+                    subscription.drop()
+                    self.unsubscribe(subscription)
+                    dropped += 1
+                    break
+        with self._lock:
+            self._stats['published'] += len(messages)
+            self._stats['dropped_subscribers'] += dropped
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+                self._stats['polls'] += 1
+            try:
+                # Catch up in batches when a large load lands at once
+                while True:
+                    last_seq, events = self.fetch_changes(self.seq)
+                    if not events:
+                        break
+                    self.publish(last_seq, events)
+            except Exception as e:
+                with self._lock:
+                    self._stats['poll_errors'] += 1
+                print(f"Feed poll failed: {e}")
+
+    def stream(self, subscription, last_event_id=None):
+        """
+        Yield SSE messages for one client: a replay of anything after
+        last_event_id up to the point it joined, then live events
+        """
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        replayed = subscription.start_seq
+        if last_event_id is not None and last_event_id < subscription.start_seq:
+            after = last_event_id
+            while after < subscription.start_seq:
+                last_seq, events = self.fetch_changes(after, subscription.start_seq)
+                if not events:
+                    break
+                for event, data in events:
+                    yield format_event(last_seq, event, data)
+                after = last_seq
+        while True:
+            try:
+                seq, message = subscription.queue.get(timeout=HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                yield b": keep-alive\n\n"
+                continue
+            if message is _DROPPED:
+                return
+            if seq > replayed:
+                yield message
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['subscribers'] = len(self._subscribers)
+            stats['seq'] = self.seq
+        return stats
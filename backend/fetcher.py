@@ -0,0 +1,233 @@
+"""
+Concurrent, rate-limit-aware fetching for twitter_scraper.py.
+
+Queries are fetched by a small thread pool sharing one keep-alive
+requests.Session. Every request first takes a token from its endpoint's
+TokenBucket. The bucket is synced from the x-rate-limit-remaining /
+x-rate-limit-reset headers of each response, so requests go out as fast
+as the remaining quota allows. When the quota is spent, they wait exactly
+until the window resets (no fixed sleeps, no blind 15-minute backoff
+on 429).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FETCH_CONCURRENCY = 8       # queries in flight at once
+DEFAULT_RATE_LIMIT = 450    # requests per window until the API reports its own limit
+RATE_LIMIT_WINDOW = 15 * 60 # seconds (Twitter v2 rate-limit window)
+MAX_ATTEMPTS = 5            # per query, counting 429s and connection errors
+REQUEST_TIMEOUT = 30        # seconds
+STOP_POLL_INTERVAL = 1.0    # seconds between stop checks while waiting for a window reset
+
+
+class Unauthorized(Exception):
+    """401 from the API: the bearer token is invalid, so every query would fail"""
+
+
+class TokenBucket:
+    """
+    Request budget of one endpoint for the current rate-limit window.
+
+    Holds `limit` tokens, refilled all at once at `reset_at` (epoch
+    seconds). Requests sent in the window are counted locally; a response
+    can only lower the count further (when another client shares the
+    quota), never raise it, since responses arrive out of order and
+    before other in-flight requests are counted. Until the first
+    response reports the real limit, only one request is sent.
+    """
+
+    def __init__(self, limit=DEFAULT_RATE_LIMIT, window=RATE_LIMIT_WINDOW):
+        self.limit = limit
+        self.window = window
+        self.sent = 0  # requests sent in the current window
+        self.reset_at = time.time() + window
+        self.in_flight = 0
+        self.synced = False
+        self.stale_reset = 0.0  # responses reporting this reset or earlier belong to a past window
+        self.waited = 0.0  # total seconds callers spent blocked in acquire()
+        self._cond = threading.Condition()
+
+    @property
+    def tokens(self):
+        return max(self.limit - self.sent, 0)
+
+    def acquire(self, stop=None):
+        """Block until a request may be sent; False if `stop` (an Event) was set first"""
+        with self._cond:
+            while True:
+                if stop is not None and stop.is_set():
+                    return False
+                now = time.time()
+                if now >= self.reset_at:
+                    self.stale_reset = self.reset_at
+                    self.reset_at = now + self.window
+                    self.sent = 0
+                probing = not self.synced and self.in_flight > 0
+                if self.tokens > 0 and not probing:
+                    self.sent += 1
+                    self.in_flight += 1
+                    return True
+                self._cond.wait(min(self.reset_at - now, STOP_POLL_INTERVAL))
+                self.waited += time.time() - now
+
+    def update(self, headers, status_code):
+        """Sync from a response to a request made after acquire()"""
+        with self._cond:
+            self.in_flight = max(self.in_flight - 1, 0)
+            limit = headers.get('x-rate-limit-limit')
+            remaining = headers.get('x-rate-limit-remaining')
+            reset = headers.get('x-rate-limit-reset')
+            if limit is not None:
+                self.limit = int(limit)
+            self.synced = True
+            if reset is None:
+                if status_code == 429:
+                    self.sent = self.limit
+                    self.reset_at = time.time() + self.window
+            elif float(reset) > self.stale_reset:
+                self.reset_at = float(reset)
+                if status_code == 429:
+                    self.sent = self.limit
+                elif remaining is not None:
+                    self.sent = max(self.sent, self.limit - int(remaining))
+            self._cond.notify_all()
+
+    def release(self):
+        """Return the slot of a request that got no response"""
+        with self._cond:
+            self.in_flight = max(self.in_flight - 1, 0)
+            self._cond.notify_all()
+
+
+class QueryFetcher:
+    """
+    Runs many search queries concurrently against a rate-limited API.
+
+    A search's parameters are built once and reused for all of its
+    next_token pages, so every page covers the same time window. Only the
+    first page rebuilds them per attempt, so a search retried after a 429
+    gets a fresh window.
+    """
+
+    def __init__(self, headers, concurrency=FETCH_CONCURRENCY, rate_limit=DEFAULT_RATE_LIMIT,
+                 window=RATE_LIMIT_WINDOW):
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.window = window
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats = {'requests': 0, 'rate_limited': 0, 'errors': 0}
+
+    def bucket(self, url):
+        """The TokenBucket of the endpoint (path) `url` belongs to"""
+        endpoint = urlsplit(url).path
+        with self._lock:
+            if endpoint not in self._buckets:
+                self._buckets[endpoint] = TokenBucket(self.rate_limit, self.window)
+            return self._buckets[endpoint]
+
+    def get(self, url, params):
+        """
+        GET through the endpoint's bucket, retrying 429s and connection
+        errors. `params` may be a callable, rebuilt for every attempt (so a
+        retry after waiting out a window gets a fresh time window).
+        Returns the final response (None if every attempt failed).
+        """
+        bucket = self.bucket(url)
+        for _ in range(MAX_ATTEMPTS):
+            if not bucket.acquire(self._stop):
+                return None
+            try:
+                response = self.session.get(url, params=params() if callable(params) else params,
+                                            timeout=REQUEST_TIMEOUT)
+            except requests.exceptions.RequestException as e:
+                bucket.release()
+                with self._lock:
+                    self.stats['errors'] += 1
+                print(f"❌ A request exception occurred: {e}")
+                continue
+            bucket.update(response.headers, response.status_code)
+            with self._lock:
+                self.stats['requests'] += 1
+                if response.status_code == 429:
+                    self.stats['rate_limited'] += 1
+            if response.status_code == 401:
+                raise Unauthorized(response.text)
+            if response.status_code != 429:
+                return response
+            print(f"⏳ Rate limit hit. Waiting for the window to reset at "
+                  f"{time.strftime('%I:%M:%S %p', time.localtime(bucket.reset_at))}.")
+        return None
+
+    def search(self, url, build_params, max_pages):
+        """
+        Page through a v2 search by following meta.next_token, for at most
+        `max_pages` requests. Returns (tweets, meta): meta has the newest_id
+        and oldest_id collected, the pages used and whether the results were
+        exhausted (`complete`; False if the budget ran out or a request failed).
+        """
+        tweets = []
+        meta = {'newest_id': None, 'oldest_id': None, 'pages': 0, 'complete': False}
+        next_token = None
+        params = None
+        while meta['pages'] < max_pages:
+            def page_params(token=next_token):
+                nonlocal params
+                if not token:
+                    # Until a page is returned, every attempt (e.g. after a 429) starts from a fresh window
+                    params = build_params()
+                    return params
+                # next_token is only valid with the parameters of the first page
+                return dict(params, next_token=token)
+
+            response = self.get(url, page_params)
+            if response is None:
+                break
+            if response.status_code != 200:
+                print(f"❌ Error: {response.status_code} {response.reason}")
+                print(f"Response Body: {response.text}")
+                break
+            meta['pages'] += 1
+            body = response.json()
+            tweets.extend(body.get('data', []))
+            page_meta = body.get('meta', {})
+            if meta['newest_id'] is None:
+                meta['newest_id'] = page_meta.get('newest_id')
+            meta['oldest_id'] = page_meta.get('oldest_id') or meta['oldest_id']
+            next_token = page_meta.get('next_token')
+            if not next_token:
+                meta['complete'] = True
+                break
+        return tweets, meta
+
+    def fetch(self, queries, task):
+        """
+        Run task(query) for every query on the worker pool and yield
+        (query, result) in completion order. Unauthorized stops the
+        remaining queries.
+        """
+        self._stop.clear()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="fetch") as pool:
+            futures = {pool.submit(task, query): query for query in queries}
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                # Unblock workers waiting on a window reset and skip queued queries
+                self._stop.set()
+                for future in futures:
+                    future.cancel()
+
+    def close(self):
+        self.session.close()
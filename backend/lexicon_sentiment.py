@@ -0,0 +1,392 @@
+"""
+Lexicon-based sentiment scoring: the fast backend of scorers.py.
+
+A VADER-style scorer (Hutto & Gilbert's rules) over one flat
+word -> valence dict:
+  - the base lexicon is VADER's vader_lexicon.txt when the optional
+    vaderSentiment package is installed, else TextBlob's pattern lexicon
+    (en-sentiment.xml) rescaled to VADER's -4..+4 valences; the two score
+    differently, so the scorer's identity names the one in use
+    ("lexicon:vader" or "lexicon:pattern")
+  - TRANSPORT_LEXICON and HINGLISH_LEXICON are merged on top, so commuter
+    complaints ("overcrowded", "stranded") and romanized Hindi /
+    Devanagari words ("bakwas", "बेकार") score
+  - emoji are scored from their names (VADER's emoji lexicon) and the
+    sentiment.py emoji lists
+Rules: boosters and negations up to three tokens back, Hindi negations
+after the word they negate ("accha nahi"), ALL-CAPS and "!" emphasis and
+the "but" shift. The compound score (-1..1) is the polarity; the share of
+sentiment-bearing weight is the subjectivity.
+
+Each distinct raw token is resolved to a word id once (cached); the rules
+then run as NumPy array operations over all tokens of a batch, instead of
+a Python loop per word.
+
+The tables are built on first use (see `LexiconScorer.load`), not at
+import.
+"""
+import importlib.util
+import os
+import re
+import string
+import threading
+import xml.etree.ElementTree as ElementTree
+
+from sentiment import NEGATIVE_EMOJIS, POSITIVE_EMOJIS, sentiment_confidence
+
+try:
+    import vaderSentiment
+except ImportError:  # optional: fall back to TextBlob's pattern lexicon
+    vaderSentiment = None
+
+LEXICON_SOURCE = "vader" if vaderSentiment is not None else "pattern"
+
+# VADER thresholds on the compound score
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# VADER's empirically derived constants
+B_INCR = 0.293       # booster increment
+C_INCR = 0.733       # ALL-CAPS emphasis
+N_SCALAR = -0.74     # negation
+BUT_BEFORE, BUT_AFTER = 0.5, 1.5
+EXCLAMATION_INCR = 0.292
+QUESTION_INCR = 0.18
+ALPHA = 15           # compound normalization
+
+BOOSTERS = dict.fromkeys([
+    "absolutely", "amazingly", "awfully", "completely", "considerably", "decidedly", "deeply", "effing",
+    "enormously", "entirely", "especially", "exceptionally", "extremely", "fabulously", "flipping", "freaking",
+    "fucking", "fully", "greatly", "highly", "hugely", "incredibly", "intensely", "majorly", "more", "most",
+    "particularly", "purely", "quite", "really", "remarkably", "so", "substantially", "thoroughly", "totally",
+    "tremendously", "uber", "unbelievably", "unusually", "utterly", "very",
+    # Hinglish / Hindi
+    "bahut", "bohot", "bahot", "bohat", "ekdum", "bilkul", "kaafi", "kafi", "itna", "itni", "zyada", "jyada",
+    "बहुत", "एकदम", "बिल्कुल", "काफी", "ज़्यादा", "ज्यादा",
+], B_INCR)
+BOOSTERS.update(dict.fromkeys([
+    "almost", "barely", "hardly", "kinda", "less", "little", "marginally", "occasionally", "partly", "scarcely",
+    "slightly", "somewhat", "sorta", "thoda", "thodi", "थोड़ा", "थोड़ी",
+], -B_INCR))
+
+NEGATIONS = frozenset([
+    "aint", "arent", "cannot", "cant", "couldnt", "darent", "didnt", "doesnt", "dont", "hadnt", "hasnt", "havent",
+    "isnt", "mightnt", "mustnt", "neither", "never", "none", "nope", "nor", "not", "nothing", "nowhere", "shant",
+    "shouldnt", "wasnt", "werent", "without", "wont", "wouldnt", "rarely", "seldom", "despite",
+    "mat", "मत",
+])
+# Hindi puts the negation after the word it negates ("accha nahi hai")
+POST_NEGATIONS = frozenset(["nahi", "nahin", "nhi", "nai", "na", "नहीं", "नही", "ना"])
+BUT_WORDS = frozenset(["but", "however", "lekin", "magar", "लेकिन", "मगर"])
+
+# Commuter vocabulary that general-purpose lexicons miss or underweight
+TRANSPORT_LEXICON = {
+    "late": -1.5, "delayed": -1.8, "delay": -1.6, "delays": -1.6, "crowded": -1.5, "overcrowded": -2.2,
+    "packed": -1.0, "stuck": -1.8, "stranded": -2.2, "breakdown": -2.2, "cancelled": -2.0, "canceled": -2.0,
+    "derailed": -3.0, "derailment": -3.0, "accident": -2.5, "collision": -2.5, "dirty": -2.0, "filthy": -2.5,
+    "smelly": -1.8, "unsafe": -2.5, "rude": -2.2, "overpriced": -2.0, "overcharged": -2.3, "overcharging": -2.3,
+    "jam": -1.5, "congestion": -1.6, "potholes": -1.8, "waterlogging": -1.8, "waterlogged": -1.8,
+    "harassment": -3.0, "harassed": -3.0, "theft": -2.5, "pickpocket": -2.3, "cramped": -1.5, "slow": -1.2,
+    "unreliable": -2.0, "refused": -1.5, "mismanagement": -2.2, "chaos": -2.0, "chaotic": -2.0,
+    "punctual": 2.0, "clean": 1.9, "smooth": 1.8, "comfortable": 2.0, "spacious": 1.5, "affordable": 1.6,
+    "efficient": 2.0, "reliable": 2.0, "convenient": 1.8, "safe": 1.8, "courteous": 2.0, "helpful": 1.9,
+    "fast": 1.2, "quick": 1.2, "seamless": 2.0, "frequent": 1.0, "airconditioned": 1.2,
+}
+# Two-word terms; the valence replaces that of the second word
+TRANSPORT_BIGRAMS = {
+    ("on", "time"): 1.8, ("well", "maintained"): 2.0, ("broke", "down"): -2.3, ("break", "down"): -2.2,
+    ("no", "ac"): -1.8, ("traffic", "jam"): -1.8, ("thank", "you"): 1.8, ("waste", "of"): -1.8,
+    ("samay", "par"): 1.8,
+}
+HINGLISH_LEXICON = {
+    # romanized
+    "accha": 1.9, "acha": 1.9, "achha": 1.9, "achchha": 1.9, "acchi": 1.9, "achhi": 1.9, "badhiya": 2.3,
+    "badiya": 2.3, "mast": 2.0, "shandaar": 2.5, "shandar": 2.5, "zabardast": 2.5, "jabardast": 2.5, "sahi": 1.5,
+    "behtar": 1.7, "aaram": 1.5, "aaramdayak": 2.0, "saaf": 1.8, "dhanyavad": 1.8, "dhanyawad": 1.8,
+    "shukriya": 1.8, "khush": 2.0, "bekaar": -2.2, "bekar": -2.2, "bakwas": -2.5, "bakwaas": -2.5,
+    "ghatiya": -2.7, "ganda": -2.0, "gandi": -2.0, "gande": -2.0, "kharab": -2.0, "kharaab": -2.0, "bura": -2.0,
+    "buri": -2.0, "bure": -2.0, "pareshan": -2.0, "pareshani": -2.0, "bheed": -1.5, "bheedh": -1.5,
+    "deri": -1.8, "der": -1.2, "lootna": -2.5, "loot": -2.3, "chor": -2.5, "dukhi": -2.0, "gussa": -2.0,
+    "faltu": -2.0, "tatti": -2.7, "bekaboo": -1.8,
+    # Devanagari
+    "अच्छा": 1.9, "अच्छी": 1.9, "अच्छे": 1.9, "बढ़िया": 2.3, "शानदार": 2.5, "ज़बरदस्त": 2.5,
+    "जबरदस्त": 2.5, "सही": 1.5, "बेहतर": 1.7, "आराम": 1.5, "आरामदायक": 2.0, "साफ": 1.8, "साफ़": 1.8,
+    "धन्यवाद": 1.8, "शुक्रिया": 1.8, "खुश": 2.0, "बेकार": -2.2, "बकवास": -2.5, "घटिया": -2.7,
+    "गंदा": -2.0, "गंदी": -2.0, "गंदे": -2.0, "खराब": -2.0, "ख़राब": -2.0, "बुरा": -2.0, "बुरी": -2.0,
+    "परेशान": -2.0, "परेशानी": -2.0, "भीड़": -1.5, "देरी": -1.8, "देर": -1.2, "लूट": -2.3,
+    "चोर": -2.5, "दुखी": -2.0, "गुस्सा": -2.0, "फालतू": -2.0,
+}
+# Nukta letters have a precomposed code point too ("ड़" as U+095C); both spellings are looked up
+_NUKTA_LETTERS = {"\u0915\u093c": "\u0958", "\u0916\u093c": "\u0959", "\u0917\u093c": "\u095a",
+                  "\u091c\u093c": "\u095b", "\u0921\u093c": "\u095c", "\u0922\u093c": "\u095d",
+                  "\u092b\u093c": "\u095e"}
+EMOJI_VALENCE = 2.0  # valence of the sentiment.py emoji lists
+
+_PUNCTUATION = string.punctuation + "“”‘’…।"
+# Emoji blocks, variation selector and joiner: cut out of the words; only _EMOJI_VALENCES score
+_EMOJI_RE = re.compile("[\U0001F000-\U0001FAFF\u2190-\u21FF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D]")
+
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def _vader_tables():
+    """(word -> valence, emoji -> description) from the vaderSentiment package data"""
+    directory = os.path.dirname(vaderSentiment.__file__)
+    lexicon = {}
+    with open(os.path.join(directory, "vader_lexicon.txt"), "r", encoding="utf-8") as f:
+        for line in f:
+            word, valence, *_ratings = line.rstrip("\n").split("\t")
+            lexicon[word] = float(valence)
+    emoji_names = {}
+    with open(os.path.join(directory, "emoji_utf8_lexicon.txt"), "r", encoding="utf-8") as f:
+        for line in f:
+            char, _, name = line.rstrip("\n").partition("\t")
+            emoji_names[char] = name
+    return lexicon, emoji_names
+
+
+def _pattern_lexicon():
+    """Word -> mean polarity of its senses in TextBlob's en-sentiment.xml, times 4"""
+    # Located without importing textblob (and NLTK with it)
+    package = importlib.util.find_spec("textblob").submodule_search_locations[0]
+    path = os.path.join(package, "en", "en-sentiment.xml")
+    senses = {}
+    for word in ElementTree.parse(path).getroot().iter("word"):
+        senses.setdefault(word.get("form").lower(), []).append(float(word.get("polarity", 0.0)))
+    return {form: round(sum(values) / len(values) * 4, 3) for form, values in senses.items() if any(values)}
+
+
+def load_resources():
+    """
+    Build the merged lexicon and the emoji valences. Runs once, on the
+    first scoring call; call it up front (e.g. as a process pool
+    initializer) to keep that cost out of the first batch.
+    """
+    global _loaded, _LEXICON, _MODIFIERS, _EMOJI_VALENCES, np
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        import numpy as np
+
+        if vaderSentiment is not None:
+            lexicon, emoji_names = _vader_tables()
+        else:
+            lexicon, emoji_names = _pattern_lexicon(), {}
+        lexicon.update(TRANSPORT_LEXICON)
+        for word, valence in HINGLISH_LEXICON.items():
+            lexicon[word] = valence
+            for decomposed, precomposed in _NUKTA_LETTERS.items():
+                word = word.replace(decomposed, precomposed)
+            lexicon[word] = valence
+        for word in BOOSTERS:
+            lexicon.pop(word, None)
+        _LEXICON = {word: valence for word, valence in lexicon.items() if valence}
+        # word -> (booster increment, negates) of the words that modify the next sentiment word
+        _MODIFIERS = {word: (BOOSTERS.get(word, 0.0), word in NEGATIONS)
+                      for word in BOOSTERS.keys() | NEGATIONS if word not in _LEXICON}
+
+        # An emoji scores as the words of its name ("angry face" -> "angry")
+        _EMOJI_VALENCES = {}
+        for char, name in emoji_names.items():
+            valence = sum(_LEXICON.get(word, 0.0) for word in name.lower().split())
+            if len(char) == 1 and valence:
+                _EMOJI_VALENCES[char] = valence
+        _EMOJI_VALENCES.update(dict.fromkeys(POSITIVE_EMOJIS, EMOJI_VALENCE))
+        _EMOJI_VALENCES.update(dict.fromkeys(NEGATIVE_EMOJIS, -EMOJI_VALENCE))
+        _build_word_tables()
+        _loaded = True
+
+
+def _build_word_tables():
+    """
+    Number the words that matter to the rules (id 0 is any other word)
+    and lay their roles out as NumPy arrays indexed by word id
+    """
+    global _WORD_IDS, _VALENCE, _BOOST, _NEGATES, _POST_NEGATES, _BUT, _BIGRAM_KEYS, _BIGRAM_VALENCES
+    words = sorted(_LEXICON.keys() | _MODIFIERS.keys() | POST_NEGATIONS | BUT_WORDS
+                   | {word for bigram in TRANSPORT_BIGRAMS for word in bigram})
+    _WORD_IDS = {word: i for i, word in enumerate(words, start=1)}
+    size = len(words) + 1
+    _VALENCE = np.zeros(size)
+    _BOOST = np.zeros(size)
+    _NEGATES = np.zeros(size, dtype=bool)
+    _POST_NEGATES = np.zeros(size, dtype=bool)
+    _BUT = np.zeros(size, dtype=bool)
+    for word, i in _WORD_IDS.items():
+        # A lexicon word is only ever scored, like in VADER
+        if word in _LEXICON:
+            _VALENCE[i] = _LEXICON[word]
+            continue
+        _BOOST[i], _NEGATES[i] = _MODIFIERS.get(word, (0.0, False))
+        _POST_NEGATES[i] = word in POST_NEGATIONS
+        _BUT[i] = word in BUT_WORDS
+    bigrams = sorted((_WORD_IDS[first] * size + _WORD_IDS[second], valence)
+                     for (first, second), valence in TRANSPORT_BIGRAMS.items())
+    _BIGRAM_KEYS = np.array([key for key, _ in bigrams], dtype=np.int64)
+    _BIGRAM_VALENCES = np.array([valence for _, valence in bigrams])
+    _TOKEN_CODES.clear()
+
+
+# Raw token -> word id * 2 + is ALL CAPS, or -1 for a dropped token
+_TOKEN_CODES = {}
+TOKEN_CACHE_SIZE = 1 << 20
+
+
+def _token_code(t):
+    """Code of one whitespace-delimited token (see _TOKEN_CODES)"""
+    stripped = t.strip(_PUNCTUATION)
+    # Like VADER, keep emoticons such as ":)" whole
+    if len(stripped) <= 2:
+        stripped = t
+    if len(stripped) <= 1:
+        return -1
+    word = stripped.lower().replace("’", "'")
+    if word.endswith("n't"):
+        word = "not"  # contracted negations ("didn't") negate like "not"
+    return _WORD_IDS.get(word, 0) * 2 + stripped.isupper()
+
+
+def _encode(texts):
+    """
+    Token codes of all texts, concatenated, and the token count of each
+    text; (text index, valence) of each scored emoji; "!"/"?" counts
+    """
+    if len(_TOKEN_CODES) > TOKEN_CACHE_SIZE:
+        _TOKEN_CODES.clear()
+    lookup = _TOKEN_CODES.get
+    codes = []
+    lengths = []
+    emoji = []
+    marks = []
+    for index, text in enumerate(texts):
+        if not text.isascii():
+            found = _EMOJI_RE.findall(text)
+            if found:
+                emoji.extend((index, _EMOJI_VALENCES[c]) for c in found if c in _EMOJI_VALENCES)
+                text = _EMOJI_RE.sub(" ", text)
+        tokens = text.split()
+        text_codes = list(map(lookup, tokens))
+        if None in text_codes:
+            for i, t in enumerate(tokens):
+                if text_codes[i] is None:
+                    text_codes[i] = _TOKEN_CODES[t] = _token_code(t)
+        codes.extend(text_codes)
+        lengths.append(len(text_codes))
+        if "!" in text or "?" in text:
+            marks.append((index, text.count("!"), text.count("?")))
+    return codes, lengths, emoji, marks
+
+
+def score_texts(texts):
+    """
+    (compounds, subjectivities) of many texts as NumPy arrays. The rules
+    run as array operations over the tokens of the whole batch; shifts
+    by 1 to 3 tokens that stay within one text give each word's
+    predecessors.
+    """
+    n = len(texts)
+    codes, lengths, emoji, marks = _encode(texts)
+    codes = np.array(codes, dtype=np.int64)
+    text = np.repeat(np.arange(n), lengths)
+    kept = codes >= 0
+    codes, text = codes[kept], text[kept]
+    word, upper = codes >> 1, (codes & 1).astype(bool)
+    tokens = np.bincount(text, minlength=n)
+
+    # ALL-CAPS emphasis only counts when some, but not all, words are capitalized
+    caps = np.bincount(text, weights=upper, minlength=n)
+    emphasized = upper & ((caps > 0) & (caps < tokens))[text]
+
+    valence = _VALENCE[word]
+    if len(word) > 1:
+        pairs = word[:-1] * len(_VALENCE) + word[1:]
+        found = np.minimum(np.searchsorted(_BIGRAM_KEYS, pairs), len(_BIGRAM_KEYS) - 1)
+        bigram = (_BIGRAM_KEYS[found] == pairs) & (text[:-1] == text[1:])
+        valence[1:][bigram] = _BIGRAM_VALENCES[found[bigram]]
+    hit = valence != 0
+    valence += np.where(emphasized & hit, np.where(valence > 0, C_INCR, -C_INCR), 0.0)
+
+    # Boosters and negations up to three words back, nearest first
+    for back, scale in ((1, 1.0), (2, 0.95), (3, 0.9)):
+        if len(word) <= back:
+            break
+        current = valence[back:]
+        previous = word[:-back]
+        applies = hit[back:] & (text[back:] == text[:-back])
+        sign = np.where(current > 0, 1.0, -1.0)
+        boost = _BOOST[previous]
+        boost = np.where(boost != 0, boost + emphasized[:-back] * C_INCR, 0.0)
+        current += np.where(applies, sign * boost * scale, 0.0)
+        current *= np.where(applies & _NEGATES[previous], N_SCALAR, 1.0)
+
+    # A Hindi negation negates the last sentiment word up to two words before it
+    post = np.flatnonzero(_POST_NEGATES[word])
+    post = post[post >= 1]
+    if len(post):
+        negated = np.full(len(post), -1)
+        for back in (2, 1):
+            candidate = post - back
+            ok = (candidate >= 0) & hit[np.maximum(candidate, 0)] & (text[np.maximum(candidate, 0)] == text[post])
+            negated[ok] = candidate[ok]
+        negated = negated[negated >= 0]
+        np.multiply.at(valence, negated, N_SCALAR)
+
+    # "but": words before the first one count half, words after it 1.5 times
+    buts = np.flatnonzero(_BUT[word])
+    if len(buts):
+        first = np.full(n, len(word))
+        np.minimum.at(first, text[buts], buts)
+        has_but = first[text] < len(word)
+        valence *= np.where(has_but, np.where(np.arange(len(word)) < first[text], BUT_BEFORE, BUT_AFTER), 1.0)
+
+    neutral = tokens - np.bincount(text, weights=hit, minlength=n)
+    # Scored emoji count like sentiment words (but not as words)
+    if emoji:
+        emoji_text, emoji_valence = np.array(emoji).T
+        text = np.concatenate([text, emoji_text.astype(np.int64)])
+        valence = np.concatenate([valence, emoji_valence])
+    # float even when no token survived (bincount of nothing is int64)
+    total = np.bincount(text, weights=valence, minlength=n).astype(float)
+    positive = np.bincount(text, weights=np.where(valence > 0, valence + 1, 0.0), minlength=n).astype(float)
+    negative = np.bincount(text, weights=np.where(valence < 0, 1 - valence, 0.0), minlength=n).astype(float)
+
+    emphasis = np.zeros(n)
+    if marks:
+        index, exclamations, questions = np.array(marks).T
+        emphasis[index] = (np.minimum(exclamations, 4) * EXCLAMATION_INCR
+                           + np.where(questions > 1, np.minimum(questions * QUESTION_INCR, 0.96), 0.0))
+    total += np.sign(total) * emphasis
+    compounds = np.clip(total / np.sqrt(total * total + ALPHA), -1.0, 1.0)
+    positive, negative = (positive + np.where(positive > negative, emphasis, 0.0),
+                          negative + np.where(negative > positive, emphasis, 0.0))
+    weight = positive + negative
+    subjectivities = np.divide(weight, weight + neutral, out=np.zeros(n), where=weight > 0)
+    return compounds, subjectivities
+
+
+class LexiconScorer:
+    """VADER-style lexicon scorer with transport and Hinglish/Hindi terms"""
+
+    name = "lexicon"
+    identity = f"lexicon:{LEXICON_SOURCE}"
+    positive_threshold = POSITIVE_THRESHOLD
+    negative_threshold = NEGATIVE_THRESHOLD
+
+    def load(self):
+        load_resources()
+
+    def score_batch(self, texts):
+        """(labels, polarities, subjectivities) like sentiment.analyze_sentiment_batch"""
+        load_resources()
+        polarities, subjectivities = score_texts(texts)
+        labels = np.where(
+            polarities > POSITIVE_THRESHOLD, "positive",
+            np.where(polarities < NEGATIVE_THRESHOLD, "negative", "neutral")
+        )
+        return labels.tolist(), polarities, subjectivities
+
+    def confidence(self, polarities):
+        return sentiment_confidence(polarities, POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD)
@@ -0,0 +1,374 @@
+"""
+Sliding-window sentiment aggregates for live trends and alerts.
+
+SlidingWindowAggregator keeps one ring buffer per granularity (minute,
+hour, day) of positive/negative/neutral counts per (state, transport_type).
+A slot holds one time bucket; adding a tweet is a constant-time increment,
+and a slot is zeroed when the ring wraps onto it. Queries read only the
+rings: rolling averages, window-over-window deltas and a negative-share
+z-score against the preceding windows (a spike), never raw rows.
+
+LiveTrends keeps an aggregator in step with tweet_sentiment inside an API
+process. It warms up once from a consistent snapshot, taking the hour and
+day rings from the rollup tables and the minute ring from the last
+few hours of rows (an idx_created_at range), then folds in new rows by
+seq like the push feed (feed.py).
+"""
+import calendar
+import datetime
+import math
+import threading
+import time
+
+from rollups import SENTIMENTS
+from transport import DEFAULT_TRANSPORT_TYPE
+
+# granularity: (bucket seconds, ring slots, default window, default baseline windows)
+GRANULARITIES = {
+    "minute": (60, 180, 15, 8),      # 3 hours; 15-minute windows against the last 2 hours
+    "hour": (3600, 24 * 14, 1, 24),  # 14 days; this hour against the last 24
+    "day": (86400, 120, 1, 28),      # 120 days; today against the last 4 weeks
+}
+GROUP_BY = {
+    "state": ("state",),
+    "transport": ("transportType",),
+    "state,transport": ("state", "transportType"),
+}
+SPIKE_Z = 3.0              # negative-share z-score that counts as a spike
+MIN_SPIKE_MESSAGES = 20    # messages a window needs before it can spike
+TREND_DELTA = 0.05         # score change between windows labelled improving/declining
+
+LIVE_TRENDS_POLL = 1.0     # seconds between polls for new rows
+LIVE_BATCH_SIZE = 5000     # new rows per poll query
+
+CURRENT_SEQ_SQL = "SELECT COALESCE(MAX(seq), 0) AS seq FROM tweet_sentiment"
+START_SNAPSHOT_SQL = "START TRANSACTION WITH CONSISTENT SNAPSHOT"
+END_SNAPSHOT_SQL = "COMMIT"
+ROLLUP_WARM_UP_SQL = """
+    SELECT state, transport_type, bucket,
+           positive_count AS positive, negative_count AS negative, neutral_count AS neutral
+    FROM {table}
+    WHERE bucket >= %s
+"""
+RECENT_ROWS_SQL = """
+    SELECT state, transport_type, sentiment, created_at FROM tweet_sentiment
+    WHERE created_at >= %s AND seq <= %s
+"""
+NEW_ROWS_SQL = """
+    SELECT seq, state, transport_type, sentiment, created_at FROM tweet_sentiment
+    WHERE seq > %s
+    ORDER BY seq
+    LIMIT %s
+"""
+# Rollup table each ring is warmed up from (None: recent raw rows)
+WARM_UP_TABLES = {"minute": None, "hour": "tweet_rollup_hourly", "day": "tweet_rollup_daily"}
+
+_SENTIMENT_CODES = {sentiment: code for code, sentiment in enumerate(SENTIMENTS)}
+_NEUTRAL = _SENTIMENT_CODES["neutral"]
+
+
+def to_timestamp(value):
+    """Unix seconds of a naive UTC datetime/date or its ISO string (created_at, rollup buckets)"""
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.replace("Z", ""))
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return calendar.timegm(value.timetuple())
+
+
+class _Ring:
+    """counts[key, slot, sentiment] for the bucket in slot_bucket[slot] (-1: empty)"""
+
+    def __init__(self, seconds, slots, keys):
+        import numpy as np  # deferred: keeps `import api` free of NumPy
+
+        self.seconds = seconds
+        self.slots = slots
+        self.slot_bucket = [-1] * slots
+        self.counts = np.zeros((keys, slots, len(SENTIMENTS)), dtype=np.int64)
+
+
+class SlidingWindowAggregator:
+    def __init__(self, granularities=GRANULARITIES, capacity=64):
+        self.keys = {}  # (state, transport_type) -> row in every ring
+        self.rings = {name: _Ring(seconds, slots, capacity)
+                      for name, (seconds, slots, _window, _baseline) in granularities.items()}
+        self._lock = threading.Lock()
+
+    def _key(self, state, transport_type):
+        key = (state or "India", transport_type or DEFAULT_TRANSPORT_TYPE)
+        index = self.keys.get(key)
+        if index is None:
+            index = self.keys[key] = len(self.keys)
+            for ring in self.rings.values():
+                if index >= len(ring.counts):
+                    import numpy as np
+
+                    # Double the key capacity (amortized O(1) per new key)
+                    ring.counts = np.concatenate([ring.counts, np.zeros_like(ring.counts)])
+        return index
+
+    def _add(self, ring, key, timestamp, sentiment, count):
+        bucket = timestamp // ring.seconds
+        slot = bucket % ring.slots
+        held = ring.slot_bucket[slot]
+        if held != bucket:
+            if held > bucket:
+                return  # older than the ring reaches
+            ring.counts[:, slot] = 0  # the ring wrapped: reuse the slot
+            ring.slot_bucket[slot] = bucket
+        ring.counts[key, slot, sentiment] += count
+
+    def add(self, timestamp, state, transport_type, sentiment, count=1, granularities=None):
+        """Count `count` tweets at unix `timestamp` (into the given rings, default all)"""
+        with self._lock:
+            key = self._key(state, transport_type)
+            code = _SENTIMENT_CODES.get(sentiment, _NEUTRAL)
+            for name in granularities or self.rings:
+                self._add(self.rings[name], key, int(timestamp), code, count)
+
+    def add_rows(self, rows, granularities=None):
+        """Count tweet_sentiment rows (state, transport_type, sentiment, created_at)"""
+        with self._lock:
+            rings = [self.rings[name] for name in granularities or self.rings]
+            for row in rows:
+                if row['created_at'] is None:
+                    continue
+                key = self._key(row['state'], row['transport_type'])
+                code = _SENTIMENT_CODES.get(row['sentiment'], _NEUTRAL)
+                timestamp = to_timestamp(row['created_at'])
+                for ring in rings:
+                    self._add(ring, key, timestamp, code, 1)
+
+    def add_rollup_rows(self, rows, granularity):
+        """Count rollup rows (state, transport_type, bucket, positive, negative, neutral) into one ring"""
+        with self._lock:
+            ring = self.rings[granularity]
+            for row in rows:
+                key = self._key(row['state'], row['transport_type'])
+                timestamp = to_timestamp(row['bucket'])
+                for code, sentiment in enumerate(SENTIMENTS):
+                    if row[sentiment]:
+                        self._add(ring, key, timestamp, code, int(row[sentiment]))
+
+    def summary(self, granularity="hour", window=None, baseline=None, by="state", now=None,
+                state=None, transport=None, spikes_only=False):
+        """
+        Per-group sentiment over the latest `window` buckets (ending with
+        the bucket containing `now`) compared with the `baseline` windows
+        before it; groups are `by` one of GROUP_BY. Raises ValueError when
+        the windows do not fit in the ring.
+        """
+        import numpy as np
+
+        _seconds, slots, default_window, default_baseline = GRANULARITIES[granularity]
+        window = default_window if window is None else window
+        baseline = default_baseline if baseline is None else baseline
+        if window < 1 or baseline < 1 or (baseline + 1) * window > slots:
+            raise ValueError(f"(baseline + 1) x window must be at most {slots} {granularity} buckets")
+        now = time.time() if now is None else now
+
+        with self._lock:
+            ring = self.rings[granularity]
+            keys = list(self.keys)
+            counts = ring.counts[:len(keys)].copy()
+            slot_bucket = np.array(ring.slot_bucket)
+
+        # Slot -> window: 0 is the current window, 1..baseline the ones before it
+        age = int(now) // ring.seconds - slot_bucket
+        in_range = (slot_bucket >= 0) & (age >= 0) & (age < (baseline + 1) * window)
+        per_window = np.zeros((baseline + 1, len(keys), len(SENTIMENTS)), dtype=np.int64)
+        np.add.at(per_window, age[in_range] // window, counts[:, in_range].transpose(1, 0, 2))
+        per_key = per_window.transpose(1, 0, 2)
+
+        fields = GROUP_BY[by]
+        groups, group_of_key = {}, []
+        for key_state, key_transport in keys:
+            values = {"state": key_state, "transportType": key_transport}
+            if (state is not None and key_state != state) or (transport is not None and key_transport != transport):
+                group_of_key.append(-1)
+                continue
+            group = tuple(values[field] for field in fields)
+            group_of_key.append(groups.setdefault(group, len(groups)))
+        group_of_key = np.array(group_of_key, dtype=np.int64)
+        totals = np.zeros((len(groups), baseline + 1, len(SENTIMENTS)), dtype=np.int64)
+        wanted = group_of_key >= 0
+        np.add.at(totals, group_of_key[wanted], per_key[wanted])
+
+        results = []
+        for group, index in groups.items():
+            entry = dict(zip(fields, group))
+            entry.update(window_stats(totals[index]))
+            if entry["current"]["total"] == 0 and entry["baseline"]["windows"] == 0:
+                continue
+            if spikes_only and not entry["spike"]:
+                continue
+            results.append(entry)
+        results.sort(key=lambda entry: (not entry["spike"], -(entry["negativeZ"] or 0),
+                                        -entry["current"]["total"], tuple(entry[field] for field in fields)))
+        return {
+            "granularity": granularity,
+            "window": window,
+            "baseline": baseline,
+            "windowSeconds": window * ring.seconds,
+            "asOf": datetime.datetime.fromtimestamp(now, datetime.timezone.utc).replace(tzinfo=None).isoformat(
+                timespec="seconds"),
+            "groups": results,
+        }
+
+
+def _counts(positive, negative, neutral):
+    total = positive + negative + neutral
+    return {"positive": positive, "negative": negative, "neutral": neutral, "total": total,
+            "score": (positive - negative) / total if total else None}
+
+
+def window_stats(windows):
+    """
+    Trend and spike fields from per-window counts (windows x SENTIMENTS,
+    current window first)
+    """
+    current, previous = (_counts(*row) for row in windows[:2].tolist())
+    history = [_counts(*row) for row in windows[1:].tolist()]
+    active = [counts for counts in history if counts["total"]]
+
+    delta = None
+    if current["score"] is not None and previous["score"] is not None:
+        delta = current["score"] - previous["score"]
+    trend = "stable"
+    if delta is not None and abs(delta) > TREND_DELTA:
+        trend = "improving" if delta > 0 else "declining"
+
+    # Negative share of this window against the baseline windows'
+    shares = [counts["negative"] / counts["total"] for counts in active]
+    negative_share = current["negative"] / current["total"] if current["total"] else None
+    mean = sum(shares) / len(shares) if shares else None
+    z = None
+    if negative_share is not None and len(shares) >= 2:
+        spread = math.sqrt(sum((share - mean) ** 2 for share in shares) / (len(shares) - 1))
+        # Binomial noise of this window's sample: a quiet baseline doesn't make every blip a spike
+        noise = math.sqrt(max(mean * (1 - mean), 1 / current["total"]) / current["total"])
+        z = (negative_share - mean) / max(spread, noise)
+    return {
+        "current": current,
+        "previous": previous,
+        "delta": delta,
+        "trend": trend,
+        "baseline": {
+            "windows": len(active),
+            "averageMessages": sum(counts["total"] for counts in history) / len(history),
+            "averageScore": sum(counts["score"] for counts in active) / len(active) if active else None,
+            "negativeShare": mean,
+        },
+        "negativeShare": negative_share,
+        "negativeZ": z,
+        "spike": z is not None and z >= SPIKE_Z and current["total"] >= MIN_SPIKE_MESSAGES,
+    }
+
+
+class LiveTrends:
+    """
+    A SlidingWindowAggregator fed from tweet_sentiment, refreshed at most
+    every `interval` seconds. Like cache.DataVersionWatcher, `refresh()`
+    works through a db_pool.ConnectionPool; servers with their own driver
+    (asgi_api.py) run the queries between `begin_refresh()` and
+    `end_refresh()`: CURRENT_SEQ_SQL and `warm_up_queries()` inside one
+    consistent snapshot until `seq` is set, then `poll_query()` until
+    `apply()` returns False.
+    Rows are taken by seq > the last seq counted. That requires writers to
+    commit in seq order, which they do by holding
+    analyse_sentiment.WRITER_LOCK (see feed.py); a row committed below the
+    last seq would never be counted.
+    """
+
+    def __init__(self, interval=LIVE_TRENDS_POLL, batch_size=LIVE_BATCH_SIZE):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.aggregator = None  # built on warm-up (NumPy loads on first use)
+        self.seq = None  # last tweet_sentiment.seq counted; None until warmed up
+        self._refreshed_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def begin_refresh(self, wait=False):
+        """True if a refresh is due and the caller should run it, then call end_refresh"""
+        if self.seq is not None and time.monotonic() - self._refreshed_at < self.interval:
+            return False
+        # One refresher at a time; the others serve the current rings
+        if not self._lock.acquire(blocking=wait):
+            return False
+        if self.seq is not None and time.monotonic() - self._refreshed_at < self.interval:
+            self._lock.release()  # another caller refreshed while we waited
+            return False
+        return True
+
+    def end_refresh(self):
+        self._refreshed_at = time.monotonic()
+        self._lock.release()
+
+    def warm_up_queries(self, seq, now=None):
+        """{granularity: (sql, params)} reproducing the rings as of `seq`"""
+        now = time.time() if now is None else now
+        queries = {}
+        for granularity, table in WARM_UP_TABLES.items():
+            seconds, slots, _window, _baseline = GRANULARITIES[granularity]
+            start = datetime.datetime.fromtimestamp((int(now) // seconds - slots + 1) * seconds,
+                                                    datetime.timezone.utc).replace(tzinfo=None)
+            if table is None:
+                queries[granularity] = (RECENT_ROWS_SQL, (start, seq))
+            else:
+                queries[granularity] = (ROLLUP_WARM_UP_SQL.format(table=table), (start,))
+        return queries
+
+    def load(self, seq, rows_by_granularity):
+        """Fill the rings from the warm_up_queries results"""
+        self.aggregator = SlidingWindowAggregator()
+        for granularity, rows in rows_by_granularity.items():
+            if WARM_UP_TABLES[granularity] is None:
+                self.aggregator.add_rows(rows, granularities=(granularity,))
+            else:
+                self.aggregator.add_rollup_rows(rows, granularity)
+        self.seq = seq
+
+    def poll_query(self):
+        return NEW_ROWS_SQL, (self.seq, self.batch_size)
+
+    def apply(self, rows):
+        """Count NEW_ROWS_SQL rows; True if there may be more to fetch"""
+        if rows:
+            self.aggregator.add_rows(rows)
+            self.seq = rows[-1]['seq']
+        return len(rows) == self.batch_size
+
+    def refresh(self, pool):
+        """Warm up or catch up through a db_pool.ConnectionPool (blocks only for the warm-up)"""
+        if not self.begin_refresh(wait=self.seq is None):
+            return
+        try:
+            with pool.cursor(dictionary=True) as cursor:
+                if self.seq is None:
+                    cursor.execute(START_SNAPSHOT_SQL)
+                    try:
+                        cursor.execute(CURRENT_SEQ_SQL)
+                        seq = cursor.fetchone()['seq']
+                        results = {}
+                        for granularity, (sql, params) in self.warm_up_queries(seq).items():
+                            cursor.execute(sql, params)
+                            results[granularity] = cursor.fetchall()
+                    finally:
+                        cursor.execute(END_SNAPSHOT_SQL)
+                    self.load(seq, results)
+                more = True
+                while more:
+                    cursor.execute(*self.poll_query())
+                    more = self.apply(cursor.fetchall())
+        finally:
+            self.end_refresh()
+
+    def summary(self, **params):
+        """SlidingWindowAggregator.summary of the rings (empty until warmed up)"""
+        if self.aggregator is None:
+            self.aggregator = SlidingWindowAggregator()
+        return self.aggregator.summary(**params)
+
+    def stats(self):
+        return {'seq': self.seq, 'groups': len(self.aggregator.keys) if self.aggregator is not None else 0}
@@ -0,0 +1,159 @@
+"""
+Memoized sentiment scoring keyed by normalized tweet text.
+
+Bot reposts and URL-only variants ("... https://t.co/abc" vs
+"... https://t.co/xyz") differ only in links, mentions and spacing. Texts
+are normalized (URLs and @mentions removed, whitespace collapsed) and
+scored in that form, so every variant maps to the same blake2b key and
+one result. Texts are scored normalized even with the cache disabled
+(max_entries 0), so stored scores never depend on the memo settings. A
+bounded LRU of key -> (sentiment, polarity, subjectivity, confidence)
+sits in front of the scorer: repeated content skips the sentiment
+backend. Region and transport type are not cached; they are
+matched on each original text, whose @handles can name a city. The cache
+can be saved to disk and loaded by the next run (only by a memo whose
+scorer has the same identity, so "lexicon:vader" scores are never reused
+where the pattern lexicon scores), and counts its hits and misses.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from scorers import SENTIMENT_BACKEND, scorer_identity
+
+MEMO_PATH = "backend/.text_memo.json"
+MEMO_SIZE = int(os.environ.get("TEXT_MEMO_SIZE", 200_000))  # entries; 0 disables the cache
+# Bump whenever scoring changes, so results saved by older code are not reused
+MEMO_VERSION = 3
+
+_URL_RE = re.compile(r"https?://\S+")
+_MENTION_RE = re.compile(r"(?<!\w)@\w+")
+
+
+def normalize_text(text):
+    """Tweet text without URLs and @mentions, whitespace collapsed"""
+    if "://" in text:
+        text = _URL_RE.sub(" ", text)
+    if "@" in text:
+        text = _MENTION_RE.sub(" ", text)
+    return " ".join(text.split())
+
+
+def text_key(normalized):
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+class MemoBatch:
+    """
+    Memo lookups for one list of texts. `misses` are the distinct
+    normalized texts that still need scoring; complete() takes their
+    results (in the same order) and returns one result per input text.
+    """
+
+    def __init__(self, memo, texts):
+        self.memo = memo
+        self.keys = []
+        self.results = []
+        self.misses = []
+        self._miss_keys = {}  # key -> index into misses
+        for text in texts:
+            normalized = normalize_text(text)
+            key = text_key(normalized)
+            # A repeat of a miss in the same batch is scored once, like a hit
+            result = None
+            if key not in self._miss_keys:
+                result = memo.get(key)
+                if result is None:
+                    self._miss_keys[key] = len(self.misses)
+                    self.misses.append(normalized)
+            self.keys.append(key)
+            self.results.append(result)
+        memo.record(hits=len(texts) - len(self.misses), misses=len(self.misses))
+
+    def complete(self, scored):
+        scored = list(scored)
+        for key, index in self._miss_keys.items():
+            self.memo.put(key, scored[index])
+        return [result if result is not None else scored[self._miss_keys[key]]
+                for key, result in zip(self.keys, self.results)]
+
+
+class TextMemo:
+    """Thread-safe LRU of normalized-text key -> analyse_sentiment.score_texts result"""
+
+    def __init__(self, max_entries=MEMO_SIZE, backend=SENTIMENT_BACKEND):
+        self.max_entries = max_entries
+        self.backend = backend  # scores of one sentiment backend only
+        self.scorer = scorer_identity(backend)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def record(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def put(self, key, result):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = tuple(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def batch(self, texts):
+        return MemoBatch(self, texts)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def status_line(self):
+        return (f"🧠 Text memo: {self.hits}/{self.hits + self.misses} lookups hit ({self.hit_rate:.1%}), "
+                f"{len(self)} entries")
+
+    # ---------- PERSISTENCE ----------
+    def load(self, path=MEMO_PATH):
+        """Add entries saved by an earlier run; returns how many were loaded"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != MEMO_VERSION or state.get("scorer", "textblob") != self.scorer:
+            return 0
+        entries = state.get("entries", [])[-self.max_entries:] if self.max_entries > 0 else []
+        with self._lock:
+            for key, *result in entries:
+                self._entries[bytes.fromhex(key)] = tuple(result)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return len(entries)
+
+    def save(self, path=MEMO_PATH):
+        """Write the entries, least recently used first, atomically"""
+        with self._lock:
+            entries = [[key.hex(), *result] for key, result in self._entries.items()]
+        state = {"version": MEMO_VERSION, "scorer": self.scorer, "entries": entries,
+                 "updated_at": datetime.now().isoformat(timespec="seconds")}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
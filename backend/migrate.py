@@ -0,0 +1,327 @@
+"""
+Schema migrations and backfills for tweet_sentiment.
+
+Every migration checks information_schema before changing anything and
+backfills in batches, so the command is safe to re-run (and to resume
+after an interruption). The writer lock is held for the whole run, so
+ingestion waits (or retries) while rollups are rebuilt.
+
+Usage: python backend/migrate.py [--batch-size 5000] [--rebuild-rollups] [--rebuild-analytics [DIR]]
+"""
+import argparse
+import os
+from collections import defaultdict
+
+import mysql.connector
+
+from analyse_sentiment import DB_CONFIG, acquire_writer_lock, enrich_texts
+from cache import DATA_VERSION_TABLE_SQL, SEED_DATA_VERSION_SQL, bump_data_version
+from regions import CITY_SQL, STATE_SQL
+from rollups import (POLARITY_HISTOGRAM_REBUILD_SQL, POLARITY_HISTOGRAM_TABLE, POLARITY_HISTOGRAM_TABLE_SQL,
+                     ROLLUP_TABLES, SCORE_COLUMNS, create_table_sql, rebuild_sql, score_column_definitions)
+from transport import determine_transport_type
+
+BACKFILL_BATCH_SIZE = 5000  # rows read and updated per round trip / commit
+
+
+# ---------- SCHEMA HELPERS ----------
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+def table_exists(cursor, table):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return cursor.fetchone()[0] > 0
+
+def index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+def add_index(cursor, table, index, columns):
+    if index_exists(cursor, table, index):
+        return
+    cursor.execute(f"ALTER TABLE {table} ADD INDEX {index} ({columns})")
+    print(f"   ➕ index {index} ({columns})")
+
+def update_grouped(cursor, table, column, values_by_id):
+    """
+    Set `column` for many ids with one UPDATE ... WHERE id IN (...) per
+    distinct value (values here have low cardinality)
+    """
+    ids_by_value = defaultdict(list)
+    for tweet_id, value in values_by_id:
+        ids_by_value[value].append(tweet_id)
+    for value, ids in ids_by_value.items():
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"UPDATE {table} SET {column} = %s WHERE id IN ({placeholders})", (value, *ids))
+
+def rebuild_table(conn, cursor, table, sql):
+    """Recompute a derived table with one INSERT ... SELECT"""
+    # One transaction: an interrupted rebuild leaves the table empty and is redone
+    cursor.execute(f"DELETE FROM {table}")
+    cursor.execute(sql)
+    conn.commit()
+    print(f"   🔁 {table} rebuilt ({cursor.rowcount} rows)")
+
+def table_is_empty(cursor, table):
+    cursor.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} LIMIT 1) AS t")
+    return cursor.fetchone()[0] == 0
+
+
+# ---------- MIGRATIONS ----------
+def migrate_transport_type(conn, cursor, args):
+    """Materialized transport_type column, indexed for GROUP BY / filters"""
+    if not column_exists(cursor, "tweet_sentiment", "transport_type"):
+        cursor.execute("ALTER TABLE tweet_sentiment ADD COLUMN transport_type VARCHAR(10) NULL AFTER region")
+        print("   ➕ column transport_type")
+    add_index(cursor, "tweet_sentiment", "idx_transport_type", "transport_type")
+
+    backfilled = 0
+    while True:
+        cursor.execute(
+            "SELECT id, text FROM tweet_sentiment WHERE transport_type IS NULL LIMIT %s", (args.batch_size,)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        update_grouped(cursor, "tweet_sentiment", "transport_type",
+                       ((tweet_id, determine_transport_type(text or "")) for tweet_id, text in rows))
+        conn.commit()
+        backfilled += len(rows)
+        print(f"   🔁 transport_type backfilled for {backfilled} rows", end="\r")
+    if backfilled:
+        print()
+    return backfilled
+
+def migrate_rollups(conn, cursor, args):
+    """
+    Hourly/daily rollup tables. Ingestion keeps them current; they are
+    only (re)built from tweet_sentiment while empty or on request.
+    """
+    for table in ROLLUP_TABLES:
+        if not table_exists(cursor, table):
+            cursor.execute(create_table_sql(table))
+            print(f"   ➕ table {table}")
+        if table_is_empty(cursor, table) or args.rebuild_rollups:
+            rebuild_table(conn, cursor, table, rebuild_sql(table))
+    # /api/states reads the rollups now; this only slowed down inserts
+    if index_exists(cursor, "tweet_sentiment", "idx_region_transport_sentiment"):
+        cursor.execute("ALTER TABLE tweet_sentiment DROP INDEX idx_region_transport_sentiment")
+        print("   ➖ index idx_region_transport_sentiment")
+
+def migrate_state_city(conn, cursor, args):
+    """
+    Normalized state/city columns split from region, indexed so state
+    drill-downs are exact index lookups instead of LIKE '%state%' scans
+    """
+    for column in ("state", "city"):
+        if not column_exists(cursor, "tweet_sentiment", column):
+            cursor.execute(f"ALTER TABLE tweet_sentiment ADD COLUMN {column} VARCHAR(100) NULL")
+            print(f"   ➕ column {column}")
+    add_index(cursor, "tweet_sentiment", "idx_state_created_at", "state, created_at")
+    add_index(cursor, "tweet_sentiment", "idx_state_city_created_at", "state, city, created_at")
+
+    backfilled = 0
+    while True:
+        cursor.execute(f"""
+            UPDATE tweet_sentiment SET state = {STATE_SQL}, city = {CITY_SQL}
+            WHERE state IS NULL AND region IS NOT NULL LIMIT %s
+        """, (args.batch_size,))
+        conn.commit()
+        if cursor.rowcount <= 0:
+            break
+        backfilled += cursor.rowcount
+        print(f"   🔁 state/city backfilled for {backfilled} rows", end="\r")
+    if backfilled:
+        print()
+    return backfilled
+
+def migrate_data_version(conn, cursor, args):
+    """Single-row counter bumped by ingestion to invalidate API response caches"""
+    if not table_exists(cursor, "data_version"):
+        cursor.execute(DATA_VERSION_TABLE_SQL)
+        print("   ➕ table data_version")
+    cursor.execute(SEED_DATA_VERSION_SQL)
+
+def migrate_keyset_indexes(conn, cursor, args):
+    """
+    Indexes for /api/tweets keyset pagination: ORDER BY created_at DESC,
+    id DESC, optionally filtered by one column (InnoDB appends the primary
+    key, so each of these is effectively (..., created_at, id))
+    """
+    add_index(cursor, "tweet_sentiment", "idx_created_at", "created_at")
+    add_index(cursor, "tweet_sentiment", "idx_sentiment_created_at", "sentiment, created_at")
+    add_index(cursor, "tweet_sentiment", "idx_transport_created_at", "transport_type, created_at")
+    # Now a redundant prefix of idx_transport_created_at
+    if index_exists(cursor, "tweet_sentiment", "idx_transport_type"):
+        cursor.execute("ALTER TABLE tweet_sentiment DROP INDEX idx_transport_type")
+        print("   ➖ index idx_transport_type")
+
+def migrate_feed_seq(conn, cursor, args):
+    """
+    Insertion-order sequence number for the /api/stream change feed
+    (existing rows are numbered by the ALTER itself)
+    """
+    if not column_exists(cursor, "tweet_sentiment", "seq"):
+        cursor.execute("""
+            ALTER TABLE tweet_sentiment
+            ADD COLUMN seq BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+            ADD UNIQUE KEY uq_seq (seq)
+        """)
+        print("   ➕ column seq")
+
+def migrate_score_columns(conn, cursor, args):
+    """
+    Numeric polarity/subjectivity/confidence columns (NULL until scored).
+    Added before the rollup tables, whose rebuild sums them.
+    """
+    previous = "sentiment"
+    for column in SCORE_COLUMNS:
+        if not column_exists(cursor, "tweet_sentiment", column):
+            cursor.execute(f"ALTER TABLE tweet_sentiment ADD COLUMN {column} FLOAT NULL AFTER {previous}")
+            print(f"   ➕ column {column}")
+        previous = column
+
+def migrate_sentiment_scores(conn, cursor, args):
+    """
+    Score sums in the rollup tables and the polarity histogram. Rows
+    stored before ingestion wrote the scores are scored once here, in seq
+    order, with the current SENTIMENT_BACKEND; their sentiment label is
+    rewritten from the same scores so label and polarity agree. The rollups
+    are rebuilt afterwards so their counts, means and percentiles include
+    them.
+    """
+    backfilled = last_seq = 0
+    while True:
+        cursor.execute("""
+            SELECT seq, id, text FROM tweet_sentiment
+            WHERE seq > %s AND polarity IS NULL
+            ORDER BY seq
+            LIMIT %s
+        """, (last_seq, args.batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_seq = rows[-1][0]
+        enriched = enrich_texts([text or "" for _seq, _id, text in rows])
+        cursor.executemany(
+            "UPDATE tweet_sentiment SET sentiment = %s, polarity = %s, subjectivity = %s, confidence = %s "
+            "WHERE id = %s",
+            [(scores[0], *scores[3:], tweet_id) for (_seq, tweet_id, _text), scores in zip(rows, enriched)],
+        )
+        conn.commit()
+        backfilled += len(rows)
+        print(f"   🔁 scores backfilled for {backfilled} rows", end="\r")
+    if backfilled:
+        print()
+        if args.rebuild_analytics is None:
+            print("   ℹ️ sentiment labels were rescored; refill an existing analytics store with --rebuild-analytics")
+
+    rebuild = backfilled > 0
+    for table in ROLLUP_TABLES:
+        if not column_exists(cursor, table, "scored_count"):
+            cursor.execute(f"ALTER TABLE {table} " + ", ".join(
+                f"ADD COLUMN {definition}" for definition in score_column_definitions()))
+            print(f"   ➕ score columns in {table}")
+            rebuild = True
+    if rebuild:
+        for table in ROLLUP_TABLES:
+            rebuild_table(conn, cursor, table, rebuild_sql(table))
+
+    if not table_exists(cursor, POLARITY_HISTOGRAM_TABLE):
+        cursor.execute(POLARITY_HISTOGRAM_TABLE_SQL)
+        print(f"   ➕ table {POLARITY_HISTOGRAM_TABLE}")
+    if rebuild or args.rebuild_rollups or table_is_empty(cursor, POLARITY_HISTOGRAM_TABLE):
+        rebuild_table(conn, cursor, POLARITY_HISTOGRAM_TABLE, POLARITY_HISTOGRAM_REBUILD_SQL)
+    return backfilled
+
+# Applied in order
+MIGRATIONS = [
+    ("transport_type column", migrate_transport_type),
+    ("sentiment score columns", migrate_score_columns),
+    ("rollup tables", migrate_rollups),
+    ("state/city columns", migrate_state_city),
+    ("data version", migrate_data_version),
+    ("keyset pagination indexes", migrate_keyset_indexes),
+    ("change feed sequence", migrate_feed_seq),
+    ("sentiment scores", migrate_sentiment_scores),
+]
+
+
+def rebuild_analytics(conn, cursor, args):
+    """
+    Refill the columnar analytics store (analytics_store.py) from
+    tweet_sentiment, in seq order, one batch per round trip
+    """
+    from analytics_store import ANALYTICS_STORE_PATH, ColumnStore  # NumPy only when asked for
+
+    store = ColumnStore(args.rebuild_analytics or ANALYTICS_STORE_PATH)
+    store.clear()
+    last_seq = 0
+    while True:
+        cursor.execute(f"""
+            SELECT seq, id, created_at, sentiment, region, COALESCE(transport_type, 'bus'),
+                   COALESCE(state, {STATE_SQL}), COALESCE(city, {CITY_SQL})
+            FROM tweet_sentiment
+            WHERE seq > %s
+            ORDER BY seq
+            LIMIT %s
+        """, (last_seq, args.batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_seq = rows[-1][0]
+        store.append((tweet_id, None, created_at, sentiment, region, transport_type, state, city)
+                     for _seq, tweet_id, created_at, sentiment, region, transport_type, state, city in rows)
+        print(f"   🔁 {len(store)} rows written to {store.path}", end="\r")
+    print(f"   🔁 analytics store rebuilt ({len(store)} rows)")
+
+
+# ---------- MAIN ----------
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations and backfills to tweet_sentiment")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE,
+                        help="rows backfilled per UPDATE round and commit")
+    parser.add_argument("--rebuild-rollups", action="store_true",
+                        help="recompute the rollup tables from tweet_sentiment")
+    parser.add_argument("--rebuild-analytics", nargs="?", const=os.environ.get("ANALYTICS_STORE", ""), default=None,
+                        help="refill the columnar analytics store from tweet_sentiment "
+                             "(default: $ANALYTICS_STORE, else backend/.analytics)")
+    args = parser.parse_args()
+
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+        print("✅ Connected to MySQL.")
+        # Released when the connection closes
+        acquire_writer_lock(cursor)
+        for name, migrate in MIGRATIONS:
+            print(f"🛠️ {name}")
+            migrate(conn, cursor, args)
+            conn.commit()
+        if args.rebuild_analytics is not None:
+            print("🛠️ analytics store")
+            rebuild_analytics(conn, cursor, args)
+        # Backfills/rebuilds change what the API serves
+        bump_data_version(cursor)
+        conn.commit()
+        print("✅ Schema is up to date.")
+
+    except mysql.connector.Error as e:
+        print("❌ MySQL Error:", e)
+
+    finally:
+        if 'cursor' in locals(): cursor.close()
+        if 'conn' in locals(): conn.close()
+
+if __name__ == "__main__":
+    main()
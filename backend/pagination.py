@@ -0,0 +1,41 @@
+"""
+Keyset (cursor) pagination over tweet_sentiment ordered newest first.
+
+A page ends at some (created_at, id); the next page is everything strictly
+older than that key in ORDER BY created_at DESC, id DESC order. The query
+seeks straight to it through a (..., created_at) index, so page N costs
+the same as page 1, unlike LIMIT/OFFSET.
+"""
+import base64
+import datetime
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Rows strictly after the cursor key in (created_at DESC, id DESC) order
+KEYSET_SQL = "(created_at < %s OR (created_at = %s AND id < %s))"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, tweet_id):
+    """Opaque cursor for the position after the row (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), str(tweet_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """(created_at, id) from encode_cursor output"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, tweet_id = json.loads(raw)
+        return datetime.datetime.fromisoformat(created_at), str(tweet_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+def keyset_params(cursor):
+    """Query parameters for KEYSET_SQL"""
+    created_at, tweet_id = decode_cursor(cursor)
+    return created_at, created_at, tweet_id
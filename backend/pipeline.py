@@ -0,0 +1,426 @@
+"""
+Continuous ingestion daemon: fetch -> dedupe -> enrich -> store, with no
+dump files in between.
+
+Each stage runs in its own thread(s). Stages are connected by bounded
+queues, so a slow stage (MySQL, or scoring during a burst) blocks the
+stages before it instead of buffering without limit:
+
+    fetch ──▶ dedupe ──▶ enrich (N threads) ──▶ write
+
+  fetch   collection cycles over twitter_scraper.QUERIES through
+          fetcher.QueryFetcher (concurrent, rate-limit paced, since_id).
+  dedupe  drops ids already ingested (SeenIds) or already in the pipeline.
+  enrich  sentiment/region/transport scoring as in analyse_sentiment.py,
+          in a process pool when --enrich-workers > 1. Reposts of texts
+          already scored are answered from the memo.TextMemo cache.
+  write   batched INSERT IGNORE through bulk_insert: rollups are updated
+          and data_version is bumped in the same transaction, so the API
+          serves new tweets on its next poll (/api/stream pushes them).
+
+A query's since_id checkpoint is only persisted once every batch fetched
+up to it has been committed, in fetch order. A crash refetches tweets
+rather than losing them. A batch that fails enrichment rewinds its query
+to where that batch was fetched from, so the next cycle fetches it again;
+after ENRICH_ATTEMPTS failures it is set aside in FAILED_PATH instead.
+SIGINT/SIGTERM stop fetching and drain the queues before exiting.
+
+Usage: python backend/pipeline.py [--enrich-workers 2] [--cycle-interval 60] [--once]
+"""
+import argparse
+import os
+import queue
+import signal
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import mysql.connector
+
+from analyse_sentiment import (BATCH_SIZE, DB_CONFIG, bulk_insert, finish_enrichment, schema_is_current, score_texts,
+                               to_row)
+from checkpoint import SearchCheckpoint, SeenIds
+from fetcher import FETCH_CONCURRENCY, QueryFetcher, Unauthorized
+from memo import MEMO_PATH, MEMO_SIZE, TextMemo
+from scorers import SCORERS, SENTIMENT_BACKEND, load_scorer
+from tweet_io import write_jsonl
+from twitter_scraper import HEADERS, QUERIES, collect_query
+
+QUEUE_SIZE = 16          # batches (one query's results each) buffered between stages
+FLUSH_INTERVAL = 1.0     # seconds a fetched batch may wait for a fuller INSERT
+CYCLE_INTERVAL = 60.0    # minimum seconds between the starts of collection cycles
+STATS_INTERVAL = 30.0    # seconds between status lines
+MAX_RETRY_DELAY = 30.0   # seconds; cap of the DB reconnect backoff
+ENRICH_ATTEMPTS = 3      # enrichment failures of a tweet before its batch is set aside
+FAILED_PATH = "backend/.failed_tweets.jsonl"  # batches set aside after ENRICH_ATTEMPTS failures
+
+_STOP = object()  # end-of-stream marker passed down the queues
+
+
+class Batch:
+    """One query's fetch result on its way through the stages"""
+
+    def __init__(self, seq, query, start, state, tweets, epoch):
+        self.seq = seq          # fetch order
+        self.query = query
+        self.start = start      # query position the fetch started from
+        self.state = state      # SearchCheckpoint entry once this batch is stored
+        self.tweets = tweets
+        self.epoch = epoch      # rewinds of the query before this fetch started
+        self.rows = []
+        self.failed = False
+
+
+class CommitTracker:
+    """
+    Persists query checkpoints in fetch order as their batches are stored.
+    The first failed batch of a query calls rewind(batch), which returns
+    the query's new epoch; later batches fetched before the rewind are
+    refetched anyway and never move that query's checkpoint.
+    """
+
+    def __init__(self, checkpoint, rewind):
+        self.checkpoint = checkpoint
+        self.rewind = rewind
+        self.next_seq = 0
+        self._done = {}
+        self._epochs = {}  # query -> epoch a batch needs to be checkpointed
+        self._lock = threading.Lock()
+
+    def done(self, batch):
+        """Record a stored batch, or one that failed (batch.failed)"""
+        with self._lock:
+            self._done[batch.seq] = batch
+            while self.next_seq in self._done:
+                done = self._done.pop(self.next_seq)
+                if done.epoch < self._epochs.get(done.query, 0):
+                    pass  # fetched before its query was rewound
+                elif done.failed:
+                    self._epochs[done.query] = self.rewind(done)
+                else:
+                    self.checkpoint.set(done.query, done.state)
+                self.next_seq += 1
+
+    def pending(self):
+        with self._lock:
+            return len(self._done)
+
+
+class Pipeline:
+    def __init__(self, args):
+        self.args = args
+        self.fetched = queue.Queue(maxsize=args.queue_size)
+        self.fresh = queue.Queue(maxsize=args.queue_size)
+        self.enriched = queue.Queue(maxsize=args.queue_size)
+        self.stop = threading.Event()
+        self.checkpoint = SearchCheckpoint()
+        self.positions = {query: dict(state) for query, state in self.checkpoint.queries.items()}
+        self.epochs = {}  # query -> rewinds so far
+        self._positions_lock = threading.Lock()
+        self.tracker = CommitTracker(self.checkpoint, self.rewind)
+        self.seen_ids = SeenIds()
+        self.memo = TextMemo(args.memo_size, args.sentiment_backend)
+        if args.memo_path:
+            self.memo.load(args.memo_path)
+        self.analytics = None
+        if args.analytics_store is not None:
+            from analytics_store import ANALYTICS_STORE_PATH, ColumnStore  # NumPy only when enabled
+            self.analytics = ColumnStore(args.analytics_store or ANALYTICS_STORE_PATH)
+        self.in_flight = set()  # ids between dedupe and commit
+        self.enrich_failures = {}  # id -> failed enrichments so far
+        self._ids_lock = threading.Lock()
+        self._failed_lock = threading.Lock()
+        self.error = None  # set when the writer hit an unexpected error; run() then stops
+        self._stats_lock = threading.Lock()
+        self.stats = dict.fromkeys(
+            ('cycles', 'fetched', 'duplicates', 'enriched', 'inserted', 'skipped', 'db_errors', 'enrich_errors',
+             'set_aside'), 0)
+        self.enrich_threads = max(args.enrich_workers, 1)
+        self.pool = (ProcessPoolExecutor(max_workers=args.enrich_workers, initializer=load_scorer,
+                                         initargs=(args.sentiment_backend,))
+                     if args.enrich_workers > 1 else None)
+
+    def count(self, **deltas):
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                self.stats[key] += delta
+
+    def rewind(self, batch):
+        """Fetch a failed batch's query again from where that batch started; returns the new epoch"""
+        with self._positions_lock:
+            epoch = self.epochs[batch.query] = self.epochs.get(batch.query, 0) + 1
+            self.positions[batch.query] = batch.start
+        print(f"↩️ '{batch.query}' will be refetched")
+        return epoch
+
+    # ---------- STAGES ----------
+    def fetch_stage(self):
+        fetcher = QueryFetcher(HEADERS, concurrency=self.args.fetch_concurrency)
+        seq = 0
+
+        def task(query):
+            with self._positions_lock:
+                start, epoch = self.positions.get(query, {}), self.epochs.get(query, 0)
+            return start, epoch, collect_query(fetcher, query, start)
+
+        try:
+            while not self.stop.is_set():
+                started = time.monotonic()
+                for query, (start, epoch, (tweets, state)) in fetcher.fetch(QUERIES, task):
+                    # Later cycles continue from here even before it is committed, unless it was rewound meanwhile
+                    with self._positions_lock:
+                        if epoch == self.epochs.get(query, 0):
+                            self.positions[query] = state
+                    self.fetched.put(Batch(seq, query, start, state, tweets, epoch))
+                    seq += 1
+                    self.count(fetched=len(tweets))
+                    if self.stop.is_set():
+                        break
+                self.count(cycles=1)
+                if self.args.once:
+                    break
+                self.stop.wait(self.args.cycle_interval - (time.monotonic() - started))
+        except Unauthorized:
+            print("❌ Error: 401 Unauthorized. Your Bearer Token is invalid or expired. Stopping.")
+        finally:
+            fetcher.close()
+            self.fetched.put(_STOP)
+
+    def dedupe_stage(self):
+        while True:
+            batch = self.fetched.get()
+            if batch is _STOP:
+                break
+            fresh = []
+            with self._ids_lock:
+                for tweet in batch.tweets:
+                    if tweet['id'] in self.in_flight or tweet['id'] in self.seen_ids:
+                        continue
+                    self.in_flight.add(tweet['id'])
+                    fresh.append(tweet)
+            self.count(duplicates=len(batch.tweets) - len(fresh))
+            batch.tweets = fresh
+            if fresh:
+                self.fresh.put(batch)
+            else:
+                self.tracker.done(batch)
+        for _ in range(self.enrich_threads):
+            self.fresh.put(_STOP)
+
+    def enrich_stage(self):
+        while True:
+            batch = self.fresh.get()
+            if batch is _STOP:
+                break
+            texts = [tweet['text'] for tweet in batch.tweets]
+            try:
+                # Reposts and URL variants of texts already scored come from the memo
+                lookup = self.memo.batch(texts)
+                if not lookup.misses:
+                    scored = []
+                elif self.pool:
+                    scored = self.pool.submit(score_texts, lookup.misses, self.args.sentiment_backend).result()
+                else:
+                    scored = score_texts(lookup.misses, self.args.sentiment_backend)
+                enrichment = finish_enrichment(texts, lookup, scored)
+                batch.rows = [to_row(tweet, *enriched) for tweet, enriched in zip(batch.tweets, enrichment)]
+            except Exception as e:
+                self.count(enrich_errors=1)
+                print(f"❌ Enrichment failed for '{batch.query}': {e}")
+                self.enrich_failed(batch)
+                continue
+            if self.enrich_failures:
+                with self._ids_lock:
+                    for tweet in batch.tweets:
+                        self.enrich_failures.pop(tweet['id'], None)
+            self.count(enriched=len(batch.rows))
+            self.enriched.put(batch)
+        self.enriched.put(_STOP)
+
+    def enrich_failed(self, batch):
+        """
+        Release a batch that failed enrichment. Its query is rewound so the
+        tweets are fetched again, until one of them has failed ENRICH_ATTEMPTS
+        times: the batch is then appended to FAILED_PATH and checkpointed past.
+        """
+        ids = [tweet['id'] for tweet in batch.tweets]
+        with self._ids_lock:
+            self.in_flight.difference_update(ids)
+            attempts = max(self.enrich_failures.get(tweet_id, 0) for tweet_id in ids) + 1
+            for tweet_id in ids:
+                self.enrich_failures[tweet_id] = attempts
+            if attempts >= ENRICH_ATTEMPTS:
+                for tweet_id in ids:
+                    del self.enrich_failures[tweet_id]
+        if attempts < ENRICH_ATTEMPTS:
+            batch.failed = True
+        else:
+            with self._failed_lock, open(FAILED_PATH, "a", encoding="utf-8") as f:
+                write_jsonl(f, batch.tweets)
+            self.count(set_aside=len(ids))
+            print(f"⚠️ Setting aside {len(ids)} tweets of '{batch.query}' after {attempts} failed attempts "
+                  f"(saved to {FAILED_PATH}; load with analyse_sentiment.py --input)")
+        self.tracker.done(batch)
+
+    def write_stage(self):
+        conn = cursor = None
+        pending, pending_rows, deadline = [], 0, None
+        stopped = 0
+        while stopped < self.enrich_threads:
+            timeout = self.args.flush_interval if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                batch = self.enriched.get(timeout=timeout)
+            except queue.Empty:
+                batch = None
+            if batch is _STOP:
+                stopped += 1
+            elif batch is not None:
+                pending.append(batch)
+                pending_rows += len(batch.rows)
+                if deadline is None:
+                    deadline = time.monotonic() + self.args.flush_interval
+            if pending and (pending_rows >= self.args.batch_size or time.monotonic() >= deadline
+                            or stopped == self.enrich_threads):
+                if self.error is None:
+                    try:
+                        conn, cursor = self.store(conn, cursor, pending)
+                    except Exception as e:
+                        # Not retryable: stop, and keep draining so the other stages can exit.
+                        # Batches from here on are never checkpointed, so the next run refetches them.
+                        traceback.print_exc()
+                        print(f"❌ Writer failed: {e}. Stopping.")
+                        self.error = e
+                        self.stop.set()
+                pending, pending_rows, deadline = [], 0, None
+        if conn is not None:
+            try:
+                cursor.close()
+                conn.close()
+            except mysql.connector.Error:
+                pass
+
+    def store(self, conn, cursor, batches):
+        """Insert the batches' rows, reconnecting and retrying until it succeeds"""
+        rows = [row for batch in batches for row in batch.rows]
+        attempt = 0
+        while True:
+            try:
+                if conn is None:
+                    conn = mysql.connector.connect(**DB_CONFIG)
+                    cursor = conn.cursor()
+                inserted, skipped = bulk_insert(conn, cursor, rows, self.args.batch_size, analytics=self.analytics)
+                break
+            except mysql.connector.Error as e:
+                self.count(db_errors=1)
+                delay = min(2 ** attempt, MAX_RETRY_DELAY)
+                print(f"❌ MySQL Error: {e} (retrying in {delay:g}s)")
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except mysql.connector.Error:
+                        pass
+                conn = cursor = None
+                attempt += 1
+                time.sleep(delay)
+        ids = [row[0] for row in rows]
+        with self._ids_lock:
+            self.seen_ids.add(ids)
+            self.in_flight.difference_update(ids)
+        for batch in batches:
+            self.tracker.done(batch)
+        self.count(inserted=inserted, skipped=skipped)
+        return conn, cursor
+
+    # ---------- RUN ----------
+    def status_line(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return (f"📊 cycles {stats['cycles']} | fetched {stats['fetched']} | duplicates {stats['duplicates']} | "
+                f"enriched {stats['enriched']} | inserted {stats['inserted']} | "
+                f"queues {self.fetched.qsize()}/{self.fresh.qsize()}/{self.enriched.qsize()} | "
+                f"uncheckpointed batches {self.tracker.pending()} | memo hits {self.memo.hit_rate:.1%}")
+
+    def run(self):
+        threads = [threading.Thread(target=self.fetch_stage, name="fetch"),
+                   threading.Thread(target=self.dedupe_stage, name="dedupe"),
+                   threading.Thread(target=self.write_stage, name="write")]
+        threads += [threading.Thread(target=self.enrich_stage, name=f"enrich-{n}")
+                    for n in range(self.enrich_threads)]
+        for thread in threads:
+            thread.start()
+        try:
+            last_status = time.monotonic()
+            while any(thread.is_alive() for thread in threads):
+                threads[-1].join(timeout=0.5)
+                if time.monotonic() - last_status >= self.args.stats_interval:
+                    print(self.status_line())
+                    last_status = time.monotonic()
+        finally:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+            if self.pool is not None:
+                self.pool.shutdown()
+            if self.args.memo_path:
+                self.memo.save(self.args.memo_path)
+        print(self.status_line())
+
+
+# ---------- MAIN ----------
+def main():
+    parser = argparse.ArgumentParser(description="Continuously fetch, score and store tweets")
+    parser.add_argument("--fetch-concurrency", type=int, default=FETCH_CONCURRENCY,
+                        help="queries in flight at once")
+    parser.add_argument("--enrich-workers", type=int, default=1,
+                        help="scoring threads; above 1, each hands its batch to a process pool of this size")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="batches buffered between stages before the previous stage blocks")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="rows per INSERT statement and commit")
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL,
+                        help="seconds before a partial batch is written anyway")
+    parser.add_argument("--cycle-interval", type=float, default=CYCLE_INTERVAL,
+                        help="minimum seconds between collection cycles")
+    parser.add_argument("--stats-interval", type=float, default=STATS_INTERVAL,
+                        help="seconds between status lines")
+    parser.add_argument("--sentiment-backend", choices=SCORERS, default=SENTIMENT_BACKEND,
+                        help="sentiment scorer (default: $SENTIMENT_BACKEND, else textblob)")
+    parser.add_argument("--memo-size", type=int, default=MEMO_SIZE,
+                        help="distinct normalized texts whose scores are cached (0 disables the cache)")
+    parser.add_argument("--memo-path", nargs="?", const=MEMO_PATH, default=None,
+                        help=f"load the score cache from this file and save it on exit (default: {MEMO_PATH})")
+    parser.add_argument("--analytics-store", nargs="?", const="", default=os.environ.get("ANALYTICS_STORE"),
+                        help="also append inserted rows to this columnar analytics store "
+                             "(default: $ANALYTICS_STORE; backend/.analytics without a value)")
+    parser.add_argument("--once", action="store_true", help="run a single collection cycle, then drain and exit")
+    args = parser.parse_args()
+
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+        cursor = conn.cursor()
+        current = schema_is_current(cursor)
+        cursor.close()
+        conn.close()
+    except mysql.connector.Error as e:
+        print("❌ MySQL Error:", e)
+        return
+    if not current:
+        print("❌ Database schema is out of date. Run: python backend/migrate.py")
+        return
+
+    pipeline = Pipeline(args)
+    # Stop fetching and drain on Ctrl-C / SIGTERM
+    signal.signal(signal.SIGINT, lambda signum, frame: pipeline.stop.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: pipeline.stop.set())
+    print(f"🚀 Pipeline running: {len(QUERIES)} queries, {args.fetch_concurrency} in flight, "
+          f"{pipeline.enrich_threads} enrichment thread(s) ({pipeline.memo.scorer} sentiment), "
+          f"queues of {args.queue_size} batches")
+    pipeline.run()
+    if pipeline.error is not None:
+        raise SystemExit("❌ Pipeline stopped after a write error.")
+    print("✅ Pipeline stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+SQL and response shaping for the read API, shared by the Flask server
+(api.py, blocking mysql.connector) and the ASGI server (asgi_api.py,
+aiomysql). Each route is split into a function that builds (sql, params)
+from the request and one that turns fetched rows into the JSON payload,
+so both servers return identical responses.
+"""
+import datetime
+from collections import defaultdict
+
+from live_trends import GRANULARITIES, GROUP_BY
+from pagination import DEFAULT_PAGE_SIZE, KEYSET_SQL, MAX_PAGE_SIZE, InvalidCursor, encode_cursor, keyset_params
+from regions import split_region
+from rollups import POLARITY_BIN_WIDTH, POLARITY_HISTOGRAM_TABLE, SENTIMENTS
+from transport import TRANSPORT_TYPES, determine_transport_type
+
+# /api/tweets output fields -> columns they are built from
+TWEET_FIELDS = {
+    'id': ['id'],
+    'text': ['text'],
+    'timestamp': ['created_at'],
+    'location': ['region'],
+    'state': ['state', 'city', 'region'],
+    'city': ['state', 'city', 'region'],
+    'transportType': ['transport_type'],
+    'sentiment': ['sentiment', 'polarity', 'subjectivity', 'confidence'],
+}
+# /api/tweets filter parameters -> indexed columns
+TWEET_FILTERS = {
+    'state': 'state',
+    'city': 'city',
+    'sentiment': 'sentiment',
+    'transport': 'transport_type',
+}
+
+COUNT_TWEETS_SQL = "SELECT COUNT(*) FROM tweet_sentiment"
+
+# Hourly rollup buckets covering the last 7 days
+TRENDS_SQL = """
+    SELECT
+        DATE(bucket) as date,
+        HOUR(bucket) as hour,
+        state,
+        city,
+        CAST(SUM(positive_count) AS UNSIGNED) as positive,
+        CAST(SUM(negative_count) AS UNSIGNED) as negative,
+        CAST(SUM(neutral_count) AS UNSIGNED) as neutral
+    FROM tweet_rollup_hourly
+    WHERE bucket >= DATE_FORMAT(DATE_SUB(NOW(), INTERVAL 7 DAY), '%Y-%m-%d %H:00:00')
+    GROUP BY bucket, state, city
+    ORDER BY bucket DESC
+"""
+
+POLARITY_DAYS = 7  # default window of /api/analytics/polarity
+POLARITY_PERCENTILES = (10, 50, 90)
+
+
+class BadRequest(ValueError):
+    """Invalid query parameters (HTTP 400)"""
+
+
+# --- Helper Functions ---
+def row_transport_type(row):
+    """Stored transport type, classifying on the fly for rows not yet backfilled"""
+    return row.get('transport_type') or determine_transport_type(row.get('text') or '')
+
+def determine_sentiment_score(label):
+    return {
+        'positive': 0.5,
+        'negative': -0.5,
+        'neutral': 0
+    }.get(label.lower(), 0)
+
+def format_tweet(row):
+    """/api/tweets entry for a tweet_sentiment row (missing columns come back as None)"""
+    sentiment_label = row.get('sentiment') or 'neutral'
+    # Scores stored at ingest; rows migrate.py has not backfilled yet fall back to the label
+    polarity = row.get('polarity')
+    region = row.get('region') or 'India'
+
+    # Stored state/city, split from region for rows not yet backfilled
+    state, city = row.get('state'), row.get('city')
+    if state is None:
+        state, city = split_region(region)
+    city = city or state  # state-level regions report the state as city
+
+    return {
+        "id": row['id'],
+        "text": row.get('text'),
+        "timestamp": row['created_at'].isoformat() if row['created_at'] else datetime.datetime.now().isoformat(),
+        "location": region,
+        "state": state,
+        "city": city,
+        "transportType": row_transport_type(row),
+        "sentiment": {
+            "polarity": polarity if polarity is not None else determine_sentiment_score(sentiment_label),
+            "subjectivity": row.get('subjectivity'),
+            "label": sentiment_label,
+            "confidence": row.get('confidence')
+        }
+    }
+
+# --- /api/tweets ---
+def tweets_query(args):
+    """
+    (sql, params, fields, limit) for a page of /api/tweets.
+
+    Query parameters (all optional):
+      limit      page size (default 100, max 500)
+      cursor     X-Next-Cursor header of the previous page
+      state, city, sentiment, transport
+                 exact filters on the indexed columns
+      fields     comma-separated subset of TWEET_FIELDS to return
+    """
+    try:
+        limit = min(max(int(args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        raise BadRequest("limit must be an integer")
+    fields = args.get('fields')
+    fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else list(TWEET_FIELDS)
+    unknown = [field for field in fields if field not in TWEET_FIELDS]
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}")
+    if args.get('sentiment') not in (None, *SENTIMENTS):
+        raise BadRequest(f"sentiment must be one of {', '.join(SENTIMENTS)}")
+    if args.get('transport') not in (None, *TRANSPORT_TYPES):
+        raise BadRequest(f"transport must be one of {', '.join(TRANSPORT_TYPES)}")
+
+    where, params = [], []
+    for arg, column in TWEET_FILTERS.items():
+        if args.get(arg) is not None:
+            where.append(f"{column} = %s")
+            params.append(args.get(arg))
+    if args.get('cursor'):
+        try:
+            params.extend(keyset_params(args.get('cursor')))
+        except InvalidCursor as e:
+            raise BadRequest(str(e))
+        where.append(KEYSET_SQL)
+
+    # Projection: only the columns the requested fields are built from
+    columns = ['id', 'created_at']
+    for field in fields:
+        columns += [column for column in TWEET_FIELDS[field] if column not in columns]
+
+    sql = f"""
+        SELECT {', '.join(columns)} FROM tweet_sentiment
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY created_at DESC, id DESC
+        LIMIT %s
+    """
+    return sql, (*params, limit + 1), fields, limit
+
+def tweets_page(rows, fields, limit):
+    """(tweets, next_cursor) from the limit + 1 rows fetched for tweets_query"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+
+    tweets = []
+    for row in rows:
+        tweet = format_tweet(row)
+        tweets.append({field: tweet[field] for field in fields})
+    return tweets, next_cursor
+
+# --- /api/states ---
+def states_summary_query(states=None):
+    """(sql, params) for summarize_states, over all states or only the given ones"""
+    where = f"WHERE state IN ({', '.join(['%s'] * len(states))})" if states else ""
+    # Daily rollup rows, not raw tweets: cost follows states x days
+    sql = f"""
+        SELECT
+            state,
+            transport_type,
+            CAST(SUM(total_count) AS UNSIGNED) as total_messages,
+            CAST(SUM(positive_count) AS UNSIGNED) as positive_count,
+            CAST(SUM(negative_count) AS UNSIGNED) as negative_count,
+            CAST(SUM(neutral_count) AS UNSIGNED) as neutral_count
+        FROM tweet_rollup_daily
+        {where}
+        GROUP BY state, transport_type
+        ORDER BY total_messages DESC
+    """
+    return sql, tuple(states or ())
+
+def summarize_states(rows):
+    """/api/states entries from states_summary_query rows"""
+    # Group by state
+    state_data = defaultdict(lambda: {
+        'total_messages': 0,
+        'positive_count': 0,
+        'negative_count': 0,
+        'neutral_count': 0,
+        'transport_breakdown': dict.fromkeys(TRANSPORT_TYPES, 0)
+    })
+
+    states_data = []
+    for row in rows:
+        # Aggregate data by state
+        state_info = state_data[row['state']]
+        if row['transport_type'] in state_info['transport_breakdown']:
+            state_info['transport_breakdown'][row['transport_type']] += row['total_messages']
+        state_info['total_messages'] += row['total_messages']
+        state_info['positive_count'] += row['positive_count']
+        state_info['negative_count'] += row['negative_count']
+        state_info['neutral_count'] += row['neutral_count']
+
+    # Convert to final format
+    for state, data in state_data.items():
+        if data['total_messages'] > 0:
+            sentiment_score = (data['positive_count'] - data['negative_count']) / data['total_messages']
+
+            states_data.append({
+                "state": state,
+                "sentimentScore": sentiment_score,
+                "totalMessages": data['total_messages'],
+                "transportBreakdown": data['transport_breakdown'],
+                "sentimentBreakdown": {
+                    "positive": data['positive_count'],
+                    "negative": data['negative_count'],
+                    "neutral": data['neutral_count']
+                }
+            })
+    return states_data
+
+# --- /api/states/<state> ---
+def state_details_query(state_name, city=None):
+    """(sql, params) for the latest 50 tweets of a state (optionally one city)"""
+    # Exact match on the normalized columns: served by the
+    # (state, created_at) / (state, city, created_at) indexes
+    sql = f"""
+        SELECT
+            region,
+            state,
+            city,
+            text,
+            sentiment,
+            polarity,
+            confidence,
+            transport_type,
+            created_at
+        FROM tweet_sentiment
+        WHERE state = %s {'AND city = %s' if city is not None else ''}
+        ORDER BY created_at DESC
+        LIMIT 50
+    """
+    return sql, (state_name, city) if city is not None else (state_name,)
+
+def format_state_details(rows):
+    result = []
+    for row in rows:
+        transport_type = row_transport_type(row)
+        result.append({
+            'region': row['region'],
+            'state': row['state'],
+            'city': row['city'],
+            'text': row['text'],
+            'sentiment': row['sentiment'],
+            'polarity': row['polarity'],
+            'confidence': row['confidence'],
+            'transport_type': transport_type,
+            'created_at': row['created_at'].isoformat() if row['created_at'] else None
+        })
+    return result
+
+# --- /api/analytics/live ---
+def live_trends_params(args):
+    """
+    Keyword arguments of SlidingWindowAggregator.summary for /api/analytics/live.
+
+    Query parameters (all optional):
+      granularity  minute, hour (default) or day buckets
+      window       buckets per window (default per granularity)
+      baseline     earlier windows the current one is compared with
+      by           state (default), transport or state,transport
+      state, transport
+                   only these groups
+      spikes       1 to return only groups with a negative-share spike
+    """
+    granularity = args.get('granularity', 'hour')
+    if granularity not in GRANULARITIES:
+        raise BadRequest(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    by = args.get('by', 'state')
+    if by not in GROUP_BY:
+        raise BadRequest(f"by must be one of {', '.join(GROUP_BY)}")
+    if args.get('transport') not in (None, *TRANSPORT_TYPES):
+        raise BadRequest(f"transport must be one of {', '.join(TRANSPORT_TYPES)}")
+    params = {'granularity': granularity, 'by': by, 'state': args.get('state'),
+              'transport': args.get('transport'), 'spikes_only': args.get('spikes') in ('1', 'true')}
+    _seconds, slots, window, baseline = GRANULARITIES[granularity]
+    try:
+        params['window'] = int(args.get('window', window))
+        params['baseline'] = int(args.get('baseline', baseline))
+    except ValueError:
+        raise BadRequest("window and baseline must be integers")
+    if params['window'] < 1 or params['baseline'] < 1 or (params['baseline'] + 1) * params['window'] > slots:
+        raise BadRequest(f"(baseline + 1) x window must be at most {slots} {granularity} buckets")
+    return params
+
+# --- /api/analytics/trends ---
+def format_trends(rows):
+    """TRENDS_SQL rows -> one entry per (hour, region, sentiment), as before"""
+    trends = []
+    for row in rows:
+        for sentiment in SENTIMENTS:
+            if not row[sentiment]:
+                continue
+            trends.append({
+                'date': row['date'].isoformat() if row['date'] else None,
+                'hour': row['hour'],
+                'state': row['state'],
+                'sentiment': determine_sentiment_score(sentiment),
+                'message_count': row[sentiment]
+            })
+    return trends
+
+# --- /api/analytics/polarity ---
+def polarity_queries(args):
+    """
+    ((sql, params), (sql, params)) for /api/analytics/polarity: score sums
+    from tweet_rollup_hourly and polarity percentiles from the histogram,
+    per state and hour, both computed by MySQL.
+
+    Query parameters (all optional):
+      days       hours of the last `days` days (default 7, max 31)
+      state      one state only
+    """
+    try:
+        days = min(max(int(args.get('days', POLARITY_DAYS)), 1), 31)
+    except ValueError:
+        raise BadRequest("days must be an integer")
+    cutoff = "DATE_FORMAT(DATE_SUB(NOW(), INTERVAL %s DAY), '%%Y-%%m-%%d %%H:00:00')"  # %% : query has params
+    where, params = f"bucket >= {cutoff}", [days]
+    if args.get('state') is not None:
+        where += " AND state = %s"
+        params.append(args.get('state'))
+
+    sums_sql = f"""
+        SELECT
+            state,
+            bucket,
+            CAST(SUM(scored_count) AS UNSIGNED) as scored,
+            SUM(polarity_sum) as polarity_sum,
+            SUM(subjectivity_sum) as subjectivity_sum,
+            SUM(confidence_sum) as confidence_sum
+        FROM tweet_rollup_hourly
+        WHERE {where}
+        GROUP BY state, bucket
+        HAVING scored > 0
+        ORDER BY bucket DESC, state
+    """
+    # First bin whose running count reaches each percentile of the (state, hour)
+    percentiles = ",\n".join(
+        f"            MIN(CASE WHEN running >= {percentile / 100} * total THEN bin END) as p{percentile}"
+        for percentile in POLARITY_PERCENTILES
+    )
+    percentiles_sql = f"""
+        SELECT
+            state,
+            bucket,
+{percentiles}
+        FROM (
+            SELECT
+                state,
+                bucket,
+                bin,
+                SUM(tweet_count) OVER (PARTITION BY state, bucket ORDER BY bin) as running,
+                SUM(tweet_count) OVER (PARTITION BY state, bucket) as total
+            FROM {POLARITY_HISTOGRAM_TABLE}
+            WHERE {where}
+        ) AS histogram
+        GROUP BY state, bucket
+    """
+    return (sums_sql, tuple(params)), (percentiles_sql, tuple(params))
+
+def format_polarity(sum_rows, percentile_rows):
+    """/api/analytics/polarity entries, newest hour first"""
+    percentiles = {(row['state'], row['bucket']): row for row in percentile_rows}
+    result = []
+    for row in sum_rows:
+        scored = row['scored']
+        bins = percentiles.get((row['state'], row['bucket']), {})
+        result.append({
+            'date': row['bucket'].date().isoformat(),
+            'hour': row['bucket'].hour,
+            'state': row['state'],
+            'messages': scored,
+            'meanPolarity': row['polarity_sum'] / scored,
+            'meanSubjectivity': row['subjectivity_sum'] / scored,
+            'meanConfidence': row['confidence_sum'] / scored,
+            'polarityPercentiles': {
+                f"p{percentile}": (round(bins[f"p{percentile}"] * POLARITY_BIN_WIDTH, 2)
+                                   if bins.get(f"p{percentile}") is not None else None)
+                for percentile in POLARITY_PERCENTILES
+            },
+        })
+    return result
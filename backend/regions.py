@@ -0,0 +1,218 @@
+"""
+Region detection for tweet text.
+
+The gazetteer (states, cities and common aliases) is compiled once at import
+time into an Aho-Corasick automaton, so every term is found in a single pass
+over the lowercased text instead of one substring scan per term.
+"""
+from collections import deque
+
+# ---------- INDIAN STATES AND CITIES MAPPING ----------
+INDIAN_STATES_CITIES = {
+    'Andhra Pradesh': ['Visakhapatnam', 'Vijayawada', 'Guntur', 'Nellore', 'Kurnool', 'Rajahmundry', 'Tirupati'],
+    'Arunachal Pradesh': ['Itanagar', 'Naharlagun', 'Pasighat', 'Tezpur'],
+    'Assam': ['Guwahati', 'Silchar', 'Dibrugarh', 'Jorhat', 'Nagaon', 'Tinsukia'],
+    'Bihar': ['Patna', 'Gaya', 'Bhagalpur', 'Muzaffarpur', 'Darbhanga', 'Bihar Sharif'],
+    'Chhattisgarh': ['Raipur', 'Bhilai', 'Korba', 'Bilaspur', 'Durg', 'Rajnandgaon'],
+    'Goa': ['Panaji', 'Margao', 'Vasco da Gama', 'Mapusa', 'Ponda'],
+    'Gujarat': ['Ahmedabad', 'Surat', 'Vadodara', 'Rajkot', 'Bhavnagar', 'Jamnagar'],
+    'Haryana': ['Gurgaon', 'Faridabad', 'Panipat', 'Ambala', 'Yamunanagar', 'Rohtak'],
+    'Himachal Pradesh': ['Shimla', 'Dharamshala', 'Solan', 'Mandi', 'Kullu', 'Hamirpur'],
+    'Jharkhand': ['Ranchi', 'Jamshedpur', 'Dhanbad', 'Bokaro', 'Deoghar', 'Hazaribagh'],
+    'Karnataka': ['Bangalore', 'Mysore', 'Hubli', 'Mangalore', 'Belgaum', 'Gulbarga'],
+    'Kerala': ['Kochi', 'Thiruvananthapuram', 'Kozhikode', 'Thrissur', 'Kollam', 'Palakkad'],
+    'Madhya Pradesh': ['Bhopal', 'Indore', 'Gwalior', 'Jabalpur', 'Ujjain', 'Sagar'],
+    'Maharashtra': ['Mumbai', 'Pune', 'Nagpur', 'Nashik', 'Aurangabad', 'Solapur'],
+    'Manipur': ['Imphal', 'Thoubal', 'Bishnupur', 'Churachandpur'],
+    'Meghalaya': ['Shillong', 'Tura', 'Jowai', 'Nongstoin'],
+    'Mizoram': ['Aizawl', 'Lunglei', 'Saiha', 'Champhai'],
+    'Nagaland': ['Kohima', 'Dimapur', 'Mokokchung', 'Tuensang'],
+    'Odisha': ['Bhubaneswar', 'Cuttack', 'Rourkela', 'Berhampur', 'Sambalpur', 'Puri'],
+    'Punjab': ['Chandigarh', 'Ludhiana', 'Amritsar', 'Jalandhar', 'Patiala', 'Bathinda'],
+    'Rajasthan': ['Jaipur', 'Jodhpur', 'Udaipur', 'Kota', 'Bikaner', 'Ajmer'],
+    'Sikkim': ['Gangtok', 'Namchi', 'Gyalshing', 'Mangan'],
+    'Tamil Nadu': ['Chennai', 'Coimbatore', 'Madurai', 'Salem', 'Tiruchirappalli', 'Tirunelveli'],
+    'Telangana': ['Hyderabad', 'Warangal', 'Nizamabad', 'Karimnagar', 'Khammam', 'Mahbubnagar'],
+    'Tripura': ['Agartala', 'Dharmanagar', 'Udaipur', 'Kailashahar'],
+    'Uttar Pradesh': ['Lucknow', 'Kanpur', 'Agra', 'Varanasi', 'Meerut', 'Allahabad'],
+    'Uttarakhand': ['Dehradun', 'Haridwar', 'Roorkee', 'Haldwani', 'Rudrapur', 'Kashipur'],
+    'West Bengal': ['Kolkata', 'Howrah', 'Durgapur', 'Siliguri', 'Asansol', 'Malda'],
+    'Delhi': ['New Delhi', 'Gurgaon', 'Noida', 'Faridabad', 'Ghaziabad'],
+    'Jammu and Kashmir': ['Srinagar', 'Jammu', 'Anantnag', 'Baramulla', 'Udhampur'],
+    'Ladakh': ['Leh', 'Kargil', 'Nubra', 'Zanskar']
+}
+
+# ---------- COMMON ABBREVIATIONS AND NICKNAMES ----------
+LOCATION_MAPPINGS = {
+    'mumbai': 'Mumbai, Maharashtra',
+    'delhi': 'Delhi',
+    'bangalore': 'Bangalore, Karnataka',
+    'bengaluru': 'Bangalore, Karnataka',
+    'chennai': 'Chennai, Tamil Nadu',
+    'kolkata': 'Kolkata, West Bengal',
+    'calcutta': 'Kolkata, West Bengal',
+    'hyderabad': 'Hyderabad, Telangana',
+    'pune': 'Pune, Maharashtra',
+    'ahmedabad': 'Ahmedabad, Gujarat',
+    'surat': 'Surat, Gujarat',
+    'jaipur': 'Jaipur, Rajasthan',
+    'lucknow': 'Lucknow, Uttar Pradesh',
+    'kanpur': 'Kanpur, Uttar Pradesh',
+    'nagpur': 'Nagpur, Maharashtra',
+    'patna': 'Patna, Bihar',
+    'indore': 'Indore, Madhya Pradesh',
+    'bhopal': 'Bhopal, Madhya Pradesh',
+    'ludhiana': 'Ludhiana, Punjab',
+    'agra': 'Agra, Uttar Pradesh',
+    'nashik': 'Nashik, Maharashtra',
+    'vadodara': 'Vadodara, Gujarat',
+    'gurgaon': 'Gurgaon, Haryana',
+    'gurugram': 'Gurgaon, Haryana',
+    'noida': 'Noida, Delhi',
+    'faridabad': 'Faridabad, Haryana',
+    'ghaziabad': 'Ghaziabad, Delhi',
+    'rajkot': 'Rajkot, Gujarat',
+    'kochi': 'Kochi, Kerala',
+    'cochin': 'Kochi, Kerala',
+    'coimbatore': 'Coimbatore, Tamil Nadu',
+    'madurai': 'Madurai, Tamil Nadu',
+    'jodhpur': 'Jodhpur, Rajasthan',
+    'raipur': 'Raipur, Chhattisgarh',
+    'kota': 'Kota, Rajasthan',
+    'guwahati': 'Guwahati, Assam',
+    'chandigarh': 'Chandigarh, Punjab',
+    'thiruvananthapuram': 'Thiruvananthapuram, Kerala',
+    'trivandrum': 'Thiruvananthapuram, Kerala',
+    'mysore': 'Mysore, Karnataka',
+    'mysuru': 'Mysore, Karnataka',
+    'salem': 'Salem, Tamil Nadu',
+    'meerut': 'Meerut, Uttar Pradesh',
+    'jabalpur': 'Jabalpur, Madhya Pradesh',
+    'gwalior': 'Gwalior, Madhya Pradesh',
+    'vijayawada': 'Vijayawada, Andhra Pradesh',
+    'visakhapatnam': 'Visakhapatnam, Andhra Pradesh',
+    'vizag': 'Visakhapatnam, Andhra Pradesh',
+    'ranchi': 'Ranchi, Jharkhand',
+    'jamshedpur': 'Jamshedpur, Jharkhand',
+    'dhanbad': 'Dhanbad, Jharkhand',
+    'amritsar': 'Amritsar, Punjab',
+    'jalandhar': 'Jalandhar, Punjab',
+    'allahabad': 'Allahabad, Uttar Pradesh',
+    'prayagraj': 'Allahabad, Uttar Pradesh',
+    'varanasi': 'Varanasi, Uttar Pradesh',
+    'banaras': 'Varanasi, Uttar Pradesh',
+    'howrah': 'Howrah, West Bengal',
+    'durgapur': 'Durgapur, West Bengal',
+    'siliguri': 'Siliguri, West Bengal',
+    'asansol': 'Asansol, West Bengal'
+}
+
+DEFAULT_REGION = 'India'
+
+# ---------- REGION MATCHER ----------
+def _gazetteer_terms():
+    """
+    Yield (term, region) pairs in precedence order: states, then cities,
+    then aliases. Earlier entries win when several terms occur in a tweet.
+    """
+    for state in INDIAN_STATES_CITIES:
+        yield state.lower(), state
+    for state, cities in INDIAN_STATES_CITIES.items():
+        for city in cities:
+            yield city.lower(), f"{city}, {state}"
+    for keyword, region in LOCATION_MAPPINGS.items():
+        yield keyword, region
+
+
+class RegionMatcher:
+    """
+    Aho-Corasick automaton over the gazetteer.
+
+    Matching is plain substring matching (same as the original `in` checks),
+    and the result is the matched term with the best precedence rank.
+    """
+
+    def __init__(self, terms):
+        self.regions = []
+        ranks = {}
+        for term, region in terms:
+            if term not in ranks:
+                ranks[term] = len(self.regions)
+            self.regions.append(region)
+
+        goto = [{}]
+        best = [None]
+        for term, rank in ranks.items():
+            node = 0
+            for ch in term:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    best.append(None)
+                    nxt = len(goto) - 1
+                    goto[node][ch] = nxt
+                node = nxt
+            best[node] = rank
+
+        # Breadth-first pass: compute failure links, fold the best rank of
+        # every suffix into each node and turn goto into a full DFA so the
+        # scan loop is a single dict lookup per character.
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            suffix_best = best[fail[node]]
+            if suffix_best is not None and (best[node] is None or suffix_best < best[node]):
+                best[node] = suffix_best
+            for ch, child in goto[node].items():
+                queue.append(child)
+                fail[child] = goto[fail[node]].get(ch, 0)
+            for ch, target in goto[fail[node]].items():
+                goto[node].setdefault(ch, target)
+
+        self._goto = goto
+        self._best = best
+
+    def best_rank(self, text_lower):
+        """Return the best precedence rank found in the text, or None"""
+        goto = self._goto
+        best = self._best
+        node = 0
+        found = None
+        for ch in text_lower:
+            node = goto[node].get(ch, 0)
+            rank = best[node]
+            if rank is not None and (found is None or rank < found):
+                found = rank
+                if found == 0:
+                    break
+        return found
+
+    def match(self, text):
+        """Return the region for the text, or None when nothing matches"""
+        rank = self.best_rank(text.lower())
+        return None if rank is None else self.regions[rank]
+
+
+REGION_MATCHER = RegionMatcher(_gazetteer_terms())
+
+# ---------- REGION DETECTION FUNCTION ----------
+def detect_region_from_text(text):
+    """
+    Detect region (state or major city) from tweet text
+    """
+    return REGION_MATCHER.match(text) or DEFAULT_REGION
+
+def split_region(region):
+    """
+    (state, city) for a detected region such as "Pune, Maharashtra".
+    City is '' for state-level regions ("Goa") and the default region.
+    """
+    if ',' in region:
+        city, state = region.split(',', 1)
+        return state.strip(), city.strip()
+    return region, ''
+
+# split_region as SQL expressions over the region column (backfills/rebuilds)
+STATE_SQL = "TRIM(IF(LOCATE(',', region) > 0, SUBSTRING(region, LOCATE(',', region) + 1), region))"
+CITY_SQL = "TRIM(IF(LOCATE(',', region) > 0, SUBSTRING_INDEX(region, ',', 1), ''))"
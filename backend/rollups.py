@@ -0,0 +1,182 @@
+"""
+Pre-aggregated sentiment counts for the dashboard.
+
+tweet_rollup_hourly and tweet_rollup_daily hold positive/negative/neutral
+counts keyed by (state, city, transport_type, bucket), plus sums of the
+stored polarity/subjectivity/confidence scores for means.
+tweet_polarity_hourly counts tweets per (state, hour, polarity bin), a
+histogram the percentiles are read from. The ingestion pipeline folds
+every newly inserted chunk into all three tables inside the same
+transaction as the INSERT, so the API reads O(states x buckets) rollup rows
+instead of aggregating the raw tweet_sentiment table on every request.
+"""
+import math
+from collections import defaultdict
+
+from regions import CITY_SQL, STATE_SQL
+
+ROLLUP_TABLES = {
+    # table: (bucket column type, created_at -> bucket, SQL expression for a rebuild)
+    "tweet_rollup_hourly": (
+        "DATETIME",
+        lambda created_at: f"{created_at[:10]} {created_at[11:13]}:00:00",
+        "DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00')",
+    ),
+    "tweet_rollup_daily": (
+        "DATE",
+        lambda created_at: created_at[:10],
+        "DATE(created_at)",
+    ),
+}
+SENTIMENTS = ("positive", "negative", "neutral")
+# Columns summed from tweet_sentiment; scored_count counts the rows that have them
+SCORE_COLUMNS = ("polarity", "subjectivity", "confidence")
+
+POLARITY_HISTOGRAM_TABLE = "tweet_polarity_hourly"
+POLARITY_BIN_WIDTH = 0.05  # bins -20..20 centred on multiples of 0.05
+POLARITY_BIN_SQL = f"FLOOR(polarity / {POLARITY_BIN_WIDTH} + 0.5)"
+
+
+def create_table_sql(table):
+    bucket_type = ROLLUP_TABLES[table][0]
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            state VARCHAR(100) NOT NULL,
+            city VARCHAR(100) NOT NULL DEFAULT '',
+            transport_type VARCHAR(10) NOT NULL,
+            bucket {bucket_type} NOT NULL,
+            positive_count INT UNSIGNED NOT NULL DEFAULT 0,
+            negative_count INT UNSIGNED NOT NULL DEFAULT 0,
+            neutral_count INT UNSIGNED NOT NULL DEFAULT 0,
+            total_count INT UNSIGNED NOT NULL DEFAULT 0,
+            {", ".join(score_column_definitions())},
+            PRIMARY KEY (state, city, transport_type, bucket),
+            KEY idx_{table}_bucket (bucket)
+        )
+    """
+
+def score_column_definitions():
+    """Score sum columns of a rollup table (also added to older tables by migrate.py)"""
+    return ([f"{column}_sum DOUBLE NOT NULL DEFAULT 0" for column in SCORE_COLUMNS]
+            + ["scored_count INT UNSIGNED NOT NULL DEFAULT 0"])
+
+def upsert_sql(table):
+    return f"""
+        INSERT INTO {table}
+            (state, city, transport_type, bucket, positive_count, negative_count, neutral_count, total_count,
+             polarity_sum, subjectivity_sum, confidence_sum, scored_count)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            positive_count = positive_count + VALUES(positive_count),
+            negative_count = negative_count + VALUES(negative_count),
+            neutral_count = neutral_count + VALUES(neutral_count),
+            total_count = total_count + VALUES(total_count),
+            polarity_sum = polarity_sum + VALUES(polarity_sum),
+            subjectivity_sum = subjectivity_sum + VALUES(subjectivity_sum),
+            confidence_sum = confidence_sum + VALUES(confidence_sum),
+            scored_count = scored_count + VALUES(scored_count)
+    """
+
+def rebuild_sql(table):
+    """Recompute a rollup table from tweet_sentiment in one statement"""
+    bucket_sql = ROLLUP_TABLES[table][2]
+    return f"""
+        INSERT INTO {table}
+            (state, city, transport_type, bucket, positive_count, negative_count, neutral_count, total_count,
+             polarity_sum, subjectivity_sum, confidence_sum, scored_count)
+        SELECT
+            {STATE_SQL}, {CITY_SQL}, COALESCE(transport_type, 'bus'), {bucket_sql},
+            SUM(sentiment = 'positive'), SUM(sentiment = 'negative'), SUM(sentiment = 'neutral'), COUNT(*),
+            COALESCE(SUM(polarity), 0), COALESCE(SUM(subjectivity), 0), COALESCE(SUM(confidence), 0),
+            COUNT(polarity)
+        FROM tweet_sentiment
+        GROUP BY 1, 2, 3, 4
+    """
+
+# ---------- POLARITY HISTOGRAM ----------
+POLARITY_HISTOGRAM_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {POLARITY_HISTOGRAM_TABLE} (
+        state VARCHAR(100) NOT NULL,
+        bucket DATETIME NOT NULL,
+        bin TINYINT NOT NULL,
+        tweet_count INT UNSIGNED NOT NULL DEFAULT 0,
+        PRIMARY KEY (state, bucket, bin),
+        KEY idx_{POLARITY_HISTOGRAM_TABLE}_bucket (bucket)
+    )
+"""
+POLARITY_HISTOGRAM_UPSERT_SQL = f"""
+    INSERT INTO {POLARITY_HISTOGRAM_TABLE} (state, bucket, bin, tweet_count)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE tweet_count = tweet_count + VALUES(tweet_count)
+"""
+POLARITY_HISTOGRAM_REBUILD_SQL = f"""
+    INSERT INTO {POLARITY_HISTOGRAM_TABLE} (state, bucket, bin, tweet_count)
+    SELECT {STATE_SQL}, {ROLLUP_TABLES["tweet_rollup_hourly"][2]}, {POLARITY_BIN_SQL}, COUNT(*)
+    FROM tweet_sentiment
+    WHERE polarity IS NOT NULL
+    GROUP BY 1, 2, 3
+"""
+
+def polarity_bin(polarity):
+    """Histogram bin of a polarity (same rounding as POLARITY_BIN_SQL)"""
+    return math.floor(polarity / POLARITY_BIN_WIDTH + 0.5)
+
+def aggregate(rows):
+    """
+    Per-table rollup deltas for (id, text, created_at, sentiment, region,
+    transport_type, state, city, polarity, subjectivity, confidence) rows:
+    {table: [(state, city, transport_type, bucket, positive, negative,
+    neutral, total, polarity_sum, subjectivity_sum, confidence_sum,
+    scored), ...], POLARITY_HISTOGRAM_TABLE: [(state, bucket, bin, count), ...]}
+    """
+    deltas = {}
+    for table, (_type, to_bucket, _sql) in ROLLUP_TABLES.items():
+        counts = defaultdict(lambda: [0, 0, 0, 0, 0.0, 0.0, 0.0, 0])
+        for _id, _text, created_at, sentiment, _region, transport_type, state, city, *scores in rows:
+            key = (state, city, transport_type, to_bucket(created_at))
+            count = counts[key]
+            if sentiment in SENTIMENTS:
+                count[SENTIMENTS.index(sentiment)] += 1
+            count[3] += 1
+            if scores and scores[0] is not None:
+                for i, score in enumerate(scores, start=4):
+                    count[i] += score
+                count[7] += 1
+        deltas[table] = [key + tuple(count) for key, count in counts.items()]
+
+    to_hour = ROLLUP_TABLES["tweet_rollup_hourly"][1]
+    bins = defaultdict(int)
+    for _id, _text, created_at, _sentiment, _region, _transport_type, state, _city, *scores in rows:
+        if scores and scores[0] is not None:
+            bins[(state, to_hour(created_at), polarity_bin(scores[0]))] += 1
+    deltas[POLARITY_HISTOGRAM_TABLE] = [key + (count,) for key, count in bins.items()]
+    return deltas
+
+
+def new_rows(cursor, chunk):
+    """
+    Rows of a chunk whose ids are not stored yet (first occurrence only).
+    Called before the chunk's INSERT IGNORE so only the rows it actually
+    inserts are added to the rollups. The caller holds the writer lock
+    (bulk_insert does), so no other writer can insert the same ids between
+    this check and the commit.
+    """
+    ids = list({row[0] for row in chunk})
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"SELECT id FROM tweet_sentiment WHERE id IN ({placeholders})", ids)
+    stored = {str(tweet_id) for (tweet_id,) in cursor.fetchall()}
+    fresh = []
+    for row in chunk:
+        if str(row[0]) not in stored:
+            stored.add(str(row[0]))
+            fresh.append(row)
+    return fresh
+
+def add_to_rollups(cursor, rows):
+    """Fold newly inserted rows into every rollup table (caller commits)"""
+    if not rows:
+        return
+    for table, delta in aggregate(rows).items():
+        if delta:
+            sql = POLARITY_HISTOGRAM_UPSERT_SQL if table == POLARITY_HISTOGRAM_TABLE else upsert_sql(table)
+            cursor.executemany(sql, delta)
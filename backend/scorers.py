@@ -0,0 +1,73 @@
+"""
+Pluggable sentiment scorers.
+
+A scorer has a `name`, an `identity` that changes whenever its scores
+would (e.g. "lexicon:vader" vs "lexicon:pattern"), label thresholds on
+its polarity scale and:
+  load()              build its tables (e.g. as a process pool initializer)
+  score_batch(texts)  (labels, polarities, subjectivities): a label list
+                      and NumPy arrays of polarity (-1..1) and
+                      subjectivity (0..1), in input order
+  confidence(pols)    confidence in each label (0.5..1)
+
+Backends (SCORERS):
+  textblob  sentiment.analyze_sentiment_batch: the reference labels,
+            English only
+  lexicon   lexicon_sentiment.LexiconScorer: VADER-style lexicon plus
+            transport and Hinglish/Hindi terms, several times faster
+
+The backend is picked by SENTIMENT_BACKEND (default "textblob") or the
+--sentiment-backend flag of analyse_sentiment.py and pipeline.py.
+"""
+import os
+import threading
+
+from lexicon_sentiment import LexiconScorer
+from sentiment import (NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD, analyze_sentiment_batch, load_resources,
+                       sentiment_confidence)
+
+SENTIMENT_BACKEND = os.environ.get("SENTIMENT_BACKEND", "textblob")
+
+
+class TextBlobScorer:
+    """TextBlob/pattern polarity with the emoji adjustment (sentiment.py)"""
+
+    name = "textblob"
+    identity = "textblob"
+    positive_threshold = POSITIVE_THRESHOLD
+    negative_threshold = NEGATIVE_THRESHOLD
+
+    def load(self):
+        load_resources()
+
+    def score_batch(self, texts):
+        return analyze_sentiment_batch(texts)
+
+    def confidence(self, polarities):
+        return sentiment_confidence(polarities)
+
+SCORERS = {scorer.name: scorer for scorer in (TextBlobScorer, LexiconScorer)}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_scorer(name=SENTIMENT_BACKEND):
+    """The shared scorer instance of a backend; ValueError for unknown names"""
+    if name not in SCORERS:
+        raise ValueError(f"unknown sentiment backend {name!r} (choose from {', '.join(SCORERS)})")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = SCORERS[name]()
+        return _instances[name]
+
+
+def scorer_identity(name=SENTIMENT_BACKEND):
+    """What produced a backend's scores here, for tagging saved results"""
+    if name not in SCORERS:
+        raise ValueError(f"unknown sentiment backend {name!r} (choose from {', '.join(SCORERS)})")
+    return SCORERS[name].identity
+
+def load_scorer(name=SENTIMENT_BACKEND):
+    """Load a backend's tables up front (process pool initializer)"""
+    get_scorer(name).load()
@@ -0,0 +1,338 @@
+"""
+Sentiment scoring for tweet text.
+
+`analyze_sentiment` is the reference implementation (TextBlob + emoji).
+`analyze_sentiment_batch` produces the same labels for many texts at once,
+along with the polarity and subjectivity behind them: the pattern lexicon
+is flattened once, tokenization and scoring skip the per-call
+TextBlob/namedtuple machinery, and the final clamp/threshold step runs on
+NumPy arrays. `sentiment_confidence` turns polarities into a confidence
+in their labels.
+
+TextBlob, NumPy and the emoji table are loaded on first use (see
+`load_resources`), not at import.
+"""
+import re
+import string
+import threading
+from functools import lru_cache
+
+# ---------- EMOJI SCORES ----------
+POSITIVE_EMOJIS = ["😊", "😁", "😄", "😍", "👍", "✅", "💚", "🎉", "👌", "😀"]
+NEGATIVE_EMOJIS = ["😠", "😡", "🤬", "💢", "👎", "❌", "💔", "😞", "😢", "😤"]
+EMOJI_WEIGHT = 0.3
+
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+
+# ---------- SENTIMENT ANALYSIS FUNCTION ----------
+def analyze_sentiment(text):
+    """
+    Enhanced sentiment analysis for Indian context
+    """
+    load_resources()
+    # Remove emojis for TextBlob analysis
+    text_clean = ''.join(c for c in text if c not in emoji.EMOJI_DATA)
+
+    # Get emoji sentiment
+    text_emojis = ''.join(c for c in text if c in emoji.EMOJI_DATA)
+    emoji_sentiment = 0
+
+    if text_emojis:
+        for emoji_char in text_emojis:
+            if emoji_char in POSITIVE_EMOJIS:
+                emoji_sentiment += EMOJI_WEIGHT
+            elif emoji_char in NEGATIVE_EMOJIS:
+                emoji_sentiment -= EMOJI_WEIGHT
+
+    # TextBlob sentiment
+    blob = TextBlob(text_clean)
+    polarity = blob.sentiment.polarity + emoji_sentiment
+
+    # Clamp polarity between -1 and 1
+    polarity = max(-1, min(1, polarity))
+
+    if polarity > POSITIVE_THRESHOLD:
+        return "positive"
+    elif polarity < NEGATIVE_THRESHOLD:
+        return "negative"
+    else:
+        return "neutral"
+
+
+# ---------- PRECOMPUTED TABLES FOR BATCH SCORING ----------
+_EMOJI_SCORES = dict.fromkeys(POSITIVE_EMOJIS, EMOJI_WEIGHT)
+_EMOJI_SCORES.update(dict.fromkeys(NEGATIVE_EMOJIS, -EMOJI_WEIGHT))
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+_UNICODE_QUOTES = ("“", "”", "‘", "’")
+_LINEBREAK_RE = re.compile(r"\n{2,}")
+_UPPERCASE = frozenset(string.ascii_uppercase)
+
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def load_resources():
+    """
+    Import TextBlob/pattern, NumPy and the emoji table and build the batch
+    scorer's tables. Runs once, on the first scoring call; importing this
+    module stays cheap for processes that never score (the API, the
+    scraper). Call it up front (e.g. as a process pool initializer) to keep
+    that cost out of the first batch.
+    """
+    global _loaded, emoji, np, TextBlob, ABBREVIATIONS, EOS, RE_ABBR1, RE_ABBR2, RE_ABBR3, RE_EMOTICONS, \
+        RE_SARCASM, replacements, _EMOJI_CHARS, _LEXICON, _NEGATIONS, _EMOTICON_SCORES, _TRIGGER_WORDS, \
+        _CONTRACTIONS_RE, _LEADING_CHARS, _TRAILING_CHARS, _SENTENCE_END, _SENTENCE_TAIL
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        import emoji
+        import numpy as np
+        from textblob import TextBlob
+        from textblob._text import (
+            ABBREVIATIONS,
+            EMOTICONS,
+            EOS,
+            PUNCTUATION,
+            RE_ABBR1,
+            RE_ABBR2,
+            RE_ABBR3,
+            RE_EMOTICONS,
+            RE_SARCASM,
+            replacements,
+        )
+        from textblob.en import sentiment as pattern_sentiment
+
+        # Single code points that `emoji.EMOJI_DATA` knows about (all non-ASCII)
+        _EMOJI_CHARS = frozenset(k for k in emoji.EMOJI_DATA if len(k) == 1 and not k.isascii())
+
+        # Pattern lexicon flattened to word -> (polarity, subjectivity, intensity, is_modifier)
+        _LEXICON = {
+            word: tuple(senses[None]) + (any(pos in senses for pos in pattern_sentiment.modifiers),)
+            for word, senses in pattern_sentiment.items()
+        }
+        _NEGATIONS = frozenset(pattern_sentiment.negations)
+        # Only faces that pass pattern's "not alpha, at most 5 chars, not punctuation" guard
+        _EMOTICON_SCORES = {}
+        for (_mood, score), faces in EMOTICONS.items():
+            for face in faces:
+                face = face.lower()
+                if face.isalpha() is False and len(face) <= 5 and face not in PUNCTUATION:
+                    _EMOTICON_SCORES.setdefault(face, score)
+        # Words that can change the score on their own; anything else is skipped
+        # unless a negation or modifier is pending
+        _TRIGGER_WORDS = frozenset(_LEXICON) | _NEGATIONS | frozenset(_EMOTICON_SCORES) | {"!", "(!)"}
+
+        # Tokenizer pieces, mirroring textblob._text.find_tokens
+        _CONTRACTIONS_RE = re.compile('|'.join(re.escape(k) for k in replacements))
+        _LEADING_CHARS = frozenset(PUNCTUATION.replace(".", ""))
+        _TRAILING_CHARS = _LEADING_CHARS | {"."}
+        _SENTENCE_END = ("...", ".", "!", "?", EOS)
+        _SENTENCE_TAIL = ("'", '"', "”", "’", "...", ".", "!", "?", ")", EOS)
+        _loaded = True
+
+
+@lru_cache(maxsize=65536)
+def _split_token(t):
+    """Split leading/trailing punctuation off one whitespace-delimited token"""
+    pieces = []
+    tail = []
+    while t and t[0] in _LEADING_CHARS and t not in replacements:
+        pieces.append(t[0])
+        t = t[1:]
+    while t and t[-1] in _TRAILING_CHARS and t not in replacements:
+        if t[-1] in _LEADING_CHARS:
+            tail.append(t[-1])
+            t = t[:-1]
+        if t.endswith("..."):
+            tail.append("...")
+            t = t[:-3].rstrip(".")
+        if t.endswith("."):
+            if t in ABBREVIATIONS or (
+                # RE_ABBR1/2 need "x." up front, RE_ABBR3 a capital
+                (t[0] in _UPPERCASE or t[1:2] == ".")
+                and (
+                    RE_ABBR1.match(t) is not None
+                    or RE_ABBR2.match(t) is not None
+                    or RE_ABBR3.match(t) is not None
+                )
+            ):
+                break
+            tail.append(t[-1])
+            t = t[:-1]
+    if t != "":
+        pieces.append(t)
+    pieces.extend(reversed(tail))
+    return tuple(pieces)
+
+
+def _rewrite_emoticons(sentence):
+    if "!" in sentence:
+        sentence = RE_SARCASM.sub("(!)", sentence)
+    return RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), sentence)
+
+
+def _split_sentences(tokens):
+    """Pattern's sentence grouping: drops EOS markers, keeps trailing quotes/brackets"""
+    sentences, i, j = [[]], 0, 0
+    while j < len(tokens):
+        if tokens[j] in _SENTENCE_END:
+            while j < len(tokens) and tokens[j] in _SENTENCE_TAIL:
+                if tokens[j] in ("'", '"') and sentences[-1].count(tokens[j]) % 2 == 0:
+                    break
+                j += 1
+            sentences[-1].extend(t for t in tokens[i:j] if t != EOS)
+            sentences.append([])
+            i = j
+        j += 1
+    sentences[-1].extend(tokens[i:j])
+    return [" ".join(s) for s in sentences if s]
+
+
+def _tokenize(text):
+    """
+    Lowercased word list exactly as the pattern analyser sees it
+    (same output as `" ".join(find_tokens(text)).split()`, lowercased)
+    """
+    if "'" in text:
+        text = _CONTRACTIONS_RE.sub(r" \g<0>", text)
+        text = text.replace("'", " ' ")
+    if '"' in text:
+        text = text.replace('"', ' " ')
+    if not text.isascii():
+        for quote in _UNICODE_QUOTES:
+            if quote in text:
+                text = text.replace(quote, f" {quote} ")
+    has_eos = "\n\n" in text or "\n\r\n" in text
+    if has_eos:
+        text = _LINEBREAK_RE.sub(f" {EOS} ", text.replace("\r\n", "\n"))
+
+    # str.split() is the same as collapsing whitespace and matching TOKEN
+    tokens = []
+    for t in text.split():
+        if t[0] in _LEADING_CHARS or t[-1] in _TRAILING_CHARS:
+            tokens.extend(_split_token(t))
+        else:
+            tokens.append(t)
+
+    # Sentence boundaries only matter for emoticon and sarcasm rewrites,
+    # which pattern applies per sentence. Any per-sentence match is also a
+    # match in the joined text, so no match there means no split is needed.
+    joined = " ".join(t for t in tokens if t != EOS) if has_eos else " ".join(tokens)
+    if RE_EMOTICONS.search(joined) or RE_SARCASM.search(joined):
+        joined = " ".join(_rewrite_emoticons(s) for s in _split_sentences(tokens))
+    return joined.lower().split()
+
+
+def _text_scores(words):
+    """
+    (polarity, subjectivity) by pattern's assessment rules (negation,
+    modifiers, "!", emoticons) over one token list
+    """
+    if _TRIGGER_WORDS.isdisjoint(words):
+        return 0.0, 0.0
+    a = []  # [polarity, subjectivity, intensity, negated]
+    m = None
+    n = None
+    for w in words:
+        if m is None and n is None and w not in _TRIGGER_WORDS:
+            continue
+        entry = _LEXICON.get(w)
+        if entry is not None:
+            p, s, i, is_modifier = entry
+            if m is None:
+                a.append([p, s, i, 1])
+            else:
+                last = a[-1]
+                last[0] = max(-1.0, min(p * last[2], +1.0))
+                last[1] = max(-1.0, min(s * last[2], +1.0))
+                last[2] = i
+            if n is not None:
+                last = a[-1]
+                last[2] = 1.0 / last[2]
+                last[3] = -1
+            m = w if is_modifier else None
+            n = w if w in _NEGATIONS else None
+        else:
+            if w in _NEGATIONS:
+                n = w
+            elif n and len(w.strip("'")) > 1:
+                n = None
+            if n is not None and m is not None and m.endswith("ly"):
+                a[-1][3] = -1
+                n = None
+            elif m and len(w) > 2:
+                m = None
+            if w == "!" and a:
+                a[-1][0] = max(-1.0, min(a[-1][0] * 1.25, +1.0))
+            elif w == "(!)":
+                a.append([0.0, 1.0, 1.0, 1])
+            else:
+                score = _EMOTICON_SCORES.get(w)
+                if score is not None:
+                    a.append([score, 1.0, 1.0, 1])
+    polarity = subjectivity = 0
+    for p, s, _i, negated in a:
+        polarity += p * -0.5 if negated < 0 else p
+        subjectivity += s
+    return polarity / float(len(a) or 1), subjectivity / float(len(a) or 1)
+
+
+def _strip_emoji(text):
+    """
+    Remove emoji code points and score them, in text order like the
+    reference implementation. Returns (clean_text, emoji_score).
+    """
+    score = 0
+    if text.isascii():
+        return text, score
+    found = [c for c in _NON_ASCII_RE.findall(text) if c in _EMOJI_CHARS]
+    for c in found:
+        score += _EMOJI_SCORES.get(c, 0)
+    for c in set(found):
+        text = text.replace(c, '')
+    return text, score
+
+
+# ---------- BATCH SENTIMENT ANALYSIS ----------
+def analyze_sentiment_batch(texts):
+    """
+    Score many texts at once.
+    Returns (labels, polarities, subjectivities): a list of labels matching
+    `analyze_sentiment`, a NumPy array of the clamped polarities they are
+    thresholded from and one of TextBlob's subjectivities (0 to 1).
+    """
+    load_resources()
+    text_scores = np.empty(len(texts))
+    emoji_scores = np.empty(len(texts))
+    subjectivities = np.empty(len(texts))
+    for idx, text in enumerate(texts):
+        text_clean, emoji_scores[idx] = _strip_emoji(text)
+        text_scores[idx], subjectivities[idx] = _text_scores(_tokenize(text_clean))
+
+    polarities = np.clip(text_scores + emoji_scores, -1.0, 1.0)
+    labels = np.where(
+        polarities > POSITIVE_THRESHOLD, "positive",
+        np.where(polarities < NEGATIVE_THRESHOLD, "negative", "neutral")
+    )
+    return labels.tolist(), polarities, subjectivities
+
+
+def sentiment_confidence(polarities, positive_threshold=POSITIVE_THRESHOLD, negative_threshold=NEGATIVE_THRESHOLD):
+    """
+    Confidence in the label of each clamped polarity (NumPy array): how
+    far it lies inside its label's band, from 0.5 on a threshold to 1.0
+    at -1/+1 (negative/positive) or at exactly 0 (neutral). Other scorers
+    pass their own thresholds.
+    """
+    import numpy as np
+
+    margins = np.where(
+        polarities > positive_threshold, (polarities - positive_threshold) / (1 - positive_threshold),
+        np.where(polarities < negative_threshold, (negative_threshold - polarities) / (1 + negative_threshold),
+                 1 - np.where(polarities >= 0, polarities / positive_threshold, polarities / negative_threshold))
+    )
+    return 0.5 + 0.5 * margins
@@ -15,7 +15,11 @@ def install_requirements():
         "requests==2.31.0",
         "flask==2.3.3",
         "flask-cors==4.0.0",
-        "textblob==0.17.1"
+        "textblob==0.17.1",
+        "numpy==1.26.4",
+        "starlette==1.8.0",
+        "uvicorn==0.54.0",
+        "aiomysql==0.3.2"
     ]
     
     for requirement in requirements:
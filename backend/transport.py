@@ -0,0 +1,26 @@
+"""
+Transport type classification for tweets.
+
+Computed once at ingest time and stored in tweet_sentiment.transport_type
+so the API can aggregate it in SQL instead of re-scanning tweet text.
+"""
+
+# Checked in order; the first type with a matching keyword wins
+TRANSPORT_KEYWORDS = [
+    ("metro", ['metro', 'मेट्रो', 'subway', 'dmrc']),
+    ("train", ['train', 'ट्रेन', 'railway', 'irctc', 'local train']),
+    ("auto", ['auto', 'ऑटो', 'rickshaw', 'three wheeler']),
+    ("taxi", ['taxi', 'टैक्सी', 'cab', 'ola', 'uber']),
+]
+DEFAULT_TRANSPORT_TYPE = "bus"  # fallback when no keyword matches
+
+TRANSPORT_TYPES = [DEFAULT_TRANSPORT_TYPE] + [transport_type for transport_type, _ in TRANSPORT_KEYWORDS]
+
+
+def determine_transport_type(text):
+    """Enhanced transport type detection"""
+    text = text.lower()
+    for transport_type, keywords in TRANSPORT_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return transport_type
+    return DEFAULT_TRANSPORT_TYPE
@@ -0,0 +1,72 @@
+"""
+Reading and writing tweet dumps.
+
+The scraper writes newline-delimited JSON (one tweet object per line) so
+dumps can be appended to and consumed as a stream. `iter_tweets` also
+streams the legacy `data.json` array format without loading it whole.
+"""
+import json
+
+READ_CHUNK = 1 << 16  # characters per read when streaming a legacy array
+
+
+def write_jsonl(f, tweets):
+    """Write tweets to an open text file, one JSON object per line. Returns the count."""
+    count = 0
+    for tweet in tweets:
+        f.write(json.dumps(tweet, ensure_ascii=False))
+        f.write("\n")
+        count += 1
+    return count
+
+
+def _iter_jsonl(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _iter_json_array(f):
+    """Incrementally decode the objects of a top-level JSON array"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_CHUNK).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("expected a JSON array")
+    buffer = buffer[1:]
+    pos = 0
+    eof = False
+    while True:
+        # Skip separators between elements
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            tweet, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            more = f.read(READ_CHUNK)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+            continue
+        yield tweet
+        pos = end
+
+
+def iter_tweets(path):
+    """
+    Yield tweets from a dump, one at a time.
+    Accepts JSONL (current scraper output) or a legacy JSON array.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "[":
+            yield from _iter_json_array(f)
+        else:
+            yield from _iter_jsonl(f)
@@ -1,9 +1,10 @@
-import requests
-import time
-import json
 from datetime import datetime, timedelta, timezone
 import os
 
+from checkpoint import SearchCheckpoint, snowflake_time
+from fetcher import FETCH_CONCURRENCY, QueryFetcher, Unauthorized
+from tweet_io import write_jsonl
+
 # --- CONFIGURATION ---
 
 # Replace with your actual Bearer Token.
@@ -50,13 +51,12 @@ QUERIES = [
     "central india transport"
 ]
 
-TWEETS_PER_QUERY = 30  # Reduced to avoid rate limits
-
-# --- SCRIPT START ---
-
-if not BEARER_TOKEN or BEARER_TOKEN == "...":
-    print("❌ CRITICAL ERROR: Please replace the '...' in the BEARER_TOKEN variable with your actual Twitter API Bearer Token.")
-    exit()
+TWEETS_PER_PAGE = 100     # API maximum: fewest requests per new tweet
+MAX_PAGES_PER_QUERY = int(os.environ.get("SCRAPER_MAX_PAGES", 5))  # request budget per query per run
+# API base URL; point it at backend/benchmarks/mock_twitter_api.py to test offline
+API_URL = os.environ.get("TWITTER_API_URL", "https://api.twitter.com")
+SEARCH_URL = f"{API_URL}/2/tweets/search/recent"
+OUTPUT_PATH = "backend/data.jsonl"  # one tweet per line, appended as queries return
 
 # Headers for Twitter API authentication
 HEADERS = {
@@ -78,110 +78,141 @@ def get_valid_time_window():
     
     return start_time_str, end_time_str
 
-# Get the initial time window
-start_time_str, end_time_str = get_valid_time_window()
-
-print(f"\n🔍 Fetching tweets from {start_time_str} to {end_time_str}")
-print(f"🇮🇳 Searching for transport-related content across Indian states\n")
-
-all_tweets = []
-query_count = 0
-total_queries = len(QUERIES)
-
-# --- MAIN LOOP ---
-for query in QUERIES:
-    query_count += 1
-    full_query = f"{query} lang:en -is:retweet"
-    
-    # Use the latest time window for the parameters
+def build_params(query, since_id=None, until_id=None):
+    """Search parameters for one search, with a freshly computed time window (reused by its next_token pages)"""
+    start_time_str, end_time_str = get_valid_time_window()
     params = {
-        "query": full_query,
-        "max_results": TWEETS_PER_QUERY,
-        "start_time": start_time_str,
+        "query": f"{query} lang:en -is:retweet",
+        "max_results": TWEETS_PER_PAGE,
         "end_time": end_time_str,
         "tweet.fields": "created_at,lang,author_id,text,public_metrics"
     }
-
-    print(f"🚦 Query {query_count}/{total_queries}: {query}")
-
-    url = "https://api.twitter.com/2/tweets/search/recent"
-
+    # since_id replaces the 7-day start: only tweets newer than the last run
+    if since_id:
+        params["since_id"] = since_id
+    else:
+        params["start_time"] = start_time_str
+    if until_id:
+        params["until_id"] = until_id
+    return params
+
+def collect_query(fetcher, query, state):
+    """
+    Tweets for one query that earlier runs have not collected, within
+    MAX_PAGES_PER_QUERY requests. `state` is the query's SearchCheckpoint
+    entry; returns (tweets, new state).
+    """
+    state = dict(state)
+    window_start = datetime.now(timezone.utc) - timedelta(days=6, hours=23, minutes=50)
+    # Ids older than the 7-day search window cannot be searched from
+    if state.get("until_id") and snowflake_time(state["until_id"]) <= window_start:
+        state = {"since_id": state.get("newest_id")}
+    if state.get("since_id") and snowflake_time(state["since_id"]) <= window_start:
+        state["since_id"] = None
+
+    tweets = []
+    budget = MAX_PAGES_PER_QUERY
+    if state.get("until_id"):
+        # Finish the range an earlier run left when it ran out of pages
+        found, meta = fetcher.search(
+            SEARCH_URL, lambda: build_params(query, state.get("since_id"), state["until_id"]), budget)
+        tweets += found
+        budget -= meta["pages"]
+        if not meta["complete"]:
+            state["until_id"] = meta["oldest_id"] or state["until_id"]
+            return tweets, state
+        state = {"since_id": state["newest_id"]}
+
+    if budget > 0:
+        found, meta = fetcher.search(SEARCH_URL, lambda: build_params(query, state.get("since_id")), budget)
+        tweets += found
+        if meta["newest_id"] and meta["complete"]:
+            state = {"since_id": meta["newest_id"]}
+        elif meta["newest_id"]:
+            # Out of budget: remember the unfetched range below what we got
+            state = {"since_id": state.get("since_id"), "until_id": meta["oldest_id"],
+                     "newest_id": meta["newest_id"]}
+    return tweets, state
+
+# --- MAIN ---
+def main():
+    if not BEARER_TOKEN or BEARER_TOKEN == "...":
+        print("❌ CRITICAL ERROR: Please replace the '...' in the BEARER_TOKEN variable with your actual Twitter API Bearer Token.")
+        return
+
+    # Get the initial time window
+    start_time_str, end_time_str = get_valid_time_window()
+
+    print(f"\n🔍 Fetching tweets from {start_time_str} to {end_time_str}")
+    print(f"🇮🇳 Searching for transport-related content across Indian states")
+    print(f"⚡ {FETCH_CONCURRENCY} queries in flight, paced by the API's rate-limit headers")
+    print(f"📑 Up to {MAX_PAGES_PER_QUERY} pages per query, resuming from saved since_ids\n")
+
+    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    # Appended: each run only adds tweets newer than the previous one
+    output_file = open(OUTPUT_PATH, "a", encoding="utf-8")
+    checkpoint = SearchCheckpoint()
+    seen_ids = set()   # only ids are kept in memory
+    total_fetched = 0
+    saved_count = 0
+    query_count = 0
+    total_queries = len(QUERIES)
+    fetcher = QueryFetcher(HEADERS)
+
+    # --- MAIN LOOP ---
+    # Queries run concurrently; results are written here, in completion order
     try:
-        response = requests.get(url, headers=HEADERS, params=params)
-
-        if response.status_code == 401:
-            print("❌ Error: 401 Unauthorized. Your Bearer Token is invalid or expired.")
-            print("   Please check your token and try again. Halting script.")
-            break 
-
-        # Rate limit handler
-        if response.status_code == 429:
-            resume_time = datetime.now() + timedelta(minutes=15)
-            print(f"⏳ Rate limit hit. Sleeping for 15 minutes.")
-            print(f"   Will resume at approximately {resume_time.strftime('%I:%M:%S %p')}.")
-            time.sleep(15 * 60)
-            
-            print("   Resuming request... Recalculating time window.")
-            new_start_time, new_end_time = get_valid_time_window()
-            params['start_time'] = new_start_time
-            params['end_time'] = new_end_time
-            print(f"   New Window: {new_start_time} to {new_end_time}")
-
-            response = requests.get(url, headers=HEADERS, params=params)
-
-        # Check the status of the final response
-        if response.status_code == 200:
-            data = response.json()
-            tweets = data.get("data", [])
-            print(f"✅ Retrieved {len(tweets)} tweets for '{query}'")
-            all_tweets.extend(tweets)
-        else:
-            print(f"❌ Error: {response.status_code} {response.reason}")
-            print(f"Response Body: {response.text}")
-
-        # Add delay between requests to be respectful to the API
-        time.sleep(2)
-
-    except requests.exceptions.RequestException as e:
-        print(f"❌ A request exception occurred: {e}")
-
-    # Progress indicator
-    progress = (query_count / total_queries) * 100
-    print(f"📊 Progress: {progress:.1f}% ({query_count}/{total_queries})\n")
-
-# --- SAVE RESULTS ---
-if all_tweets:
-    os.makedirs("backend", exist_ok=True)
-    
-    # Remove duplicates based on tweet ID
-    unique_tweets = {}
-    for tweet in all_tweets:
-        unique_tweets[tweet['id']] = tweet
-    
-    unique_tweets_list = list(unique_tweets.values())
-    
-    with open("backend/data.json", "w", encoding="utf-8") as f:
-        json.dump(unique_tweets_list, f, indent=2, ensure_ascii=False)
-    
-    print(f"\n💾 Saved {len(unique_tweets_list)} unique tweets to 'backend/data.json'")
-    print(f"📊 Total queries processed: {query_count}")
-    print(f"🔄 Duplicates removed: {len(all_tweets) - len(unique_tweets_list)}")
-    
-    # Print summary statistics
-    print("\n📈 COLLECTION SUMMARY:")
-    print("=" * 50)
-    print(f"Total unique tweets: {len(unique_tweets_list)}")
-    print(f"Queries executed: {query_count}/{total_queries}")
-    print(f"Average tweets per query: {len(unique_tweets_list)/query_count:.1f}")
-    
-    print("\n🚀 Next steps:")
-    print("1. Run: python backend/analyse_sentiment.py")
-    print("2. Run: python backend/api.py")
-    print("3. Start the React frontend")
-    
-else:
-    print("\n⚠️ No tweets were found or saved.")
-    print("This could be due to:")
-    print("- Rate limiting")
-    print("- No matching tweets in the time window")
-    print("- API connectivity issues")
\ No newline at end of file
+        for query, (tweets, state) in fetcher.fetch(QUERIES, lambda q: collect_query(fetcher, q, checkpoint.get(q))):
+            query_count += 1
+            print(f"✅ Retrieved {len(tweets)} new tweets for '{query}'")
+            total_fetched += len(tweets)
+
+            # Remove duplicates based on tweet ID and append the rest to the dump
+            new_tweets = [tweet for tweet in tweets if tweet['id'] not in seen_ids]
+            seen_ids.update(tweet['id'] for tweet in new_tweets)
+            saved_count += write_jsonl(output_file, new_tweets)
+            output_file.flush()
+            # Only after the tweets are on disk
+            checkpoint.set(query, state)
+
+            # Progress indicator
+            progress = (query_count / total_queries) * 100
+            print(f"📊 Progress: {progress:.1f}% ({query_count}/{total_queries})\n")
+
+    except Unauthorized:
+        print("❌ Error: 401 Unauthorized. Your Bearer Token is invalid or expired.")
+        print("   Please check your token and try again. Halting script.")
+
+    finally:
+        fetcher.close()
+
+    output_file.close()
+
+    # --- SAVE RESULTS ---
+    if saved_count:
+        print(f"\n💾 Saved {saved_count} unique tweets to '{OUTPUT_PATH}'")
+        print(f"📊 Total queries processed: {query_count}")
+        print(f"🌐 API requests: {fetcher.stats['requests']} ({fetcher.stats['rate_limited']} rate-limited)")
+        print(f"🔄 Duplicates removed: {total_fetched - saved_count}")
+
+        # Print summary statistics
+        print("\n📈 COLLECTION SUMMARY:")
+        print("=" * 50)
+        print(f"Total unique tweets: {saved_count}")
+        print(f"Queries executed: {query_count}/{total_queries}")
+        print(f"Average tweets per query: {saved_count/query_count:.1f}")
+
+        print("\n🚀 Next steps:")
+        print("1. Run: python backend/analyse_sentiment.py")
+        print("2. Run: python backend/api.py")
+        print("3. Start the React frontend")
+
+    else:
+        print("\n⚠️ No tweets were found or saved.")
+        print("This could be due to:")
+        print("- Rate limiting")
+        print("- No matching tweets in the time window")
+        print("- API connectivity issues")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { apiService, RealTimeTweet, RealTimeStateData } from '../utils/apiService';
 import { Tweet, StateData } from '../types';
 import { generateMockTweet, generateStateData } from '../utils/mockData';
@@ -9,6 +9,10 @@ export const useRealTimeData = () => {
   const [isConnected, setIsConnected] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  // Trend labels computed by the backend's sliding-window aggregator
+  const liveTrends = useRef(new Map<string, StateData['trend']>());
+  // Pushed state updates, applied one at a time in arrival order
+  const stateUpdates = useRef<Promise<void>>(Promise.resolve());
 
   // Transform real-time tweet to app format
   const transformRealTimeTweet = useCallback((realTweet: RealTimeTweet): Tweet => {
@@ -21,9 +25,9 @@ export const useRealTimeData = () => {
       transportType: realTweet.transportType,
       sentiment: {
         polarity: realTweet.sentiment.polarity,
-        subjectivity: 0.5, // Default value
+        subjectivity: realTweet.sentiment.subjectivity ?? 0.5, // Default value for unscored rows
         label: realTweet.sentiment.label,
-        confidence: realTweet.sentiment.confidence
+        confidence: realTweet.sentiment.confidence ?? 0
       },
       state: realTweet.state,
       city: realTweet.location.split(',')[0] || realTweet.state,
@@ -52,8 +56,9 @@ export const useRealTimeData = () => {
       totalMessages: realState.totalMessages,
       transportBreakdown: realState.transportBreakdown,
       sentimentBreakdown: realState.sentimentBreakdown,
-      trend: realState.sentimentScore > 0 ? 'improving' : 
-             realState.sentimentScore < -0.2 ? 'declining' : 'stable',
+      trend: liveTrends.current.get(realState.state) ??
+             (realState.sentimentScore > 0 ? 'improving' :
+              realState.sentimentScore < -0.2 ? 'declining' : 'stable'),
       lastUpdated: new Date(),
       majorCities: [], // Will be populated from static data
       population: 50000000 // Default value
@@ -84,7 +89,8 @@ export const useRealTimeData = () => {
         const realTweets = await apiService.fetchRealTimeTweets();
         const transformedTweets = realTweets.map(transformRealTimeTweet);
         
-        // Fetch real state data
+        // Fetch real state data (with server-side trends)
+        liveTrends.current = await apiService.fetchLiveTrends();
         const realStates = await apiService.fetchRealTimeStates();
         const transformedStates = realStates.map(transformRealTimeState);
         
@@ -138,14 +144,37 @@ export const useRealTimeData = () => {
     initializeData();
   }, []);
 
-  // Set up real-time updates
+  // Set up real-time updates: push feed from the backend, mock generator otherwise
   useEffect(() => {
+    if (isConnected) {
+      fetchRealTimeData(); // snapshot; the feed then only sends changes
+      return apiService.subscribeToFeed({
+        onTweets: (realTweets) => {
+          const fresh = realTweets.map(transformRealTimeTweet);
+          const ids = new Set(fresh.map(tweet => tweet.id));
+          setTweets(prev => [...fresh, ...prev.filter(tweet => !ids.has(tweet.id))].slice(0, 100));
+        },
+        onStates: (realStates) => {
+          // Refresh the trend labels first so each badge matches the numbers pushed with it
+          stateUpdates.current = stateUpdates.current.then(async () => {
+            liveTrends.current = await apiService.fetchLiveTrends();
+            const changed = realStates.map(transformRealTimeState);
+            setStates(prev => {
+              const byState = new Map(prev.map(state => [state.state, state]));
+              changed.forEach(state => byState.set(state.state, state));
+              return Array.from(byState.values());
+            });
+          });
+        }
+      });
+    }
+
     const interval = setInterval(async () => {
       await fetchRealTimeData();
-    }, isConnected ? 5000 : 3000); // 5s for real data, 3s for mock
+    }, 3000); // 3s for mock
 
     return () => clearInterval(interval);
-  }, [fetchRealTimeData, isConnected]);
+  }, [fetchRealTimeData, isConnected, transformRealTimeTweet, transformRealTimeState]);
 
   // Periodic connection check
   useEffect(() => {
@@ -10,8 +10,9 @@ export interface RealTimeTweet {
   transportType: 'bus' | 'metro' | 'train' | 'auto' | 'taxi';
   sentiment: {
     polarity: number;
+    subjectivity: number | null; // null until the backend has scored the stored tweet
     label: 'positive' | 'negative' | 'neutral';
-    confidence: number;
+    confidence: number | null;
   };
 }
 
@@ -89,6 +90,41 @@ class ApiService {
     }
   }
 
+  // Server-side trend per state: this hour against the previous one (/api/analytics/live)
+  async fetchLiveTrends(): Promise<Map<string, 'improving' | 'declining' | 'stable'>> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/analytics/live?granularity=hour&by=state`);
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      const live = await response.json();
+      return new Map(live.groups.map((group: { state: string; trend: 'improving' | 'declining' | 'stable' }) =>
+        [group.state, group.trend]));
+    } catch (error) {
+      console.error('Failed to fetch live trends:', error);
+      return new Map();
+    }
+  }
+
+  // Push feed (Server-Sent Events): only newly ingested tweets and the
+  // states they changed. EventSource reconnects and resumes on its own.
+  subscribeToFeed(handlers: {
+    onTweets: (tweets: RealTimeTweet[]) => void;
+    onStates: (states: RealTimeStateData[]) => void;
+    onError?: () => void;
+  }): () => void {
+    const source = new EventSource(`${API_BASE_URL}/stream`);
+    source.addEventListener('tweets', (event) => {
+      const tweets = JSON.parse((event as MessageEvent).data);
+      handlers.onTweets(tweets.map(this.transformTweet));
+    });
+    source.addEventListener('states', (event) => {
+      handlers.onStates(JSON.parse((event as MessageEvent).data));
+    });
+    source.onerror = () => handlers.onError?.();
+    return () => source.close();
+  }
+
   private transformTweet(apiTweet: any): RealTimeTweet {
     return {
       id: apiTweet.id,
@@ -99,8 +135,9 @@ class ApiService {
       transportType: apiTweet.transportType,
       sentiment: {
         polarity: apiTweet.sentiment.polarity,
+        subjectivity: apiTweet.sentiment.subjectivity ?? null,
         label: apiTweet.sentiment.label,
-        confidence: apiTweet.sentiment.confidence
+        confidence: apiTweet.sentiment.confidence ?? null
       }
     };
   }